@@ -1,14 +1,133 @@
+import asyncio
 import jwt
+import logging
 import datetime
-from fastapi import FastAPI, Query, Depends, HTTPException
+import hashlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import mysql.connector
-import pymongo
-from typing import Optional
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+from bson import ObjectId
 from dotenv import dotenv_values
+from src.database import (ConnectionPool, Database, DatabaseExecutor, PoolTimeoutError,
+                          mysql_connection_factory, create_mongodb_client)
+from src.batching import MicroBatcher
+from src.cache import PredictionCache, ResponseCache, TokenCache
+from src.data_version import VersionedValue, read_data_version
+from src.pagination import encode_cursor, decode_cursor
+from src.export import EXPORT_FORMATS, csv_lines, ndjson_lines
+from src.team_resolver import TeamResolver
+from src.snapshot import ReferenceSnapshot
+from src.match_results import MATCH_EXPORT_COLUMNS, MATCH_RESULTS_COLLECTION
+from src.features import matchday_features
+from src.prediction import MODEL_VERSION, predict_fixtures, predict_matchday, predict_next_matchday
+from src.standings import season_standings, select_standings, standing_cursor, store_standings
+from src.match_store import MATCH_STORE_PATH, SharedMatchStore
+from src.simulation import (SIMULATIONS, remaining_fixtures, shard_arguments, simulate_shard, simulation_inputs,
+                            simulation_results)
+from src.serialization import EncodedJSONResponse, FastJSONResponse, dumps
+from src.slow_queries import SLOW_QUERY_LOG_PATH, SlowQueryLog
+from src.metrics import JWT_VERIFICATION_DURATION, MetricsMiddleware, latest_metrics, register_stats
+from src import queries
 
 config = dotenv_values()
+# Journal de l'API (erreurs des tâches de démarrage et de fond), transmis aux gestionnaires configurés (uvicorn...)
+logger = logging.getLogger('football_predictor')
+
+def config_int(key: str, default: int) -> int:
+    """
+    Fonction qui lit une variable d'environnement entière optionnelle
+
+    :param key: Nom de la variable dans le fichier .env
+    :param default: Valeur utilisée si la variable est absente ou vide
+    :return: Valeur entière de la variable
+    """
+    return int(config.get(key) or default)
+
+async def snapshot_team_resolver() -> TeamResolver:
+    """
+    Fonction qui renvoie l'index des noms d'équipes de l'instantané courant (mode instantané)
+    """
+    return (await app.state.snapshot.get()).team_resolver
+
+def create_database() -> Database:
+    """
+    Fonction qui crée la couche d'accès aux données à partir de la configuration :
+    pool de connexions MySQL, client MongoDB, exécuteur des requêtes et journal des requêtes lentes
+
+    :return: Objet Database
+    """
+    pool_size = config_int('MYSQL_POOL_SIZE', 5)
+    mysql_pool = ConnectionPool(mysql_connection_factory(config),
+                                size=pool_size,
+                                timeout=config_int('MYSQL_POOL_TIMEOUT', 10))
+    mongodb_client = create_mongodb_client(config, max_pool_size=config_int('MONGODB_POOL_SIZE', 10))
+    # Par défaut un thread par connexion MySQL : un appel n'attend jamais une connexion
+    # déjà empruntée par un autre thread de l'exécuteur
+    executor = DatabaseExecutor(max_workers=config_int('DB_EXECUTOR_WORKERS', pool_size))
+    # Journal des requêtes lentes, activé uniquement si un seuil est configuré
+    slow_query_log = None
+    if config.get('SLOW_QUERY_THRESHOLD_MS'):
+        slow_query_log = SlowQueryLog(config_int('SLOW_QUERY_THRESHOLD_MS', 0) / 1000,
+                                      config.get('SLOW_QUERY_LOG') or SLOW_QUERY_LOG_PATH)
+    return Database(mysql_pool, mongodb_client, executor, slow_query_log=slow_query_log)
+
+async def attach_database(database: Database, snapshot: bool = False):
+    """
+    Fonction qui installe la couche d'accès aux données dans l'état de l'API et construit
+    l'index des noms d'équipes (et l'instantané des tables de référence en mode instantané)
+
+    :param database: Couche d'accès aux données
+    :param snapshot: True pour servir les tables de référence depuis un instantané en mémoire
+    """
+    app.state.database = database
+    if snapshot:
+        # Mode instantané : les tables de référence sont servies depuis la mémoire,
+        # l'instantané est rechargé (puis remplacé d'un bloc) après chaque mise à jour des données
+        app.state.snapshot = VersionedValue(lambda: app.state.database.mysql(ReferenceSnapshot.load))
+        app.state.team_resolver = VersionedValue(snapshot_team_resolver)
+    else:
+        app.state.snapshot = None
+        # Index des noms d'équipes, reconstruit après chaque mise à jour des données
+        app.state.team_resolver = VersionedValue(lambda: app.state.database.mysql(TeamResolver.from_connection))
+    try:
+        await app.state.team_resolver.get()
+    except Exception as error:
+        # Base indisponible au démarrage : l'index sera construit à la première recherche par équipe
+        logger.warning("Index des équipes non construit : %s", error)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ouvre le pool de connexions MySQL, le client MongoDB et l'exécuteur des requêtes
+    au démarrage de l'API, construit l'index des noms d'équipes (et l'instantané des tables de référence
+    si REFERENCE_SNAPSHOT est activé), le pool de processus des simulations et le précalcul des prédictions,
+    et ferme le tout à l'arrêt
+    """
+    await attach_database(create_database(), snapshot=bool(config_int('REFERENCE_SNAPSHOT', 0)))
+    # Prédictions de la prochaine journée calculées à l'avance après chaque mise à jour des données
+    warmup_interval = config_int('PREDICTION_WARMUP_INTERVAL', 10)
+    warmup = asyncio.create_task(warm_predictions_loop(warmup_interval)) if warmup_interval > 0 else None
+    # Pool de processus des simulations de fin de saison (calcul NumPy hors du processus de l'API).
+    # Les processus sont créés par un serveur dédié (forkserver) et non par fork du processus de l'API,
+    # qui a déjà des threads et des connexions MySQL et MongoDB ouvertes
+    workers = config_int('SIMULATION_WORKERS', os.cpu_count() or 1)
+    app.state.simulation_workers = workers
+    app.state.simulation_executor = (ProcessPoolExecutor(max_workers=workers,
+                                                         mp_context=multiprocessing.get_context('forkserver'))
+                                     if workers > 1 else None)
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    app.state.database.close()
+    if app.state.simulation_executor is not None:
+        app.state.simulation_executor.shutdown()
 
 description = """
 FootballPredictorApp API permet d'accéder à des données sur les championnats de football français. 🚀
@@ -29,25 +148,85 @@ Il est possible de :
 Il est possible de :
 
 * **Lire** les entrées de classements selon les paramètres précisés
+* **Lire** le classement d'une saison à l'issue de n'importe quelle journée, calculé à partir des résultats des matchs
 
 ## Matchs
 
 Il est possible de :
 
 * **Lire** les résultats des matchs selon les paramètres précisés
+
+## Prédictions
+
+Il est possible de :
+
+* **Prédire** les matchs d'une journée (buts attendus, probabilités de victoire, nul et défaite, score le plus probable)
+* **Prédire** un match (les demandes simultanées sont évaluées ensemble, la prochaine journée de Ligue 1
+et de Ligue 2 est calculée à l'avance après chaque mise à jour des données)
+
+## Classements Elo
+
+Il est possible de :
+
+* **Lire** les classements Elo courants des équipes et leur évolution match par match
+
+## Confrontations
+
+Il est possible de :
+
+* **Lire** le bilan des confrontations directes entre deux équipes (victoires, nuls, buts, dernières confrontations)
+
+## Forme
+
+Il est possible de :
+
+* **Lire** les caractéristiques de forme des équipes des matchs d'une journée (derniers résultats,
+points par match, buts marqués et encaissés à domicile et à l'extérieur, jours de repos)
+
+## Simulation
+
+Il est possible de :
+
+* **Simuler** la fin d'une saison pour obtenir les probabilités de chaque position finale
+(titre, places européennes, barrage, relégation)
+
+## Lot
+
+Il est possible de :
+
+* **Lire** en une seule requête plusieurs équipes, joueurs, effectifs et classements
+
+## Export
+
+Il est possible de :
+
+* **Exporter** l'intégralité des joueurs, classements et matchs en NDJSON ou CSV
+
+## Statistiques
+
+Il est possible de :
+
+* **Lire** les métriques internes de l'API (pool de connexions MySQL, caches)
+
+Les métriques Prometheus (requêtes, durées par route et par requête en base, pool, caches) sont exposées sur **/metrics**
 """
 
 app = FastAPI(title="FootballPredictorAPI",
               description=description,
               summary="API pour accéder à la base de données des résultats des championnats français",
-              version="0.1.2",
+              version="0.2.0",
               contact={
                 "name": "Jonathan Pellan",
                 "email": "jonathan.pellan@protonmail.com",
-              })
+              },
+              default_response_class=FastJSONResponse,
+              lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # Configuration de la sécurité
 security = HTTPBearer()
+# Tokens dont la signature a déjà été vérifiée (conservés jusqu'à leur expiration)
+token_cache = TokenCache(maxsize=config_int('TOKEN_CACHE_SIZE', 1024))
 
 # Modèle pour l'authentification
 class TokenRequest(BaseModel):
@@ -84,44 +263,153 @@ def generate_token(request: TokenRequest):
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
-    Fonction qui permet de vérifier le token JWT
+    Dépendance qui permet de vérifier le token JWT des routes protégées.
+    La signature n'est vérifiée qu'une fois par token, les appels suivants utilisent le cache.
     
     :param credentials: Credentials fournis via le bearer token
     :return: None
     :raises: HTTPException si le token est invalide ou expiré
     """
+    token = credentials.credentials
+    start = time.perf_counter()
+    if token_cache.contains(token):
+        JWT_VERIFICATION_DURATION.labels('hit').observe(time.perf_counter() - start)
+        return
     try:
-        jwt.decode(credentials.credentials, config['SECRET_KEY'], algorithms=["HS256"])
+        payload = jwt.decode(token, config['SECRET_KEY'], algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    finally:
+        JWT_VERIFICATION_DURATION.labels('miss').observe(time.perf_counter() - start)
+    if 'exp' in payload:
+        token_cache.add(token, payload['exp'])
 
-def get_db_connection():
+def get_database(request: Request) -> Database:
     """
-    Fonction qui permet de se connecter à la base de données MySQL
+    Dépendance qui renvoie la couche d'accès aux données créée au démarrage de l'API
     
-    :return: Objet connexion à la base de données
+    :param request: Requête en cours
+    :return: Objet Database (pool MySQL, client MongoDB et exécuteur)
     """
-    return mysql.connector.connect(
-        host=config['MYSQL_HOST'],
-        user=config['MYSQL_USER'],
-        password=config['MYSQL_PASSWORD'],
-        database="football_predictor"
-    )
+    return request.app.state.database
 
-def get_mongodb_connection():
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """
+    Renvoie une erreur 503 lorsque aucune connexion MySQL ne s'est libérée à temps
     """
-    Fonction qui permet de se connecter à la base de données MongoDB locale
+    return JSONResponse(status_code=503, content={"detail": "Database busy, retry later"})
 
-    :return: Objet MongoClient
+# Réponses des routes de lecture, abandonnées dès qu'une nouvelle version des données est publiée
+response_cache = ResponseCache(maxsize=config_int('RESPONSE_CACHE_SIZE', 256),
+                               max_rows=config_int('RESPONSE_CACHE_MAX_ROWS', 100000))
+
+# En-tête Cache-Control des routes de lecture : les clients revalident avec If-None-Match
+CACHE_CONTROL = f"private, max-age={config_int('HTTP_CACHE_MAX_AGE', 0)}, must-revalidate"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
     """
-    client = pymongo.MongoClient('localhost', 27017)
-    return client
+    Fonction qui indique si l'en-tête If-None-Match du client contient l'ETag courant
 
-@app.get("/equipe")
+    :param if_none_match: Valeur de l'en-tête If-None-Match (ou None)
+    :param etag: ETag courant de la ressource
+    :return: True si le client possède déjà cette version de la ressource
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+async def read_through(request: Request, route: str, params: dict, load, cursor_of=None) -> Response:
+    """
+    Fonction qui renvoie la réponse d'une route de lecture :
+    304 si le client possède déjà la version courante (sans interroger la base),
+    sinon la réponse en cache pour ces paramètres, ou la calcule, l'encode en JSON et la met en cache
+
+    :param request: Requête en cours (en-tête If-None-Match)
+    :param route: Chemin de la route
+    :param params: Paramètres de la requête (les filtres absents ou vides sont ignorés)
+    :param load: Fonction sans argument renvoyant la coroutine qui interroge la base
+    :param cursor_of: Pour les routes paginées, fonction qui renvoie la clé de pagination d'une ligne
+    :return: Réponse JSON (en-têtes ETag, Cache-Control et éventuellement X-Next-Cursor), ou réponse 304
+    """
+    version = read_data_version()
+    key = (route, tuple(sorted((name, value) for name, value in params.items() if value is not None and value != '')))
+    # Le contenu ne change qu'avec une nouvelle version des données (ou de l'API) : l'ETag en est dérivé
+    etag = '"' + hashlib.sha256(repr((app.version, version, key)).encode()).hexdigest()[:32] + '"'
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Le cache conserve le corps déjà encodé : une réponse en cache n'est plus sérialisée
+    found, cached = response_cache.get(key, version)
+    if found:
+        body, next_cursor = cached
+    else:
+        results = await load()
+        body, next_cursor = dumps(results), None
+        # Page complète : le client peut demander la suite avec le curseur de la dernière ligne
+        if cursor_of and results and len(results) == params.get('limit'):
+            next_cursor = encode_cursor(cursor_of(results[-1]))
+        response_cache.set(key, (body, next_cursor), version, weight=len(results))
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return EncodedJSONResponse(body, headers=headers)
+
+async def reference_query(database: Database, name: str, *args) -> list:
+    """
+    Fonction qui exécute une requête sur les tables de référence (Team, Player, Ranking...) :
+    sur l'instantané en mémoire en mode instantané, sinon sur MySQL
+
+    :param database: Couche d'accès aux données
+    :param name: Nom de la fonction de requête (identique dans src/queries.py et src/snapshot.py)
+    :return: Résultat de la requête
+    """
+    if app.state.snapshot is not None:
+        return getattr(await app.state.snapshot.get(), name)(*args)
+    return await database.mysql(getattr(queries, name), *args)
+
+async def load_for_teams(request: Request, name: Optional[str], load):
+    """
+    Fonction qui résout un nom d'équipe avec l'index en mémoire puis interroge la base
+    avec les identifiants trouvés
+
+    :param request: Requête en cours
+    :param name: Nom approximatif de l'équipe (None si pas de filtre)
+    :param load: Fonction prenant la liste des identifiants (ou None) et renvoyant la coroutine qui interroge la base
+    :return: Résultat de la requête (liste vide si aucune équipe ne correspond)
+    """
+    if not name:
+        return await load(None)
+    resolver = await request.app.state.team_resolver.get()
+    team_ids = resolver.resolve(name)
+    if not team_ids:
+        # Aucune équipe ne correspond : inutile d'interroger la base
+        return []
+    return await load(team_ids)
+
+def parse_cursor(cursor: Optional[str], length: int) -> Optional[list]:
+    """
+    Fonction qui décode le curseur de pagination fourni par le client
+
+    :param cursor: Curseur reçu dans le paramètre *curseur* (ou None pour la première page)
+    :param length: Nombre de valeurs de la clé de pagination de la route
+    :return: Clé de pagination, ou None
+    :raises: HTTPException 400 si le curseur est invalide
+    """
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, length)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/equipe", dependencies=[Depends(verify_token)])
 async def get_team(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    request: Request,
+    database: Database = Depends(get_database),
     name: Optional[str] = Query(None, alias="nom"),
     id: Optional[int] = Query(None, alias="id"),
     limit: Optional[int] = Query(10, alias="limit")
@@ -135,43 +423,22 @@ async def get_team(
 
     *Renvoie la liste des équipes correspondant aux critères*
     """
-    # Vérification du token
-    await verify_token(credentials)
-    
-    connection = get_db_connection()
-    cursor = connection.cursor(dictionary=True)
-
-    query = "SELECT * FROM Team WHERE 1=1"
-    params = []
-
-    if name:
-        query += f" AND name LIKE '%{name}%'"
-        #params.append(name)
-    if id:
-        query += " AND id = %s"
-        params.append(id)
-
-    query += " LIMIT %s"
-    params.append(limit)
-
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-
-    cursor.close()
-    connection.close()
+    return await read_through(request, '/equipe', {'nom': name, 'id': id, 'limit': limit},
+                              lambda: load_for_teams(request, name, lambda team_ids: reference_query(
+                                  database, 'select_teams', team_ids, id, limit)))
 
-    return results
-
-@app.get("/joueurs")
+@app.get("/joueurs", dependencies=[Depends(verify_token)])
 async def get_players(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
+        request: Request,
+        database: Database = Depends(get_database),
         id : Optional[int] = Query(None, alias='id'),
         first_name : Optional[str] = Query(None, alias='prenom'),
         last_name : Optional[str] = Query(None, alias='nom'),
         birth_date : Optional[str] = Query(None, alias='naissance'),
         position : Optional[str] = Query(None, alias='position'),
         team : Optional[str] = Query(None, alias='equipe'),
-        limit : Optional[int] = Query(30, alias='limit')
+        limit : Optional[int] = Query(30, alias='limit'),
+        cursor : Optional[str] = Query(None, alias='curseur')
 ):
     """
     Route permettant de récupérer les joueurs en fonction de différents critères
@@ -183,54 +450,32 @@ async def get_players(
     - **position**: Position dans l'équipe (valeurs possibles : 'Gardien', 'Defenseur', 'Milieu', 'Attaquant')
     - **equipe**: Nom de l'équipe
     - **limit**: Nombre maximum de joueurs affichés (30 par défaut)
+    - **curseur**: Curseur de la page suivante (en-tête *X-Next-Cursor* de la réponse précédente)
 
-    *Renvoie la liste des joueurs correspondant aux critères*
+    *Renvoie la liste des joueurs correspondant aux critères, triés par identifiant*
     """
-    await verify_token(credentials)
-
-    connection = get_db_connection()
-    cursor = connection.cursor(dictionary=True)
-    query = ""
-    if team:
-        query = f"SELECT Player.* FROM Player JOIN Team ON Player.team_id = Team.id WHERE (name LIKE '%{team}%' OR shortname LIKE '%{team}%')"
-    else:
-        query = "SELECT * FROM Player WHERE 1=1"
-    params = []
-
-    if id:
-        query += " AND Player.id = %s"
-        params.append(id)
-    if first_name:
-        query += " AND first_name = %s"
-        params.append(first_name)
-    if last_name:
-        query += " AND last_name = %s"
-        params.append(last_name)
-    if birth_date:
-        query += " AND birthdate = %s"
-        params.append(birth_date)
-    if position and position in ['Gardien', 'Defenseur', 'Milieu', 'Attaquant']:
-        query += " AND position = %s"
-        params.append(position)
-    
-    query += " LIMIT %s"
-    params.append(limit)
-
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-
-    cursor.close()
-    connection.close()
-    return results
-
-@app.get('/classements')
+    if position not in queries.POSITIONS:
+        position = None
+    after = parse_cursor(cursor, 1)
+    params = {'id': id, 'prenom': first_name, 'nom': last_name, 'naissance': birth_date,
+              'position': position, 'equipe': team, 'limit': limit, 'curseur': cursor}
+    return await read_through(request, '/joueurs', params,
+                              lambda: load_for_teams(request, team, lambda team_ids: reference_query(
+                                  database, 'select_players', id, first_name, last_name,
+                                  birth_date, position, team_ids, limit, after)),
+                              cursor_of=lambda row: [row['id']])
+
+@app.get('/classements', dependencies=[Depends(verify_token)])
 async def get_rankings(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
+        request: Request,
+        database: Database = Depends(get_database),
         season: Optional[int] = Query(None, alias='saison'),
         type_: Optional[str] = Query(None, alias='type'),
         team: Optional[str] = Query(None, alias='equipe'),
         league: Optional[str] = Query(None, alias='championnat'),
-        limit: Optional[int] = Query(10, alias='limit')
+        matchday: Optional[int] = Query(None, alias='journee', ge=0),
+        limit: Optional[int] = Query(10, alias='limit'),
+        cursor: Optional[str] = Query(None, alias='curseur')
 ):
     """
     Route permettant d'accéder aux historiques de classement
@@ -239,76 +484,511 @@ async def get_rankings(
     - **type**: Type de classement ('TOTAL', 'HOME', 'AWAY')
     - **equipe**: Nom de l'équipe
     - **championnat**: Compétition à sélectionner
+    - **journee**: Classement à l'issue de cette journée, calculé à partir des résultats des matchs
+    (**saison** et **championnat** obligatoires)
     - **limit**: Nombre maximum de résultats (10 par défaut)
+    - **curseur**: Curseur de la page suivante (en-tête *X-Next-Cursor* de la réponse précédente)
 
-    *Renvoie la liste des classements correspondant à la requête*
+    *Renvoie la liste des classements correspondant à la requête, triés par championnat, type et position*
     """
-    await verify_token(credentials)
-
-    connection = get_db_connection()
-    cursor = connection.cursor(dictionary=True)
-    query = ("SELECT position, league.name, league.season, team.name, type, played, goals_for, "
-             "goals_against, won, draw, lost, points FROM `Ranking` JOIN `Team` ON Ranking.team_id = Team.id"
-             " JOIN `League` ON Ranking.league_id = League.id WHERE 1=1")
-    params = []
-
-    if season:
-        query += " AND League.season = %s"
-        params.append(season)
-    if team:
-        query += f" AND (Team.name LIKE '%{team}%' OR Team.shortname LIKE '%{team}%')"
-    if league:
-        query += " AND League.name = %s"
-        params.append(league)
-    if type_:
-        query += " AND type = %s"
-        params.append(type_)
-
-    query += " LIMIT %s"
-    params.append(limit)
-
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-
-    cursor.close()
-    connection.close()
-    return results
-
-@app.get('/matches')
+    if matchday is not None:
+        return await get_standings(request, database, season, type_, team, league, matchday, limit, cursor)
+    after = parse_cursor(cursor, 4)
+    params = {'saison': season, 'type': type_, 'equipe': team, 'championnat': league, 'limit': limit, 'curseur': cursor}
+    return await read_through(request, '/classements', params,
+                              lambda: load_for_teams(request, team, lambda team_ids: reference_query(
+                                  database, 'select_rankings', season, type_, team_ids, league, limit, after)),
+                              cursor_of=queries.ranking_cursor)
+
+# Classements cumulés des saisons déjà calculées, abandonnés dès qu'une nouvelle version des données est publiée
+standings_cache = ResponseCache(maxsize=config_int('STANDINGS_CACHE_SIZE', 64))
+# Magasin de matchs projeté en mémoire, partagé par les workers et rouvert dès qu'une nouvelle version est publiée
+match_store = SharedMatchStore(MATCH_STORE_PATH)
+
+async def get_standings(request: Request, database: Database, season: Optional[int], type_: Optional[str],
+                        team: Optional[str], league: Optional[str], matchday: int, limit: int,
+                        cursor: Optional[str]) -> Response:
+    """
+    Fonction qui renvoie les classements d'une saison à l'issue d'une journée (paramètre *journee* de /classements),
+    lus dans les classements cumulés de la saison calculés une seule fois par version des données,
+    à partir du magasin de matchs s'il existe (sinon de la collection match_results)
+    """
+    if season is None or not league:
+        raise HTTPException(status_code=400, detail="Parameters saison and championnat are required with journee")
+    after = parse_cursor(cursor, 3)
+
+    async def load(team_ids: Optional[list]) -> list:
+        version = read_data_version()
+        found, standings = standings_cache.get((league, season), version)
+        if not found:
+            store = match_store.get()
+            standings = (store_standings(store, league, season) if store is not None
+                         else await database.mongodb(season_standings, league, season))
+            standings_cache.set((league, season), standings, version)
+        return select_standings(standings, matchday, type_, team_ids, limit, after)
+
+    params = {'saison': season, 'type': type_, 'equipe': team, 'championnat': league, 'journee': matchday,
+              'limit': limit, 'curseur': cursor}
+    return await read_through(request, '/classements', params, lambda: load_for_teams(request, team, load),
+                              cursor_of=standing_cursor)
+
+@app.get('/matches', dependencies=[Depends(verify_token)])
 async def get_matches(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
+        request: Request,
+        database: Database = Depends(get_database),
         season: Optional[int] = Query(None, alias='saison'),
         matchday: Optional[int] = Query(None, alias='journee'),
         league: Optional[str] = Query(None, alias='championnat'),
-        limit: Optional[int] = Query(10, alias='limit')
+        team: Optional[str] = Query(None, alias='equipe'),
+        date_from: Optional[datetime.date] = Query(None, alias='debut'),
+        date_to: Optional[datetime.date] = Query(None, alias='fin'),
+        limit: Optional[int] = Query(10, alias='limit'),
+        cursor: Optional[str] = Query(None, alias='curseur')
 ):
     """
-    Route permettant d'accéder aux résultats/affiches des matchs
+    Route permettant d'accéder aux résultats/affiches des matchs (un document par match)
     
     - **saison** : Année de début de la saison
     - **journee** : Journée à sélectionner (entre 1 et 34 ou 38 selon la saison)
     - **championnat** : Championnat à sélectionner ('Ligue 1' et 'Ligue 2')
+    - **equipe** : Nom de l'équipe (à domicile ou à l'extérieur)
+    - **debut** : Date du premier match (format : YYYY-MM-dd)
+    - **fin** : Date du dernier match (format : YYYY-MM-dd)
+    - **limit** : Nombre maximum de résultats (10 par défaut)
+    - **curseur** : Curseur de la page suivante (en-tête *X-Next-Cursor* de la réponse précédente)
     
-    *Renvoie la liste des résultats/affiches correspondant à la requête*
-    """
-    await verify_token(credentials)
-
-    client = get_mongodb_connection()
-    db = client['football_predictor']
-    matches = db['matches']
-    query = {}
-
-    if season:
-        query['season'] = str(f"{season}-{season+1}")
-    if matchday:
-        query['matchday'] = matchday
-    if league and league in ['Ligue 1', 'Ligue 2']:
-        query['league'] = league
-
-    results_mongo = matches.find(query, projection={ '_id' : False }, limit=limit)
-    results = list(results_mongo)
-    client.close()
-    return results
+    *Renvoie la liste des matchs correspondant à la requête, triés par saison et journée*
+    """
+    if league not in queries.LEAGUES:
+        league = None
+    after = parse_cursor(cursor, 3)
+    if after and not ObjectId.is_valid(after[2]):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # Les dates sont enregistrées au format YYYY-MM-dd : la comparaison de chaînes suit l'ordre chronologique
+    date_from = date_from.isoformat() if date_from else None
+    date_to = date_to.isoformat() if date_to else None
+    params = {'saison': season, 'journee': matchday, 'championnat': league, 'equipe': team,
+              'debut': date_from, 'fin': date_to, 'limit': limit, 'curseur': cursor}
+    return await read_through(request, '/matches', params,
+                              lambda: load_for_teams(request, team, lambda team_ids: database.mongodb(
+                                  queries.find_matches, season, matchday, league, team_ids,
+                                  date_from, date_to, limit, after)),
+                              cursor_of=queries.match_cursor)
+
+@app.get('/predictions', dependencies=[Depends(verify_token)])
+async def get_predictions(
+        request: Request,
+        database: Database = Depends(get_database),
+        season: int = Query(..., alias='saison'),
+        league: str = Query('Ligue 1', alias='championnat'),
+        matchday: Optional[int] = Query(None, alias='journee')
+):
+    """
+    Route permettant de prédire les matchs d'une journée avec un modèle de Poisson corrigé par Dixon et Coles,
+    ajusté sur les résultats de la saison précédente et des journées précédentes
+
+    - **saison** : Année de début de la saison
+    - **championnat** : Championnat à sélectionner ('Ligue 1' par défaut, ou 'Ligue 2')
+    - **journee** : Journée à prédire (par défaut la prochaine journée dont un match n'a pas été joué)
+
+    *Renvoie les matchs de la journée avec les buts attendus, les probabilités de victoire à domicile,
+    de nul et de victoire à l'extérieur, et le score le plus probable*
+    """
+    if league not in queries.LEAGUES:
+        raise HTTPException(status_code=400, detail="Unknown league")
+
+    async def load():
+        version = read_data_version()
+        try:
+            predictions = await database.mongodb(predict_matchday, league, season, matchday, match_store.get())
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Not enough results to fit the model")
+        # Les prédictions de la journée servent aussi les demandes de prédiction d'un seul match
+        prediction_cache.set_many({prediction['_id']: prediction for prediction in predictions}, version)
+        return predictions
+
+    params = {'saison': season, 'championnat': league, 'journee': matchday}
+    return await read_through(request, '/predictions', params, load)
+
+# Prédictions de matchs par (version du modèle, version des données, match)
+prediction_cache = PredictionCache(maxsize=config_int('PREDICTION_CACHE_SIZE', 2048), model_version=MODEL_VERSION)
+# Championnats dont la prochaine journée est prédite à l'avance après chaque mise à jour des données
+WARMUP_LEAGUES = ('Ligue 1', 'Ligue 2')
+
+async def warm_predictions(database: Database):
+    """
+    Fonction qui calcule à l'avance les prédictions de la prochaine journée de chaque championnat de WARMUP_LEAGUES
+
+    :param database: Couche d'accès aux données
+    """
+    version = read_data_version()
+    prediction_cache.check_version(version)
+    for league in WARMUP_LEAGUES:
+        try:
+            predictions = await database.mongodb(predict_next_matchday, league, match_store.get())
+        except ValueError as error:
+            # Aucun résultat avant la prochaine journée : rien à précalculer avant la prochaine version des données
+            logger.info("Prédictions de %s non précalculées : %s", league, error)
+            continue
+        prediction_cache.set_many({prediction['_id']: prediction for prediction in predictions}, version, warmup=True)
+
+# Nombre maximum de doublements de l'intervalle du précalcul après des échecs successifs
+WARMUP_MAX_BACKOFF = 5
+
+async def warm_predictions_loop(interval: float):
+    """
+    Tâche de fond qui surveille la version des données toutes les *interval* secondes
+    et précalcule les prédictions dès qu'une nouvelle version est publiée (et au démarrage)
+
+    :param interval: Intervalle entre deux lectures de la version des données, en secondes
+    """
+    warmed_version = None
+    failures = 0
+    while True:
+        version = read_data_version()
+        if version != warmed_version:
+            try:
+                await warm_predictions(app.state.database)
+                warmed_version = version
+                failures = 0
+            except Exception as error:
+                # Base indisponible : nouvel essai après un intervalle doublé à chaque échec
+                failures += 1
+                logger.warning("Prédictions non précalculées (échec %d) : %s", failures, error)
+        await asyncio.sleep(interval * 2 ** min(failures, WARMUP_MAX_BACKOFF))
+
+# Prédictions de matchs demandées simultanément, évaluées par lots (fenêtre de regroupement en millisecondes)
+prediction_batcher = MicroBatcher(lambda fixture_ids: app.state.database.mongodb(predict_fixtures, fixture_ids,
+                                                                                match_store.get()),
+                                  window=config_int('PREDICTION_BATCH_WINDOW_MS', 3) / 1000,
+                                  max_size=config_int('PREDICTION_BATCH_MAX_SIZE', 64), name='predictions')
+
+@app.get('/predictions/match', dependencies=[Depends(verify_token)])
+async def get_match_prediction(
+        request: Request,
+        match_id: str = Query(..., alias='id')
+):
+    """
+    Route permettant de prédire un match avec le modèle de la route /predictions.
+    Les demandes simultanées sont regroupées et évaluées ensemble
+
+    - **id** : Identifiant du match (champ _id des matchs de la route /matches)
+
+    *Renvoie le match avec les buts attendus, les probabilités de victoire à domicile, de nul et de victoire
+    à l'extérieur, et le score le plus probable*
+    """
+    if not ObjectId.is_valid(match_id):
+        raise HTTPException(status_code=400, detail="Invalid match id")
+
+    match_id = str(ObjectId(match_id))
+
+    async def load():
+        version = read_data_version()
+        found, prediction = prediction_cache.get(match_id, version)
+        if not found:
+            try:
+                prediction = await prediction_batcher.submit(ObjectId(match_id))
+            except ValueError:
+                raise HTTPException(status_code=404, detail="Not enough results to fit the model")
+            if prediction is not None:
+                prediction_cache.set_many({match_id: prediction}, version)
+        if prediction is None:
+            raise HTTPException(status_code=404, detail="Match not found")
+        return prediction
+
+    return await read_through(request, '/predictions/match', {'id': match_id}, load)
+
+@app.get('/elo', dependencies=[Depends(verify_token)])
+async def get_ratings(
+        request: Request,
+        database: Database = Depends(get_database),
+        team: Optional[str] = Query(None, alias='equipe'),
+        limit: Optional[int] = Query(20, alias='limit')
+):
+    """
+    Route permettant d'accéder aux classements Elo courants des équipes
+
+    - **equipe** : Nom de l'équipe (toutes les équipes par défaut)
+    - **limit** : Nombre maximum d'équipes (20 par défaut)
+
+    *Renvoie les classements Elo (classement, nombre de matchs, date du dernier match), du meilleur au moins bon*
+    """
+    return await read_through(request, '/elo', {'equipe': team, 'limit': limit},
+                              lambda: load_for_teams(request, team, lambda team_ids: database.mongodb(
+                                  queries.find_ratings, team_ids, limit)))
+
+@app.get('/elo/historique', dependencies=[Depends(verify_token)])
+async def get_rating_history(
+        request: Request,
+        database: Database = Depends(get_database),
+        team: str = Query(..., alias='equipe'),
+        date_from: Optional[datetime.date] = Query(None, alias='debut'),
+        date_to: Optional[datetime.date] = Query(None, alias='fin'),
+        limit: Optional[int] = Query(100, alias='limit')
+):
+    """
+    Route permettant de suivre l'évolution du classement Elo d'une équipe
+
+    - **equipe** : Nom de l'équipe
+    - **debut** : Date du premier match (format : YYYY-MM-dd)
+    - **fin** : Date du dernier match (format : YYYY-MM-dd)
+    - **limit** : Nombre maximum d'entrées (100 par défaut)
+
+    *Renvoie le classement avant et après chaque match de l'équipe, triés par date*
+    """
+    date_from = date_from.isoformat() if date_from else None
+    date_to = date_to.isoformat() if date_to else None
+    params = {'equipe': team, 'debut': date_from, 'fin': date_to, 'limit': limit}
+    return await read_through(request, '/elo/historique', params,
+                              lambda: load_for_teams(request, team, lambda team_ids: database.mongodb(
+                                  queries.find_rating_history, team_ids, date_from, date_to, limit)))
+
+@app.get('/confrontations', dependencies=[Depends(verify_token)])
+async def get_head_to_head(
+        request: Request,
+        database: Database = Depends(get_database),
+        team: str = Query(..., alias='equipe'),
+        opponent: str = Query(..., alias='adversaire')
+):
+    """
+    Route permettant d'accéder au bilan des confrontations directes entre deux équipes
+
+    - **equipe** : Nom de la première équipe
+    - **adversaire** : Nom de la seconde équipe
+
+    *Renvoie le bilan de chaque paire d'équipes correspondant aux deux noms : nombre de matchs, victoires de chaque
+    équipe (dont à domicile), nuls, buts marqués par chaque équipe et les 10 dernières confrontations*
+    """
+    return await read_through(request, '/confrontations', {'equipe': team, 'adversaire': opponent},
+                              lambda: load_for_teams(request, team, lambda team_ids: load_for_teams(
+                                  request, opponent, lambda opponent_ids: database.mongodb(
+                                      queries.find_head_to_head, team_ids, opponent_ids))))
+
+@app.get('/forme', dependencies=[Depends(verify_token)])
+async def get_form(
+        request: Request,
+        database: Database = Depends(get_database),
+        season: int = Query(..., alias='saison'),
+        league: str = Query('Ligue 1', alias='championnat'),
+        matchday: Optional[int] = Query(None, alias='journee')
+):
+    """
+    Route permettant d'accéder aux caractéristiques de forme des deux équipes de chaque match d'une journée,
+    calculées sur les matchs joués avant le match
+
+    - **saison** : Année de début de la saison
+    - **championnat** : Championnat à sélectionner ('Ligue 1' par défaut)
+    - **journee** : Journée à sélectionner (par défaut la prochaine journée dont un match n'a pas été joué)
+
+    *Renvoie les matchs de la journée avec, pour chaque équipe, le nombre de matchs joués, la forme (V, N, D)
+    et les moyennes des 5 derniers matchs (points, buts marqués et encaissés, à domicile et à l'extérieur)
+    et le nombre de jours de repos*
+    """
+    if league not in queries.LEAGUES:
+        raise HTTPException(status_code=400, detail="Unknown league")
+
+    params = {'saison': season, 'championnat': league, 'journee': matchday}
+    return await read_through(request, '/forme', params,
+                              lambda: database.mongodb(matchday_features, league, season, matchday))
+
+@app.get('/simulation', dependencies=[Depends(verify_token)])
+async def get_simulation(
+        request: Request,
+        database: Database = Depends(get_database),
+        season: int = Query(..., alias='saison'),
+        league: str = Query('Ligue 1', alias='championnat'),
+        simulations: int = Query(SIMULATIONS, alias='simulations', ge=1, le=1_000_000),
+        seed: int = Query(0, alias='graine', ge=0)
+):
+    """
+    Route permettant de simuler la fin d'une saison (méthode de Monte-Carlo) à partir du classement actuel,
+    les scores des matchs restants étant tirés selon le modèle de la route /predictions. Les égalités de points
+    sont départagées selon le règlement du championnat : différence de buts, puis points, différence de buts
+    et buts marqués dans les confrontations directes, puis buts marqués et enfin tirage au sort
+
+    - **saison** : Année de début de la saison
+    - **championnat** : Championnat à sélectionner ('Ligue 1' par défaut, ou 'Ligue 2')
+    - **simulations** : Nombre de simulations (100 000 par défaut)
+    - **graine** : Graine des tirages (0 par défaut, le même résultat est renvoyé pour la même graine)
+
+    *Renvoie pour chaque équipe les points et la position attendus, les probabilités de chaque zone du classement
+    et de chaque position finale, triés par position attendue*
+    """
+    if league not in queries.LEAGUES:
+        raise HTTPException(status_code=400, detail="Unknown league")
+
+    async def load():
+        try:
+            fixtures, played, model = await database.mongodb(remaining_fixtures, league, season)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Not enough results to fit the model")
+        table = await reference_query(database, 'select_rankings', season, 'TOTAL', None, league, 100)
+        if not table and not fixtures:
+            return []
+        # Une part des simulations par processus du pool, soumise depuis la boucle d'événements : aucun thread
+        # de l'exécuteur des requêtes n'est occupé pendant le calcul (thread par défaut d'asyncio sans pool)
+        executor = getattr(request.app.state, 'simulation_executor', None)
+        shards = request.app.state.simulation_workers if executor is not None else 1
+        inputs = simulation_inputs(table, fixtures, played, model, league)
+        loop = asyncio.get_running_loop()
+        counts = await asyncio.gather(*(loop.run_in_executor(executor, simulate_shard, *arguments)
+                                        for arguments in shard_arguments(inputs, simulations, shards, seed)))
+        return simulation_results(inputs, sum(counts), simulations, league)
+
+    params = {'saison': season, 'championnat': league, 'simulations': simulations, 'graine': seed}
+    return await read_through(request, '/simulation', params, load)
+
+# Nombre maximum d'éléments par liste dans une requête de la route /lot
+BATCH_MAX_ITEMS = config_int('BATCH_MAX_ITEMS', 200)
+
+class RankingLookup(BaseModel):
+    saison: int
+    championnat: Optional[str] = None
+    type: Optional[str] = None
+    equipe: Optional[int] = None  # Identifiant de l'équipe
+
+class BatchRequest(BaseModel):
+    equipes: list[int] = Field([], max_length=BATCH_MAX_ITEMS)  # Identifiants des équipes
+    joueurs: list[int] = Field([], max_length=BATCH_MAX_ITEMS)  # Identifiants des joueurs
+    effectifs: list[int] = Field([], max_length=BATCH_MAX_ITEMS)  # Identifiants des équipes dont on veut les joueurs
+    classements: list[RankingLookup] = Field([], max_length=BATCH_MAX_ITEMS)
+
+@app.post('/lot', dependencies=[Depends(verify_token)])
+async def get_batch(
+        batch: BatchRequest,
+        database: Database = Depends(get_database)
+):
+    """
+    Route permettant de récupérer en une seule requête plusieurs équipes, joueurs, effectifs et classements
+
+    - **equipes**: Liste d'identifiants d'équipes
+    - **joueurs**: Liste d'identifiants de joueurs
+    - **effectifs**: Liste d'identifiants d'équipes dont on veut la liste des joueurs
+    - **classements**: Liste de recherches de classement (**saison**, et optionnellement **championnat**, **type** et **equipe**)
+
+    *Renvoie les équipes, joueurs et effectifs indexés par identifiant (les identifiants inconnus sont absents),
+    et les classements dans l'ordre des recherches*
+    """
+    lookups = [{'season': lookup.saison, 'league': lookup.championnat, 'type': lookup.type, 'team_id': lookup.equipe}
+               for lookup in batch.classements]
+    return FastJSONResponse(await database.mysql(queries.select_batch,
+                                                 sorted(set(batch.equipes)),
+                                                 sorted(set(batch.joueurs)),
+                                                 sorted(set(batch.effectifs)),
+                                                 lookups))
+
+# Taille des lots lus en base par les routes d'export
+EXPORT_BATCH_SIZE = config_int('EXPORT_BATCH_SIZE', 1000)
+
+def export_response(batches, format_: str, filename: str, columns: list) -> StreamingResponse:
+    """
+    Fonction qui construit la réponse en flux d'une route d'export
+
+    :param batches: Générateur asynchrone de lots de lignes
+    :param format_: Format de sortie ('ndjson' ou 'csv')
+    :param filename: Nom du fichier proposé au client (sans extension)
+    :param columns: Colonnes du CSV
+    :return: Réponse envoyée au fur et à mesure de la lecture en base
+    """
+    lines = csv_lines(batches, columns) if format_ == 'csv' else ndjson_lines(batches)
+    return StreamingResponse(lines, media_type=EXPORT_FORMATS[format_],
+                             headers={'Content-Disposition': f'attachment; filename="{filename}.{format_}"'})
+
+@app.get('/export/joueurs', dependencies=[Depends(verify_token)])
+async def export_players(
+        database: Database = Depends(get_database),
+        format_: Literal['ndjson', 'csv'] = Query('ndjson', alias='format')
+):
+    """
+    Route permettant d'exporter l'ensemble des joueurs
+
+    - **format**: Format de sortie ('ndjson' par défaut, ou 'csv')
+
+    *Renvoie en flux tous les joueurs, triés par identifiant*
+    """
+    query, params = queries.export_players_query()
+    return export_response(database.stream_mysql(query, params, EXPORT_BATCH_SIZE), format_, 'joueurs',
+                           queries.PLAYER_EXPORT_COLUMNS)
+
+@app.get('/export/classements', dependencies=[Depends(verify_token)])
+async def export_rankings(
+        database: Database = Depends(get_database),
+        season: Optional[int] = Query(None, alias='saison'),
+        league: Optional[str] = Query(None, alias='championnat'),
+        format_: Literal['ndjson', 'csv'] = Query('ndjson', alias='format')
+):
+    """
+    Route permettant d'exporter l'historique des classements
+
+    - **saison**: Année de début de la saison (toutes par défaut)
+    - **championnat**: Compétition à sélectionner (toutes par défaut)
+    - **format**: Format de sortie ('ndjson' par défaut, ou 'csv')
+
+    *Renvoie en flux les entrées de classement, triées par championnat, type et position*
+    """
+    query, params = queries.export_rankings_query(season, league)
+    return export_response(database.stream_mysql(query, params, EXPORT_BATCH_SIZE), format_, 'classements',
+                           queries.RANKING_EXPORT_COLUMNS)
+
+@app.get('/export/matches', dependencies=[Depends(verify_token)])
+async def export_matches(
+        database: Database = Depends(get_database),
+        season: Optional[int] = Query(None, alias='saison'),
+        league: Optional[str] = Query(None, alias='championnat'),
+        format_: Literal['ndjson', 'csv'] = Query('ndjson', alias='format')
+):
+    """
+    Route permettant d'exporter les résultats des matchs
+
+    - **saison**: Année de début de la saison (toutes par défaut)
+    - **championnat**: Championnat à sélectionner ('Ligue 1' et 'Ligue 2', tous par défaut)
+    - **format**: Format de sortie ('ndjson' par défaut, ou 'csv')
+
+    *Renvoie en flux les matchs (un document par match)*
+    """
+    batches = database.stream_mongodb(MATCH_RESULTS_COLLECTION, queries.match_filter(season, league),
+                                      [('_id', 1)], EXPORT_BATCH_SIZE, queries.MATCH_PROJECTION)
+    return export_response(batches, format_, 'matches', MATCH_EXPORT_COLUMNS)
+
+@app.get('/statistiques', dependencies=[Depends(verify_token)])
+async def get_statistics(
+        database: Database = Depends(get_database)
+):
+    """
+    Route permettant de suivre l'état interne de l'API
+
+    *Renvoie les métriques du pool de connexions MySQL (connexions utilisées, en attente, créées...),
+    des caches (tokens vérifiés, réponses) et de l'instantané des tables de référence (mode instantané)*
+    """
+    return {'mysql_pool': database.mysql_pool.stats(),
+            'token_cache': token_cache.stats(),
+            'response_cache': response_cache.stats(),
+            'snapshot': (await app.state.snapshot.get()).stats() if app.state.snapshot is not None else None}
+
+def mysql_pool_stats() -> Optional[dict]:
+    """
+    Fonction qui renvoie les compteurs du pool MySQL (None avant le démarrage de l'API)
+    """
+    database = getattr(app.state, 'database', None)
+    return database.mysql_pool.stats() if database else None
+
+# Compteurs internes publiés sur /metrics (les autres valeurs sont des jauges)
+register_stats({'mysql_pool': mysql_pool_stats,
+                'token_cache': token_cache.stats,
+                'response_cache': response_cache.stats,
+                'prediction_batcher': prediction_batcher.stats,
+                'prediction_cache': prediction_cache.stats,
+                'standings_cache': standings_cache.stats},
+               counters={'created', 'closed', 'timeouts', 'hits', 'misses', 'evictions', 'invalidations',
+                         'batches', 'items', 'warmed'})
+
+@app.get('/metrics', include_in_schema=False)
+async def get_metrics():
+    """
+    Route qui expose les métriques de l'API au format Prometheus
+    """
+    content, media_type = latest_metrics()
+    return Response(content, media_type=media_type)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,107 @@
+"""
+Benchmark des routes d'export : débit (lignes/s) et pic de mémoire selon le nombre de lignes exportées.
+
+Compare la route en flux /export/joueurs avec une lecture complète en mémoire (fetchall puis
+encodage JSON de la liste), équivalente à parcourir toute la table avec /joueurs. À lancer depuis
+la racine du projet :
+
+    python benchmark/bench_export.py --rows 10000 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as api
+from src.database import ConnectionPool, Database, DatabaseExecutor
+from standins import SlowMongoClient, SyntheticConnection
+
+
+async def stream_export(token: str, format_: str) -> int:
+    """
+    Fonction qui télécharge /export/joueurs en flux sans conserver le contenu.
+    L'application ASGI est appelée directement (le transport ASGI de httpx met toute la réponse en mémoire).
+
+    :return: Nombre d'octets reçus
+    """
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': '/export/joueurs', 'raw_path': b'/export/joueurs', 'root_path': '',
+             'query_string': f'format={format_}'.encode(), 'server': ('bench', 80), 'client': ('127.0.0.1', 0),
+             'headers': [(b'authorization', f'Bearer {token}'.encode())]}
+    received = 0
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal received
+        if message['type'] == 'http.response.start' and message['status'] != 200:
+            raise RuntimeError(f"HTTP {message['status']}")
+        if message['type'] == 'http.response.body':
+            received += len(message.get('body', b''))
+
+    await api.app(scope, receive, send)
+    disconnected.set()
+    return received
+
+
+def materialized(count: int) -> int:
+    """
+    Fonction qui reproduit une lecture complète : toutes les lignes puis tout le JSON en mémoire
+
+    :return: Nombre d'octets produits
+    """
+    cursor = SyntheticConnection(count).cursor(dictionary=True)
+    cursor.execute("SELECT * FROM Player")
+    return len(json.dumps(cursor.fetchall(), default=str).encode())
+
+
+def measure(func, *args):
+    """
+    Fonction qui mesure la durée et le pic d'allocation mémoire d'un appel
+
+    :return: Tuple (durée en secondes, pic mémoire en Mo)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help="Nombre de lignes exportées")
+    args = parser.parse_args()
+
+    api.config.setdefault('SECRET_KEY', 'benchmark-secret-key-benchmark-secret')
+    token = api.create_jwt(3600)
+
+    print(f"{'lignes':>10}{'mode':>14}{'lignes/s':>14}{'pic mémoire (Mo)':>20}")
+    for count in args.rows:
+        api.app.state.database = Database(ConnectionPool(lambda: SyntheticConnection(count)),
+                                          SlowMongoClient(0, []), DatabaseExecutor(max_workers=2))
+        results = {'complet': measure(materialized, count)}
+        for format_ in ('ndjson', 'csv'):
+            results[format_] = measure(lambda: asyncio.run(stream_export(token, format_)))
+        api.app.state.database.close()
+        for mode, (elapsed, peak) in results.items():
+            print(f"{count:>10}{mode:>14}{count / elapsed:>14.0f}{peak:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark de la sérialisation JSON des réponses : durée d'encodage selon le nombre de lignes.
+
+Compare le chemin générique de FastAPI (jsonable_encoder puis JSONResponse) avec l'encodage direct
+de src/serialization.py, avec l'encodeur de la bibliothèque standard et avec orjson s'il est installé.
+À lancer depuis la racine du projet :
+
+    python benchmark/bench_json.py --rows 1000 10000 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from src import serialization
+from standins import synthetic_player
+
+
+def generic(rows: list) -> bytes:
+    """
+    Fonction qui reproduit le chemin de FastAPI pour une route qui renvoie une liste de lignes
+    """
+    return JSONResponse(jsonable_encoder(rows)).body
+
+
+def direct(rows: list) -> bytes:
+    """
+    Fonction qui encode les lignes avec src/serialization.py (encodeur actif : orjson s'il est installé)
+    """
+    return serialization.dumps(rows)
+
+
+def standard_library(rows: list) -> bytes:
+    """
+    Fonction qui encode les lignes avec src/serialization.py sans orjson
+    """
+    orjson, serialization.orjson = serialization.orjson, None
+    try:
+        return serialization.dumps(rows)
+    finally:
+        serialization.orjson = orjson
+
+
+def best_of(func, rows: list, repeat: int) -> float:
+    """
+    Fonction qui renvoie la meilleure durée d'encodage sur *repeat* essais
+
+    :return: Durée en secondes
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000], help="Nombre de lignes encodées")
+    parser.add_argument('--repeat', type=int, default=5, help="Nombre d'essais par mesure")
+    args = parser.parse_args()
+
+    modes = {'jsonable_encoder': generic, 'json (direct)': standard_library}
+    if serialization.orjson is not None:
+        modes['orjson (direct)'] = direct
+
+    print(f"{'lignes':>10}{'mode':>20}{'durée (ms)':>14}{'accélération':>14}")
+    for count in args.rows:
+        rows = [synthetic_player(i) for i in range(count)]
+        # Les encodages directs produisent exactement le même JSON que le chemin générique
+        assert standard_library(rows) == generic(rows)
+        durations = {mode: best_of(func, rows, args.repeat) for mode, func in modes.items()}
+        for mode, elapsed in durations.items():
+            print(f"{count:>10}{mode:>20}{elapsed * 1000:>14.1f}{durations['jsonable_encoder'] / elapsed:>13.1f}x")
+
+
+if __name__ == '__main__':
+    main()
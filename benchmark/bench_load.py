@@ -0,0 +1,338 @@
+"""
+Test de charge de l'API : latence (p50, p95, p99) et débit de chaque route sous requêtes concurrentes.
+
+L'API est démarrée en mémoire sur des bases locales peuplées par un jeu de données synthétique
+(benchmark/dataset.py, 20 championnats × 30 saisons par défaut) : les tables MySQL dans une base SQLite,
+la collection match_results dans une collection MongoDB en mémoire. Chaque route reçoit *--requests*
+requêtes aux paramètres tirés au hasard (graine fixe), avec *--concurrency* requêtes simultanées.
+
+Le rapport JSON (--output) peut être comparé avec celui d'une autre version (--compare).
+À lancer depuis la racine du projet :
+
+    python benchmark/bench_load.py --requests 500 --concurrency 20 --output report.json
+    python benchmark/bench_load.py --compare report.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import app as api
+from src.cache import ResponseCache
+from src.database import ConnectionPool, Database, DatabaseExecutor
+from src.queries import POSITIONS, RANKING_TYPES
+from src.serialization import orjson
+from dataset import Dataset
+from standins import MemoryMongoClient, sqlite_mysql_factory
+
+
+def team_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Recherche d'une équipe par nom ou par identifiant
+    """
+    team = rng.choice(dataset.teams)
+    if rng.random() < 0.5:
+        return 'GET', '/equipe', {'nom': team['shortname']}, None
+    return 'GET', '/equipe', {'id': team['id']}, None
+
+
+def players_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Recherche de joueurs par équipe, par nom ou par poste
+    """
+    choice = rng.random()
+    if choice < 0.4:
+        return 'GET', '/joueurs', {'equipe': rng.choice(dataset.teams)['name']}, None
+    if choice < 0.7:
+        player = rng.choice(dataset.players)
+        return 'GET', '/joueurs', {'prenom': player['first_name'], 'nom': player['last_name']}, None
+    return 'GET', '/joueurs', {'position': rng.choice(POSITIONS), 'limit': 100}, None
+
+
+def rankings_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Classement d'un championnat pour une saison et un type, ou historique d'une équipe
+    """
+    if rng.random() < 0.7:
+        return 'GET', '/classements', {'saison': rng.choice(dataset.seasons),
+                                       'championnat': rng.choice(dataset.league_names),
+                                       'type': rng.choice(RANKING_TYPES), 'limit': 20}, None
+    return 'GET', '/classements', {'equipe': rng.choice(dataset.teams)['name'], 'limit': 50}, None
+
+
+def standings_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Classement d'un championnat à l'issue d'une journée, calculé à partir des résultats
+    """
+    return 'GET', '/classements', {'saison': rng.choice(dataset.seasons),
+                                   'championnat': rng.choice(dataset.league_names),
+                                   'type': rng.choice(RANKING_TYPES), 'journee': rng.randint(1, 38), 'limit': 20}, None
+
+
+def matches_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Journée d'un championnat, ou matchs d'une équipe sur une saison
+    """
+    season = rng.choice(dataset.seasons)
+    if rng.random() < 0.6:
+        return 'GET', '/matches', {'saison': season, 'championnat': rng.choice(['Ligue 1', 'Ligue 2']),
+                                   'journee': rng.randint(1, 38)}, None
+    return 'GET', '/matches', {'equipe': rng.choice(dataset.teams)['name'], 'debut': f'{season}-08-01',
+                               'fin': f'{season + 1}-06-30', 'limit': 38}, None
+
+
+def predictions_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Prédiction d'une journée de Ligue 1 ou de Ligue 2
+    """
+    return 'GET', '/predictions', {'saison': rng.choice(dataset.seasons[1:] or dataset.seasons),
+                                   'championnat': rng.choice(['Ligue 1', 'Ligue 2']),
+                                   'journee': rng.randint(1, 38)}, None
+
+
+def match_prediction_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Prédiction d'un match de la prochaine journée de Ligue 1 ou de Ligue 2 (journée 20 de la dernière saison) :
+    les demandes simultanées portent sur les mêmes journées et sont regroupées
+    """
+    season = f'{dataset.seasons[-1]}-{dataset.seasons[-1] + 1}'
+    match = rng.choice(dataset.matches)
+    while match['league'] not in ('Ligue 1', 'Ligue 2') or match['season'] != season or match['matchday'] != 20:
+        match = rng.choice(dataset.matches)
+    return 'GET', '/predictions/match', {'id': str(match['_id'])}, None
+
+
+def head_to_head_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Confrontations directes entre deux équipes d'un même championnat
+    """
+    first, second = rng.sample(dataset.teams_by_league[rng.choice(dataset.league_names)], 2)
+    names = {team['id']: team['name'] for team in dataset.teams}
+    return 'GET', '/confrontations', {'equipe': names[first], 'adversaire': names[second]}, None
+
+
+def form_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Caractéristiques de forme des équipes d'une journée de Ligue 1 ou de Ligue 2
+    """
+    return 'GET', '/forme', {'saison': rng.choice(dataset.seasons), 'championnat': rng.choice(['Ligue 1', 'Ligue 2']),
+                             'journee': rng.randint(1, 38)}, None
+
+
+def ratings_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Classement Elo de toutes les équipes, ou historique Elo d'une équipe sur une saison
+    """
+    if rng.random() < 0.5:
+        return 'GET', '/elo', {'limit': 50}, None
+    season = rng.choice(dataset.seasons)
+    return 'GET', '/elo/historique', {'equipe': rng.choice(dataset.teams)['name'], 'debut': f'{season}-08-01',
+                                      'fin': f'{season + 1}-06-30'}, None
+
+
+def batch_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Lot de 10 équipes, 20 joueurs, 3 effectifs et 5 classements
+    """
+    body = {'equipes': [team['id'] for team in rng.sample(dataset.teams, 10)],
+            'joueurs': [player['id'] for player in rng.sample(dataset.players, 20)],
+            'effectifs': [team['id'] for team in rng.sample(dataset.teams, 3)],
+            'classements': [{'saison': rng.choice(dataset.seasons), 'championnat': rng.choice(dataset.league_names),
+                             'type': 'TOTAL'} for _ in range(5)]}
+    return 'POST', '/lot', None, body
+
+
+def export_request(rng: random.Random, dataset: Dataset) -> tuple:
+    """
+    Export des classements d'une saison (tous les championnats)
+    """
+    return 'GET', '/export/classements', {'saison': rng.choice(dataset.seasons)}, None
+
+
+# Scénario de chaque route : fonction (générateur aléatoire, jeu de données) -> (méthode, chemin, paramètres, corps)
+SCENARIOS = {'/equipe': team_request,
+             '/joueurs': players_request,
+             '/classements': rankings_request,
+             '/classements?journee': standings_request,
+             '/matches': matches_request,
+             '/predictions': predictions_request,
+             '/predictions/match': match_prediction_request,
+             '/confrontations': head_to_head_request,
+             '/forme': form_request,
+             '/elo': ratings_request,
+             '/lot': batch_request,
+             '/export/classements': export_request}
+
+
+def percentiles(latencies: list) -> dict:
+    """
+    Fonction qui résume une liste de latences (secondes) en millisecondes
+
+    :param latencies: Latences des requêtes
+    :return: Dictionnaire p50, p95, p99, moyenne et maximum
+    """
+    if len(latencies) < 2:
+        latencies = latencies * 2 or [0.0, 0.0]
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {'p50_ms': round(quantiles[49] * 1000, 3), 'p95_ms': round(quantiles[94] * 1000, 3),
+            'p99_ms': round(quantiles[98] * 1000, 3), 'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+            'max_ms': round(max(latencies) * 1000, 3)}
+
+
+async def run_scenario(client: httpx.AsyncClient, requests: list, concurrency: int, headers: dict) -> dict:
+    """
+    Fonction qui envoie les requêtes d'un scénario avec *concurrency* clients simultanés
+
+    :param client: Client HTTP branché sur l'API
+    :param requests: Requêtes à envoyer (méthode, chemin, paramètres, corps)
+    :param concurrency: Nombre de requêtes simultanées
+    :param headers: En-têtes envoyés avec chaque requête (authentification)
+    :return: Résultats du scénario (nombre de requêtes, erreurs, débit et latences)
+    """
+    pending = iter(requests)
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for method, path, params, body in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body, headers=headers)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {'requests': len(requests), 'errors': errors, 'requests_per_second': round(len(requests) / elapsed, 1),
+            **percentiles(latencies)}
+
+
+async def run_load(database: Database, dataset: Dataset, args) -> dict:
+    """
+    Fonction qui démarre l'API sur les bases locales puis exécute le scénario de chaque route
+
+    :return: Dictionnaire route -> résultats
+    """
+    await api.attach_database(database, snapshot=args.snapshot)
+    headers = {'Authorization': f'Bearer {api.create_jwt(3600)}'}
+    results = {}
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        for route, scenario in SCENARIOS.items():
+            if args.routes and route not in args.routes:
+                continue
+            rng = random.Random(f'{args.seed}{route}')
+            # Requêtes de chauffe (index, instantané, connexions du pool) non mesurées
+            await run_scenario(client, [scenario(rng, dataset) for _ in range(args.warmup)], args.concurrency, headers)
+            results[route] = await run_scenario(client, [scenario(rng, dataset) for _ in range(args.requests)],
+                                                args.concurrency, headers)
+    return results
+
+
+def git_commit():
+    """
+    Fonction qui renvoie le commit courant du dépôt (None hors d'un dépôt git)
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, baseline=None):
+    """
+    Fonction qui affiche les résultats par route, avec l'écart relatif à un rapport de référence
+    """
+    columns = ('requests_per_second', 'p50_ms', 'p95_ms', 'p99_ms')
+    widths = (10, 12, 12, 12)
+    print(f"{'route':<22}{'req/s':>10}{'p50 (ms)':>12}{'p95 (ms)':>12}{'p99 (ms)':>12}{'erreurs':>10}")
+    for route, result in report['routes'].items():
+        print(f"{route:<22}" + ''.join(f"{result[column]:>{width}.1f}" for column, width in zip(columns, widths))
+              + f"{result['errors']:>10}")
+        previous = (baseline or {}).get('routes', {}).get(route)
+        if previous:
+            deltas = [(result[column] - previous[column]) / previous[column] * 100 if previous[column] else 0.0
+                      for column in columns]
+            print(f"{'  écart':<22}" + ''.join(f"{delta:>+{width - 1}.1f}%" for delta, width in zip(deltas, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help="Nombre de requêtes mesurées par route")
+    parser.add_argument('--concurrency', type=int, default=20, help="Requêtes simultanées")
+    parser.add_argument('--warmup', type=int, default=50, help="Requêtes de chauffe par route (non mesurées)")
+    parser.add_argument('--workers', type=int, default=10, help="Taille du pool MySQL et de l'exécuteur")
+    parser.add_argument('--leagues', type=int, default=20, help="Nombre de championnats du jeu de données")
+    parser.add_argument('--seasons', type=int, default=30, help="Nombre de saisons du jeu de données")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du jeu de données et des requêtes")
+    parser.add_argument('--routes', nargs='+', choices=list(SCENARIOS), help="Routes testées (toutes par défaut)")
+    parser.add_argument('--snapshot', action='store_true', help="Tables de référence servies depuis l'instantané")
+    parser.add_argument('--cache', action='store_true', help="Conserver le cache des réponses (désactivé par défaut)")
+    parser.add_argument('--batch-window', type=float,
+                        help="Fenêtre de regroupement des prédictions de matchs en millisecondes (configuration par défaut)")
+    parser.add_argument('--output', help="Fichier du rapport JSON")
+    parser.add_argument('--compare', help="Rapport JSON de référence (ex : version précédente)")
+    args = parser.parse_args()
+
+    api.config.setdefault('SECRET_KEY', 'benchmark-secret-key-benchmark-secret')
+    if not args.cache:
+        # Sans cache, chaque requête atteint les bases : on mesure les requêtes et non le cache
+        api.response_cache = ResponseCache(maxsize=0)
+    if args.batch_window is not None:
+        api.prediction_batcher.window = args.batch_window / 1000
+
+    start = time.perf_counter()
+    dataset = Dataset(leagues=args.leagues, seasons=args.seasons, seed=args.seed)
+    print(f"Jeu de données : {dataset.stats()} ({time.perf_counter() - start:.1f} s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'football_predictor.sqlite')
+        dataset.write_sqlite(path)
+        database = Database(ConnectionPool(sqlite_mysql_factory(path), size=args.workers),
+                            MemoryMongoClient(dataset.mongodb_collections()),
+                            DatabaseExecutor(max_workers=args.workers))
+        try:
+            routes = asyncio.run(run_load(database, dataset, args))
+        finally:
+            database.close()
+
+    report = {'metadata': {'api_version': api.app.version,
+                           'git_commit': git_commit(),
+                           'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                           'python': platform.python_version(),
+                           'json_encoder': 'orjson' if orjson is not None else 'json',
+                           'dataset': dataset.stats(),
+                           'options': {'requests': args.requests, 'concurrency': args.concurrency,
+                                       'warmup': args.warmup, 'workers': args.workers, 'seed': args.seed,
+                                       'snapshot': args.snapshot, 'cache': args.cache,
+                                       'batch_window_ms': api.prediction_batcher.window * 1000}},
+              'routes': routes}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"Rapport écrit dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
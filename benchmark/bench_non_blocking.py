@@ -0,0 +1,87 @@
+"""
+Benchmark du débit de l'API sous requêtes concurrentes avec une base de données lente simulée.
+
+Compare l'ancien comportement (appels bloquants exécutés directement dans la boucle d'événements)
+avec l'exécuteur dédié aux requêtes. À lancer depuis la racine du projet :
+
+    python benchmark/bench_non_blocking.py --requests 200 --concurrency 20 --delay 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import app as api
+from src.cache import ResponseCache
+from src.database import ConnectionPool, Database, DatabaseExecutor
+from standins import SlowMongoClient, slow_mysql_factory
+
+ROUTES = ['/equipe', '/joueurs', '/classements', '/matches']
+
+
+class InlineExecutor:
+    """
+    Exécuteur qui reproduit l'ancien comportement : l'appel bloquant s'exécute dans la boucle d'événements
+    """
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    def shutdown(self):
+        pass
+
+
+async def run_load(database: Database, route: str, total: int, concurrency: int, token: str) -> float:
+    """
+    Fonction qui démarre l'API sur *database* puis envoie *total* requêtes sur *route*
+    avec *concurrency* requêtes simultanées
+
+    :return: Nombre de requêtes traitées par seconde
+    """
+    await api.attach_database(database)
+    transport = httpx.ASGITransport(app=api.app)
+    headers = {'Authorization': f'Bearer {token}'}
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def one():
+            async with semaphore:
+                response = await client.get(route, headers=headers)
+                response.raise_for_status()
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help="Nombre de requêtes par route")
+    parser.add_argument('--concurrency', type=int, default=20, help="Requêtes simultanées")
+    parser.add_argument('--delay', type=float, default=0.02, help="Durée simulée d'une requête en base (secondes)")
+    parser.add_argument('--workers', type=int, default=10, help="Taille du pool MySQL et de l'exécuteur")
+    args = parser.parse_args()
+
+    api.config.setdefault('SECRET_KEY', 'benchmark-secret-key-benchmark-secret')
+    token = api.create_jwt(3600)
+    # Cache des réponses désactivé : chaque requête doit atteindre la base simulée
+    api.response_cache = ResponseCache(maxsize=0)
+    # Lignes compatibles avec toutes les routes (clés de pagination comprises)
+    rows = [{'id': i, '_id': i, 'name': f'Equipe {i}', 'shortname': f'E{i}', 'league_id': 1, 'team_id': i, 'type': 'TOTAL',
+             'position': i + 1, 'season': '2022-2023', 'matchday': 1} for i in range(10)]
+
+    print(f"{'route':<14}{'bloquant (req/s)':>20}{'exécuteur (req/s)':>20}{'gain':>8}")
+    for route in ROUTES:
+        results = []
+        for executor in (InlineExecutor(), DatabaseExecutor(max_workers=args.workers)):
+            pool = ConnectionPool(slow_mysql_factory(args.delay, rows), size=args.workers)
+            database = Database(pool, SlowMongoClient(args.delay, rows), executor)
+            results.append(asyncio.run(run_load(database, route, args.requests, args.concurrency, token)))
+            database.close()
+        print(f"{route:<14}{results[0]:>20.1f}{results[1]:>20.1f}{results[1] / results[0]:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
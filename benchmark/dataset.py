@@ -0,0 +1,248 @@
+"""
+Jeu de données synthétique des benchmarks : championnats, équipes, joueurs, encadrement, classements
+et un document par match, générés de façon reproductible à partir d'une graine.
+
+Par défaut, 20 championnats de 20 équipes sur 30 saisons (≈ 228 000 matchs, 36 000 entrées de classement,
+10 000 joueurs). Les classements sont calculés à partir des matchs générés.
+"""
+import datetime
+import math
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from src.elo import ELO_HISTORY_COLLECTION, ELO_RATINGS_COLLECTION, EloRatings
+from src.features import FORM_COLLECTION, FORM_HISTORY_COLLECTION, FormTracker
+from src.head_to_head import HEAD_TO_HEAD_COLLECTION, HeadToHead
+from src.match_results import MATCH_RESULTS_COLLECTION
+from src.queries import POSITIONS, RANKING_TYPES
+from standins import SQLITE_SCHEMA, MemoryCollection
+
+FIRST_NAMES = ['Lucas', 'Hugo', 'Louis', 'Nathan', 'Enzo', 'Mathis', 'Thomas', 'Théo', 'Antoine', 'Maxime',
+               'Kylian', 'Ousmane', 'Moussa', 'Yanis', 'Adrien', 'Benjamin', 'Rayan', 'Julien', 'Karim', 'Samir']
+LAST_NAMES = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau',
+              'Simon', 'Laurent', 'Lefèvre', 'Michel', 'Garcia', 'David', 'Bertrand', 'Roux', 'Vincent', 'Fournier',
+              'Diallo', 'Traoré', 'Camara', 'Mendy', 'Koné', 'Sylla', 'Da Silva', 'Lopes', 'Ndiaye', 'Diop']
+CLUB_PREFIXES = ['AS', 'FC', 'Olympique', 'Stade', 'Racing', 'SC', 'US', 'AC', 'ES', 'AJ']
+SYLLABLES = ['bor', 'lan', 'mar', 'ville', 'mont', 'sur', 'nes', 'ber', 'gne', 'tou', 'lon', 'ran',
+             'vau', 'cha', 'teau', 'bri', 'sac', 'fort', 'dun', 'pel']
+STAFF_ROLES = ['Entraineur', 'Entraineur des gardiens', 'Adjoint', 'Preparateur physique']
+FIRST_SEASON = 1995
+
+
+def league_names(count: int) -> list:
+    """
+    Fonction qui renvoie les noms des *count* championnats (Ligue 1 et Ligue 2 en premier, comme dans la base)
+    """
+    names = ['Ligue 1', 'Ligue 2', 'National']
+    return (names + [f'Division {number}' for number in range(len(names) + 1, count + 1)])[:count]
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """
+    Fonction qui tire un nombre de buts selon une loi de Poisson de moyenne *mean*
+    """
+    threshold, count, product = math.exp(-mean), 0, rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def round_robin(team_ids: list) -> list:
+    """
+    Fonction qui construit le calendrier aller-retour d'un championnat (méthode du cercle)
+
+    :param team_ids: Identifiants des équipes (nombre pair)
+    :return: Liste des journées, chacune liste de tuples (domicile, extérieur)
+    """
+    teams = list(team_ids)
+    first_leg = []
+    for round_ in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(len(teams) // 2)]
+        first_leg.append([pair if round_ % 2 == 0 else pair[::-1] for pair in pairs])
+        teams.insert(1, teams.pop())
+    return first_leg + [[(away, home) for home, away in matchday] for matchday in first_leg]
+
+
+def standings(team_ids: list, results: list) -> dict:
+    """
+    Fonction qui calcule les classements TOTAL, HOME et AWAY d'une saison (3 points par victoire)
+
+    :param team_ids: Identifiants des équipes
+    :param results: Tuples (domicile, extérieur, buts domicile, buts extérieur)
+    :return: Dictionnaire type -> liste des lignes triées par position
+    """
+    tables = {type_: {team_id: {'team_id': team_id, 'points': 0, 'played': 0, 'goals_for': 0, 'goals_against': 0,
+                                'won': 0, 'draw': 0, 'lost': 0} for team_id in team_ids} for type_ in RANKING_TYPES}
+    for home, away, home_goals, away_goals in results:
+        for type_, team_id, scored, conceded in (('HOME', home, home_goals, away_goals),
+                                                 ('AWAY', away, away_goals, home_goals)):
+            for row in (tables[type_][team_id], tables['TOTAL'][team_id]):
+                row['played'] += 1
+                row['goals_for'] += scored
+                row['goals_against'] += conceded
+                outcome = 'won' if scored > conceded else 'draw' if scored == conceded else 'lost'
+                row[outcome] += 1
+                row['points'] += {'won': 3, 'draw': 1, 'lost': 0}[outcome]
+    ranked = {}
+    for type_, table in tables.items():
+        rows = sorted(table.values(), key=lambda row: (-row['points'], row['goals_against'] - row['goals_for'],
+                                                       -row['goals_for'], row['team_id']))
+        ranked[type_] = [{**row, 'type': type_, 'position': position} for position, row in enumerate(rows, 1)]
+    return ranked
+
+
+class Dataset:
+    """
+    Jeu de données synthétique : lignes des tables MySQL et documents de la collection match_results
+    """
+
+    def __init__(self, leagues: int = 20, seasons: int = 30, teams_per_league: int = 20,
+                 players_per_team: int = 25, seed: int = 0):
+        """
+        :param leagues: Nombre de championnats
+        :param seasons: Nombre de saisons (à partir de 1995)
+        :param teams_per_league: Nombre d'équipes par championnat (pair)
+        :param players_per_team: Nombre de joueurs par équipe
+        :param seed: Graine du générateur aléatoire
+        """
+        rng = random.Random(seed)
+        self.league_names = league_names(leagues)
+        self.seasons = list(range(FIRST_SEASON, FIRST_SEASON + seasons))
+
+        self.teams, names = [], set()
+        while len(self.teams) < leagues * teams_per_league:
+            town = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+            name = f'{rng.choice(CLUB_PREFIXES)} {town}'
+            if name in names:
+                continue
+            names.add(name)
+            self.teams.append({'id': len(self.teams) + 1, 'name': name, 'shortname': town,
+                               'stadium': f'Stade de {town}', 'founded': rng.randint(1880, 1990)})
+        self.teams.append({'id': 999, 'name': 'Equipe inconnue', 'shortname': 'Inconnu',
+                           'stadium': 'Stade inconnu', 'founded': 1900})
+        self.teams_by_league = {name: [team['id'] for team in self.teams[index * teams_per_league:
+                                                                         (index + 1) * teams_per_league]]
+                                for index, name in enumerate(self.league_names)}
+
+        self.players, self.staff = [], []
+        for team in self.teams[:-1]:
+            for number in range(players_per_team):
+                self.players.append({'id': len(self.players) + 1, 'first_name': rng.choice(FIRST_NAMES),
+                                     'last_name': rng.choice(LAST_NAMES),
+                                     'birthdate': datetime.date(1985, 1, 1) + datetime.timedelta(rng.randrange(7000)),
+                                     'nationality': 'France', 'position': POSITIONS[number % len(POSITIONS)],
+                                     'team_id': team['id']})
+            for role in STAFF_ROLES:
+                self.staff.append({'id': len(self.staff) + 1, 'first_name': rng.choice(FIRST_NAMES),
+                                   'last_name': rng.choice(LAST_NAMES),
+                                   'birthdate': datetime.date(1960, 1, 1) + datetime.timedelta(rng.randrange(7000)),
+                                   'nationality': 'France', 'role': role, 'team_id': team['id']})
+
+        # Force de chaque équipe (constante d'une saison à l'autre) : les classements ne sont pas uniformes
+        strength = {team['id']: rng.uniform(0.7, 1.4) for team in self.teams}
+        # Références d'équipe et scores partagés entre documents pour limiter la mémoire
+        references = {team['id']: {'id': team['id'], 'name': team['name']} for team in self.teams}
+        scores = {}
+        self.leagues, self.rankings, self.matches = [], [], []
+        for season in self.seasons:
+            season_label = f'{season}-{season + 1}'
+            for name, team_ids in self.teams_by_league.items():
+                league_id = len(self.leagues) + 1
+                self.leagues.append({'id': league_id, 'name': name, 'country': 'France', 'season': season})
+                results = []
+                for matchday, pairs in enumerate(round_robin(team_ids), 1):
+                    date = (datetime.date(season, 8, 1) + datetime.timedelta(weeks=matchday - 1)).isoformat()
+                    for home, away in pairs:
+                        home_goals = poisson(rng, 1.5 * strength[home] / strength[away])
+                        away_goals = poisson(rng, 1.1 * strength[away] / strength[home])
+                        home_half, away_half = rng.randint(0, home_goals), rng.randint(0, away_goals)
+                        results.append((home, away, home_goals, away_goals))
+                        # Identifiants croissants dans l'ordre de génération (saison, journée) : reproductibles
+                        self.matches.append({'_id': ObjectId(f'{len(self.matches) + 1:024x}'), 'league': name,
+                                             'season': season_label, 'matchday': matchday, 'date': date,
+                                             'home_team': references[home], 'away_team': references[away],
+                                             'score': scores.setdefault((home_goals, away_goals),
+                                                                        {'home': home_goals, 'away': away_goals}),
+                                             'score_halftime': scores.setdefault((home_half, away_half),
+                                                                                 {'home': home_half,
+                                                                                  'away': away_half})})
+                for rows in standings(team_ids, results).values():
+                    self.rankings.extend({**row, 'league_id': league_id} for row in rows)
+
+    def write_sqlite(self, path: str):
+        """
+        Fonction qui écrit les tables MySQL dans une base SQLite (utilisée par les SQLiteConnection des benchmarks)
+
+        :param path: Chemin du fichier SQLite (remplacé s'il existe)
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        connection = sqlite3.connect(path)
+        try:
+            connection.executescript(SQLITE_SCHEMA)
+            for table, rows in (('Team', self.teams), ('League', self.leagues), ('Player', self.players),
+                                ('Staff', self.staff), ('Ranking', self.rankings)):
+                columns = list(rows[0])
+                connection.executemany(f"INSERT INTO {table} ({', '.join(columns)}) "
+                                       f"VALUES ({', '.join('?' * len(columns))})",
+                                       [[row[column] for column in columns] for row in rows])
+            connection.commit()
+        finally:
+            connection.close()
+
+    def mongodb_collections(self) -> dict:
+        """
+        Fonction qui renvoie les collections MongoDB en mémoire du jeu de données
+
+        :return: Dictionnaire nom de la collection -> MemoryCollection
+        """
+        # Classements Elo calculés sur tous les matchs, comme après src/update_ratings.py --rebuild
+        played = sorted(self.matches, key=lambda match: (match['date'], match['_id']))
+        ratings = EloRatings()
+        history = ratings.apply_all(played)
+        for number, entry in enumerate(history, 1):
+            entry['_id'] = ObjectId(f'{number:024x}')
+        # Forme des équipes calculée sur tous les matchs, comme après src/update_features.py --rebuild
+        form = FormTracker()
+        form_history = form.apply_all(played)
+        for number, entry in enumerate(form_history, 1):
+            entry['_id'] = ObjectId(f'{number:024x}')
+        # Confrontations directes, comme après src/update_head_to_head.py --rebuild
+        head_to_head = HeadToHead()
+        head_to_head.apply_all(played)
+        for match in self.matches:
+            match['form_built'] = match['h2h_built'] = True
+        return {MATCH_RESULTS_COLLECTION: MemoryCollection(MATCH_RESULTS_COLLECTION, self.matches),
+                ELO_RATINGS_COLLECTION: MemoryCollection(ELO_RATINGS_COLLECTION,
+                                                         [{'_id': team_id, **state}
+                                                          for team_id, state in ratings.ratings.items()],
+                                                         order=('_id',), indexed=('_id',)),
+                ELO_HISTORY_COLLECTION: MemoryCollection(ELO_HISTORY_COLLECTION, history,
+                                                         order=('date', 'match_id', 'team_id'),
+                                                         indexed=('team_id',)),
+                FORM_COLLECTION: MemoryCollection(FORM_COLLECTION,
+                                                  [{'_id': team_id, **state} for team_id, state in form.states.items()],
+                                                  order=('_id',), indexed=('_id',)),
+                FORM_HISTORY_COLLECTION: MemoryCollection(FORM_HISTORY_COLLECTION, form_history,
+                                                          order=('date', 'match_id', 'team_id'),
+                                                          indexed=('match_id', 'team_id')),
+                HEAD_TO_HEAD_COLLECTION: MemoryCollection(HEAD_TO_HEAD_COLLECTION,
+                                                          [{'_id': key, **pair}
+                                                           for key, pair in head_to_head.pairs.items()],
+                                                          order=('_id',), indexed=('_id',))}
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie la taille du jeu de données
+
+        :return: Dictionnaire nom de la table ou collection -> nombre de lignes
+        """
+        return {'leagues': len(self.league_names), 'seasons': len(self.seasons), 'teams': len(self.teams),
+                'players': len(self.players), 'staff': len(self.staff), 'rankings': len(self.rankings),
+                'matches': len(self.matches)}
@@ -0,0 +1,403 @@
+import datetime
+import itertools
+import sqlite3
+import time
+from typing import Optional
+
+
+class SlowCursor:
+    """
+    Curseur factice qui simule une requête MySQL lente (appel bloquant)
+    """
+
+    def __init__(self, delay: float, rows: list):
+        self.delay = delay
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        time.sleep(self.delay)
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class SlowConnection:
+    """
+    Connexion MySQL factice dont chaque requête bloque pendant *delay* secondes
+    """
+
+    def __init__(self, delay: float, rows: list):
+        self.delay = delay
+        self.rows = rows
+
+    def cursor(self, dictionary=False):
+        return SlowCursor(self.delay, self.rows)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeMongoCursor:
+    """
+    Curseur MongoDB factice (itérable et fermable) sur une liste de documents
+    """
+
+    def __init__(self, documents, projection: Optional[dict] = None):
+        """
+        :param documents: Documents (itérable)
+        :param projection: Projection d'exclusion (champs de premier niveau à 0), comme celle de pymongo
+        """
+        excluded = {field for field, included in (projection or {}).items() if not included}
+        # Copie à la lecture, comme les documents renvoyés par pymongo
+        self._documents = ({key: value for key, value in document.items() if key not in excluded}
+                           for document in documents)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._documents)
+
+    def close(self):
+        pass
+
+
+class SlowCollection:
+    """
+    Collection MongoDB factice dont chaque find() bloque pendant *delay* secondes
+    """
+
+    def __init__(self, delay: float, documents: list):
+        self.delay = delay
+        self.documents = documents
+
+    def find(self, filter=None, projection=None, limit=0, **kwargs):
+        time.sleep(self.delay)
+        return FakeMongoCursor(self.documents[:limit] if limit else self.documents)
+
+
+class SlowMongoClient:
+    """
+    Client MongoDB factice : toutes les collections de toutes les bases sont des SlowCollection
+    """
+
+    def __init__(self, delay: float, documents: list):
+        self._collection = SlowCollection(delay, documents)
+
+    def __getitem__(self, name):
+        # La base et ses collections partagent le même accès par nom
+        return self if name == 'football_predictor' else self._collection
+
+    def close(self):
+        pass
+
+
+def slow_mysql_factory(delay: float, rows: list):
+    """
+    Fonction qui renvoie une fabrique de connexions MySQL lentes utilisable par ConnectionPool
+
+    :param delay: Durée de chaque requête en secondes
+    :param rows: Lignes renvoyées par chaque requête
+    :return: Fonction sans argument renvoyant une SlowConnection
+    """
+    return lambda: SlowConnection(delay, rows)
+
+
+def synthetic_player(i: int) -> dict:
+    """
+    Fonction qui génère la ligne Player numéro *i*
+
+    :param i: Numéro de la ligne
+    :return: Ligne au format de la table Player (date de naissance en datetime.date, comme le driver MySQL)
+    """
+    return {'id': i + 1, 'first_name': f'Prenom{i}', 'last_name': f'Nom{i}',
+            'birthdate': datetime.date(1990, 1, 1) + datetime.timedelta(days=i % 5000),
+            'nationality': 'France', 'position': 'Milieu', 'team_id': i % 40 + 1}
+
+
+class SyntheticCursor:
+    """
+    Curseur factice côté serveur : les lignes sont générées à la demande par fetchmany()
+    """
+
+    def __init__(self, count: int, make_row):
+        self.count = count
+        self.make_row = make_row
+        self._next = 0
+
+    def execute(self, query, params=None):
+        self._next = 0
+
+    def fetchmany(self, size: int = 1):
+        end = min(self._next + size, self.count)
+        rows = [self.make_row(i) for i in range(self._next, end)]
+        self._next = end
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(self.count - self._next)
+
+    def close(self):
+        pass
+
+
+class SyntheticConnection:
+    """
+    Connexion MySQL factice dont chaque requête renvoie *count* lignes générées par *make_row*
+    """
+
+    def __init__(self, count: int, make_row=synthetic_player):
+        self.count = count
+        self.make_row = make_row
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SyntheticCursor(self.count, self.make_row)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+# Schéma de src/football_bdd.sql traduit pour SQLite (colonnes texte insensibles à la casse, comme la collation MySQL)
+SQLITE_SCHEMA = """
+CREATE TABLE Team (id INTEGER PRIMARY KEY, name TEXT COLLATE NOCASE NOT NULL, shortname TEXT COLLATE NOCASE NOT NULL,
+                   stadium TEXT NOT NULL, founded INTEGER NOT NULL);
+CREATE TABLE League (id INTEGER PRIMARY KEY, name TEXT COLLATE NOCASE NOT NULL, country TEXT NOT NULL,
+                     season INTEGER NOT NULL);
+CREATE TABLE Player (id INTEGER PRIMARY KEY, first_name TEXT COLLATE NOCASE NOT NULL,
+                     last_name TEXT COLLATE NOCASE NOT NULL, birthdate DATE, nationality TEXT,
+                     position TEXT NOT NULL, team_id INTEGER NOT NULL);
+CREATE TABLE Staff (id INTEGER PRIMARY KEY, first_name TEXT COLLATE NOCASE NOT NULL,
+                    last_name TEXT COLLATE NOCASE NOT NULL, birthdate DATE, nationality TEXT,
+                    role TEXT NOT NULL, team_id INTEGER NOT NULL);
+CREATE TABLE Ranking (team_id INTEGER NOT NULL, league_id INTEGER NOT NULL, type TEXT NOT NULL,
+                      position INTEGER NOT NULL, points INTEGER NOT NULL, played INTEGER NOT NULL,
+                      goals_for INTEGER NOT NULL, goals_against INTEGER NOT NULL, won INTEGER NOT NULL,
+                      draw INTEGER NOT NULL, lost INTEGER NOT NULL, PRIMARY KEY (team_id, league_id, type));
+CREATE INDEX idx_ranking_order ON Ranking (league_id, type, position, team_id);
+CREATE INDEX idx_player_team ON Player (team_id);
+CREATE INDEX idx_staff_team ON Staff (team_id);
+CREATE INDEX idx_league_season ON League (season);
+"""
+
+# MySQL trie la colonne ENUM `type` par indice (HOME, AWAY, TOTAL) : SQLite la trie par ordre alphabétique
+SQLITE_RANKING_ORDER = ("Ranking.league_id, "
+                        "CASE Ranking.type WHEN 'HOME' THEN 1 WHEN 'AWAY' THEN 2 WHEN 'TOTAL' THEN 3 END")
+
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+sqlite3.register_converter('DATE', lambda value: datetime.date.fromisoformat(value.decode()))
+
+
+class SQLiteCursor:
+    """
+    Curseur SQLite qui imite le curseur de mysql-connector : paramètres %s, lignes en dictionnaires
+    (une colonne en double garde la dernière valeur, comme avec dictionary=True)
+    """
+
+    def __init__(self, cursor, dictionary: bool):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query: str, params=None):
+        query = query.replace('%s', '?').replace('Ranking.league_id, Ranking.type', SQLITE_RANKING_ORDER)
+        self._cursor.execute(query, list(params or []))
+
+    def _rows(self, rows: list) -> list:
+        if not self._dictionary:
+            return rows
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchone(self):
+        rows = self._rows([row for row in [self._cursor.fetchone()] if row is not None])
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: int = 1):
+        return self._rows(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._rows(self._cursor.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Connexion à une base SQLite utilisable à la place d'une connexion MySQL par le pool de l'API
+    """
+
+    def __init__(self, path: str):
+        # Les connexions du pool passent d'un thread de l'exécuteur à l'autre
+        self._connection = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False,
+                                           isolation_level=None)
+
+    def cursor(self, dictionary=False, buffered=None):
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._connection.close()
+
+
+def sqlite_mysql_factory(path: str):
+    """
+    Fonction qui renvoie une fabrique de connexions à la base SQLite *path* utilisable par ConnectionPool
+
+    :param path: Chemin du fichier SQLite
+    :return: Fonction sans argument renvoyant une SQLiteConnection
+    """
+    return lambda: SQLiteConnection(path)
+
+
+def document_value(document: dict, path: str):
+    """
+    Fonction qui lit un champ d'un document MongoDB à partir de son chemin (ex : 'home_team.id')
+
+    :param document: Document
+    :param path: Chemin du champ (clés séparées par des points)
+    :return: Valeur du champ, ou None s'il est absent
+    """
+    for key in path.split('.'):
+        if not isinstance(document, dict):
+            return None
+        document = document.get(key)
+    return document
+
+
+def matches_filter(document: dict, filter: dict) -> bool:
+    """
+    Fonction qui indique si un document vérifie un filtre MongoDB
+    (égalité, $in, $gt, $gte, $lt, $lte, $or et $and)
+
+    :param document: Document
+    :param filter: Filtre MongoDB
+    :return: True si le document est sélectionné
+    """
+    for key, condition in filter.items():
+        if key == '$or':
+            if not any(matches_filter(document, branch) for branch in condition):
+                return False
+        elif key == '$and':
+            if not all(matches_filter(document, branch) for branch in condition):
+                return False
+        else:
+            value = document_value(document, key)
+            if isinstance(condition, dict):
+                for operator, operand in condition.items():
+                    if operator == '$in':
+                        ok = value in operand
+                    elif value is None:
+                        ok = False
+                    elif operator == '$gt':
+                        ok = value > operand
+                    elif operator == '$gte':
+                        ok = value >= operand
+                    elif operator == '$lt':
+                        ok = value < operand
+                    elif operator == '$lte':
+                        ok = value <= operand
+                    else:
+                        raise ValueError(f"Opérateur non géré : {operator}")
+                    if not ok:
+                        return False
+            elif value != condition:
+                return False
+    return True
+
+
+class MemoryCollection:
+    """
+    Collection MongoDB en mémoire.
+
+    Les documents sont conservés dans l'ordre de l'index *order*, avec des index d'égalité sur les champs
+    *indexed* : find() part de l'index le plus sélectif du filtre (égalité, $in, ou $or dont chaque branche
+    est indexée) au lieu de parcourir toute la collection, comme le ferait MongoDB.
+    """
+
+    def __init__(self, name: str, documents: list, order: tuple = ('season', 'matchday', '_id'),
+                 indexed: tuple = ('_id', 'season', 'league', 'home_team.id', 'away_team.id')):
+        """
+        :param name: Nom de la collection
+        :param documents: Documents de la collection
+        :param order: Champs de l'ordre de stockage (un find() trié dans cet ordre ne trie pas les documents)
+        :param indexed: Champs indexés
+        """
+        self.name = name
+        self.order = list(order)
+        self.documents = sorted(documents, key=lambda document: tuple(document_value(document, field)
+                                                                      for field in self.order))
+        self._positions = {}
+        for field in indexed:
+            index = self._positions[field] = {}
+            for position, document in enumerate(self.documents):
+                index.setdefault(document_value(document, field), []).append(position)
+
+    def _candidates(self, filter: dict):
+        # Positions des documents candidats (None : toute la collection), triées dans l'ordre de l'index
+        best = None
+        for key, condition in filter.items():
+            positions = None
+            if key == '$and':
+                for branch in condition:
+                    found = self._candidates(branch)
+                    if found is not None and (positions is None or len(found) < len(positions)):
+                        positions = found
+            elif key == '$or':
+                branches = [self._candidates(branch) for branch in condition]
+                if all(branch is not None for branch in branches):
+                    positions = sorted(set().union(*branches))
+            elif key in self._positions:
+                index = self._positions[key]
+                if not isinstance(condition, dict):
+                    positions = index.get(condition, [])
+                elif set(condition) == {'$in'}:
+                    positions = sorted(set().union(*(index.get(value, []) for value in condition['$in'])))
+            if positions is not None and (best is None or len(positions) < len(best)):
+                best = positions
+        return best
+
+    def find(self, filter=None, projection=None, sort=None, limit=0, batch_size=None, **kwargs):
+        filter = filter or {}
+        positions = self._candidates(filter)
+        candidates = self.documents if positions is None else (self.documents[position] for position in positions)
+        documents = (document for document in candidates if matches_filter(document, filter))
+        if sort and not all(field == self.order[i] and direction == 1
+                            for i, (field, direction) in enumerate(sort[:len(self.order)])):
+            documents = list(documents)
+            # Tris successifs (stables) du dernier champ au premier, chacun dans son sens
+            for field, direction in reversed(sort):
+                documents.sort(key=lambda document: document_value(document, field), reverse=direction < 0)
+            documents = iter(documents)
+        if limit:
+            documents = itertools.islice(documents, limit)
+        return FakeMongoCursor(documents, projection)
+
+
+class MemoryMongoClient:
+    """
+    Client MongoDB en mémoire : la base football_predictor contient les collections *collections*
+    """
+
+    def __init__(self, collections: dict):
+        """
+        :param collections: Dictionnaire nom de la collection -> MemoryCollection
+        """
+        self._collections = collections
+
+    def __getitem__(self, name):
+        # La base et ses collections partagent le même accès par nom
+        return self if name == 'football_predictor' else self._collections[name]
+
+    def close(self):
+        pass
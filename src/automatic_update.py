@@ -7,6 +7,12 @@ from bs4 import BeautifulSoup
 import requests
 import json
 import pandas as pd
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.team_resolver import TeamResolver
 
 # Chargement des variables d'environnement pour les connexions BDD
 config = dotenv_values("../.env")
@@ -83,46 +89,47 @@ try:
     if cnx.is_connected():
         print('Connecté à la base MySQL')
         cursor = cnx.cursor()
+        # Index des noms d'équipes (insensible à la casse, aux accents et aux variantes connues)
+        team_resolver = TeamResolver.from_connection(cnx)
         # Chargement des données dans la base données SQL            
         for key, df in df_rankings_update.items():
             cursor.execute("SELECT id FROM `League` WHERE season = 2024 AND name = 'Ligue 1';")
             league_id = cursor.fetchone()
             for index, row in df.iterrows():
-                cursor.execute("SELECT id FROM `Team` WHERE shortname = %s;", [row['team']['shortName']])
-                team_id = cursor.fetchone()
+                team_id = team_resolver.resolve_one(row['team']['shortName'])
                 if team_id is None:
-                    search_similar = f"SELECT id FROM `Team` WHERE shortname LIKE '%{row['team']['shortName']}%';"
-                    cursor.execute(search_similar)
-                    team_id = cursor.fetchone()
+                    # Équipe inconnue de la table Team : la ligne est ignorée plutôt que d'écrire un classement orphelin
+                    print("Équipe introuvable, classement ignoré :", row['team']['shortName'])
+                    continue
                 update_ranking = ("UPDATE `Ranking` SET position = %s, points = %s, played = %s, goals_for = %s, "
                                   "goals_against = %s, won = %s, draw = %s, lost = %s "
                                   "WHERE team_id = %s AND league_id = %s AND type = %s;")
                 params = [row["position"], row["points"], 
                           row["playedGames"], row["goalsFor"], 
                           row["goalsAgainst"], row["won"], 
-                          row["draw"], row["lost"], team_id[0], league_id[0],
+                          row["draw"], row["lost"], team_id, league_id[0],
                           key]
                 cursor.execute(update_ranking, params=params)
         for key, df in df_rankings_list.items():
             cursor.execute("SELECT id FROM `League` WHERE season = 2024 AND name = 'Ligue 2';")
             league_id = cursor.fetchone()
             for index, row in df.iterrows():
-                cursor.execute("SELECT id FROM `Team` WHERE shortname = %s;", [row['shortname']])
-                team_id = cursor.fetchone()
+                team_id = team_resolver.resolve_one(row['shortname'])
                 if team_id is None:
-                    search_similar = f"SELECT id FROM `Team` WHERE shortname LIKE '%{row['shortName']}%';"
-                    cursor.execute(search_similar)
-                    team_id = cursor.fetchone()
+                    print("Équipe introuvable, classement ignoré :", row['shortname'])
+                    continue
                 update_ranking = ("UPDATE `Ranking` SET position = %s, points = %s, played = %s, goals_for = %s, "
                                   "goals_against = %s, won = %s, draw = %s, lost = %s "
                                   "WHERE team_id = %s AND league_id = %s AND type = %s;")
                 params = [int(row["position"]), int(row["points"]), 
                           int(row["played"]), int(row["goalFor"]), 
                           int(row["goalAgainst"]), int(row["win"]), 
-                          int(row["draw"]), int(row["loss"]), team_id[0], league_id[0],
+                          int(row["draw"]), int(row["loss"]), team_id, league_id[0],
                           key]
                 cursor.execute(update_ranking, params=params)
         cnx.commit()
+        # Nouvelle version des données : les caches de l'API sont invalidés
+        bump_data_version()
 except Error as e:
     cnx.close()
     print("Erreur lors de la connexion à la base MySQL :", e)
@@ -0,0 +1,211 @@
+import functools
+import time
+from concurrent.futures import Executor
+from typing import Optional
+import numpy as np
+from src.elo import EloRatings, expected_result
+from src.match_store import MATCH_STORE_PATH, MatchStore
+from src.prediction import MAX_GOALS, DixonColesModel, time_weights
+
+# Championnats évalués par défaut
+BACKTEST_LEAGUES = ('Ligue 1', 'Ligue 2')
+# Probabilité minimale d'une issue (évite un log loss infini)
+MIN_PROBABILITY = 1e-6
+# Issues d'un match, dans l'ordre des colonnes des probabilités
+OUTCOMES = ('home', 'draw', 'away')
+
+
+def match_outcomes(home_goals: np.ndarray, away_goals: np.ndarray) -> np.ndarray:
+    """
+    Fonction qui renvoie l'issue de chaque match (indice dans OUTCOMES : 0 victoire à domicile, 1 nul, 2 défaite)
+    """
+    return np.where(home_goals > away_goals, 0, np.where(home_goals == away_goals, 1, 2))
+
+def score_predictions(probabilities: np.ndarray, outcomes: np.ndarray) -> dict:
+    """
+    Fonction qui évalue des prédictions : sommes du log loss, du score de Brier et du ranked probability score
+    (RPS, écarts des probabilités cumulées, les issues étant ordonnées) sur les matchs
+
+    :param probabilities: Tableau (matchs, 3) des probabilités dans l'ordre de OUTCOMES
+    :param outcomes: Issues des matchs (indices dans OUTCOMES)
+    :return: Dictionnaire matches, log_loss, brier, rps (sommes, à diviser par le nombre de matchs)
+    """
+    observed = np.eye(len(OUTCOMES))[outcomes]
+    probabilities = np.clip(probabilities, MIN_PROBABILITY, 1)
+    cumulative = np.cumsum(probabilities, axis=1)[:, :-1] - np.cumsum(observed, axis=1)[:, :-1]
+    return {'matches': len(outcomes),
+            'log_loss': float(-np.log(probabilities[np.arange(len(outcomes)), outcomes]).sum()),
+            'brier': float(((probabilities - observed) ** 2).sum()),
+            'rps': float((cumulative ** 2).sum() / (len(OUTCOMES) - 1))}
+
+
+class FrequencyModel:
+    """
+    Modèle de référence : fréquences des victoires à domicile, nuls et défaites des résultats connus
+    """
+    name = 'frequences'
+
+    def predict(self, history: dict, end: int, reference: int, home_ids: np.ndarray,
+                away_ids: np.ndarray) -> np.ndarray:
+        counts = np.bincount(history['outcomes'][:end], minlength=len(OUTCOMES)) + 1
+        return np.tile(counts / counts.sum(), (len(home_ids), 1))
+
+
+class EloModel:
+    """
+    Classements Elo mis à jour avec les seuls résultats apparus depuis la journée précédente.
+    La probabilité du nul est la fréquence des nuls des résultats connus, le reste étant partagé
+    selon le résultat attendu de l'équipe à domicile.
+    """
+    name = 'elo'
+
+    def __init__(self):
+        self.ratings = EloRatings()
+        self.applied = 0
+
+    def predict(self, history: dict, end: int, reference: int, home_ids: np.ndarray,
+                away_ids: np.ndarray) -> np.ndarray:
+        for index in range(self.applied, end):
+            self.ratings.apply({'_id': index, 'league': None, 'season': None, 'matchday': None, 'date': None,
+                                'home_team': {'id': int(history['home_ids'][index]), 'name': None},
+                                'away_team': {'id': int(history['away_ids'][index]), 'name': None},
+                                'score': {'home': int(history['home_goals'][index]),
+                                          'away': int(history['away_goals'][index])}})
+        self.applied = end
+        draw = (np.count_nonzero(history['outcomes'][:end] == 1) + 1) / (end + 3)
+        expected = np.array([expected_result(self.ratings.rating(int(home_id)), self.ratings.rating(int(away_id)),
+                                             self.ratings.home_advantage)
+                             for home_id, away_id in zip(home_ids, away_ids)])
+        probabilities = np.stack([expected - draw / 2, np.full(len(expected), draw), 1 - expected - draw / 2], axis=1)
+        probabilities = np.clip(probabilities, MIN_PROBABILITY, 1)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+class DixonColesBacktest:
+    """
+    Modèle de Dixon et Coles réajusté avant chaque journée sur les résultats connus, pondérés selon leur ancienneté
+    (même modèle que les prédictions de l'API)
+    """
+    name = 'dixon-coles'
+
+    def predict(self, history: dict, end: int, reference: int, home_ids: np.ndarray,
+                away_ids: np.ndarray) -> np.ndarray:
+        model = DixonColesModel.fit(history['home_ids'][:end], history['away_ids'][:end],
+                                    history['home_goals'][:end], history['away_goals'][:end],
+                                    time_weights(history['days'][:end], reference))
+        matrices = model.score_matrices(home_ids, away_ids, MAX_GOALS)
+        return np.stack([np.tril(matrices, -1).sum(axis=(1, 2)), np.trace(matrices, axis1=1, axis2=2),
+                         np.triu(matrices, 1).sum(axis=(1, 2))], axis=1)
+
+
+# Modèles évalués par nom
+MODELS = {model.name: model for model in (FrequencyModel, EloModel, DixonColesBacktest)}
+
+
+@functools.lru_cache(maxsize=4)
+def open_store(path: str) -> MatchStore:
+    """
+    Fonction qui ouvre le magasin de matchs une seule fois par processus
+    """
+    return MatchStore(path)
+
+@functools.lru_cache(maxsize=32)
+def season_window(path: str, league: str, season: int) -> tuple:
+    """
+    Fonction qui prépare, une seule fois par processus, les résultats connus pour évaluer une saison
+    (saison précédente et saison en cours, comme predict_matchday) et les matchs de chaque journée
+
+    :param path: Chemin du magasin de matchs
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :return: Tuple (résultats connus triés par date, journées (numéro, date de référence, indices des matchs),
+             matchs joués de la saison)
+    """
+    store = open_store(path)
+    history = store.results(league, [season - 1, season])
+    order = np.argsort(history['days'], kind='stable')
+    history = {name: values[order] for name, values in history.items()}
+    history['outcomes'] = match_outcomes(history['home_goals'], history['away_goals'])
+
+    current = store.results(league, [season])
+    current['outcomes'] = match_outcomes(current['home_goals'], current['away_goals'])
+    columns = store.season(league, season)
+    played = ((columns['home_id'] >= 0) & (columns['away_id'] >= 0)
+              & (columns['home_goals'] >= 0) & (columns['away_goals'] >= 0))
+    # Numéros de journée des matchs joués, dans l'ordre des tableaux de store.results
+    numbers = columns['matchday'][played]
+    matchdays = []
+    for matchday in np.unique(numbers).tolist():
+        indices = np.flatnonzero(numbers == matchday)
+        # Date de référence : premier match de la journée, seuls les résultats antérieurs sont connus
+        matchdays.append((matchday, int(current['days'][indices].min()), indices))
+    return history, matchdays, current
+
+def backtest_season(path: str, model_name: str, league: str, season: int) -> dict:
+    """
+    Fonction qui rejoue les journées d'une saison dans l'ordre : avant chaque journée, le modèle est réajusté
+    ou mis à jour avec les seuls résultats antérieurs au premier match de la journée, puis ses prédictions
+    sont évaluées sur les résultats de la journée
+
+    :param path: Chemin du magasin de matchs
+    :param model_name: Nom du modèle (clé de MODELS)
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :return: Dictionnaire des scores (sommes), du nombre de journées et de la durée de calcul (secondes)
+    """
+    start = time.perf_counter()
+    history, matchdays, current = season_window(path, league, season)
+    model = MODELS[model_name]()
+    totals = {'matches': 0, 'log_loss': 0.0, 'brier': 0.0, 'rps': 0.0}
+    evaluated = 0
+    for matchday, reference, indices in matchdays:
+        end = int(np.searchsorted(history['days'], reference, side='left'))
+        if end == 0:
+            continue
+        probabilities = model.predict(history, end, reference, current['home_ids'][indices],
+                                      current['away_ids'][indices])
+        for name, value in score_predictions(probabilities, current['outcomes'][indices]).items():
+            totals[name] += value
+        evaluated += 1
+    return {'model': model_name, 'league': league, 'season': season, 'matchdays': evaluated, **totals,
+            'duration': time.perf_counter() - start}
+
+def backtest_tasks(store: MatchStore, leagues=BACKTEST_LEAGUES, seasons: Optional[list] = None) -> list:
+    """
+    Fonction qui renvoie les saisons à évaluer (championnat, saison) présentes dans le magasin de matchs
+    """
+    tasks = []
+    for key in store.ranges:
+        league, season = key.rsplit('|', 1)
+        if league in leagues and (seasons is None or int(season) in seasons):
+            tasks.append((league, int(season)))
+    return sorted(tasks)
+
+def run_backtest(models: list, executor: Executor, path: str = MATCH_STORE_PATH, leagues=BACKTEST_LEAGUES,
+                 seasons: Optional[list] = None) -> list:
+    """
+    Fonction qui évalue plusieurs modèles, l'un après l'autre, chacun sur toutes les saisons réparties entre
+    les processus de l'exécuteur (les saisons sont indépendantes)
+
+    :param models: Noms des modèles (clés de MODELS)
+    :param executor: Exécuteur (ProcessPoolExecutor)
+    :param path: Chemin du magasin de matchs
+    :param leagues: Championnats évalués
+    :param seasons: Années de début des saisons évaluées (toutes par défaut)
+    :return: Liste par modèle : scores moyens par match, durée totale (secondes), somme des durées des saisons
+             et résultats de chaque saison
+    """
+    tasks = backtest_tasks(MatchStore(path), leagues, seasons)
+    reports = []
+    for model_name in models:
+        start = time.perf_counter()
+        results = list(executor.map(backtest_season, [path] * len(tasks), [model_name] * len(tasks),
+                                    [league for league, _ in tasks], [season for _, season in tasks]))
+        wall_time = time.perf_counter() - start
+        matches = sum(result['matches'] for result in results)
+        reports.append({'model': model_name, 'seasons': len(results), 'matches': matches,
+                        **{name: sum(result[name] for result in results) / max(matches, 1)
+                           for name in ('log_loss', 'brier', 'rps')},
+                        'wall_time': wall_time, 'task_time': sum(result['duration'] for result in results),
+                        'results': results})
+    return reports
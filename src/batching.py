@@ -0,0 +1,91 @@
+import asyncio
+import time
+from src.metrics import BATCH_DURATION, BATCH_SIZE, BATCH_WAIT
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels simultanés d'une fonction unitaire en un seul appel sur un lot.
+
+    Le premier élément soumis ouvre une fenêtre de *window* secondes : tous les éléments soumis pendant
+    la fenêtre (au plus *max_size*) sont évalués ensemble, puis chaque appelant reçoit son propre résultat.
+    Une fenêtre plus longue donne des lots plus grands (débit) au prix d'une attente supplémentaire (latence).
+    """
+
+    def __init__(self, func, window: float = 0.003, max_size: int = 64, name: str = 'batch'):
+        """
+        :param func: Fonction asynchrone prenant la liste des éléments et renvoyant la liste des résultats
+                     dans le même ordre (une exception à la place d'un résultat est levée pour cet élément seul)
+        :param window: Durée de la fenêtre de regroupement en secondes (0 : le lot est évalué sans attendre,
+                       avec les seuls éléments déjà soumis)
+        :param max_size: Nombre maximum d'éléments par lot (le lot est évalué dès qu'il est plein)
+        :param name: Nom du regroupement dans les métriques
+        """
+        self.func = func
+        self.window = window
+        self.max_size = max_size
+        self.name = name
+        self._pending = []
+        self._full = None
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    async def submit(self, item):
+        """
+        Fonction qui soumet un élément et attend son résultat
+
+        :param item: Élément à évaluer
+        :return: Résultat de l'élément
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) == 1:
+            # Premier élément de la fenêtre : il déclenche l'évaluation du lot
+            self._full = asyncio.Event()
+            asyncio.create_task(self._flush(self._full))
+        if len(self._pending) >= self.max_size:
+            self._full.set()
+        return await future
+
+    async def _flush(self, full: asyncio.Event):
+        if self.window > 0:
+            try:
+                await asyncio.wait_for(full.wait(), self.window)
+            except asyncio.TimeoutError:
+                pass
+        batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+        if self._pending:
+            # Éléments au-delà de la taille maximale : ils ouvrent la fenêtre suivante
+            self._full = asyncio.Event()
+            asyncio.create_task(self._flush(self._full))
+        start = time.perf_counter()
+        for _, _, submitted in batch:
+            BATCH_WAIT.labels(self.name).observe(start - submitted)
+        BATCH_SIZE.labels(self.name).observe(len(batch))
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        try:
+            results = await self.func([item for item, _, _ in batch])
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            BATCH_DURATION.labels(self.name).observe(time.perf_counter() - start)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie les compteurs du regroupement (nombre de lots, d'éléments, taille moyenne et maximale)
+        """
+        return {'batches': self.batches, 'items': self.items,
+                'mean_size': self.items / self.batches if self.batches else None, 'largest': self.largest}
@@ -0,0 +1,20 @@
+from dotenv import dotenv_values
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.database import create_mongodb_client
+from src.match_store import MATCH_STORE_PATH, build_match_store
+
+# Chargement des variables d'environnement pour la connexion MongoDB
+config = dotenv_values("../.env")
+
+client = create_mongodb_client(config)
+try:
+    count = build_match_store(client["football_predictor"])
+    print(f"{count} matchs écrits dans le magasin de matchs {MATCH_STORE_PATH}")
+    # Nouvelle version des données : les caches de l'API sont invalidés
+    bump_data_version()
+finally:
+    client.close()
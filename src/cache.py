@@ -0,0 +1,265 @@
+import collections
+import heapq
+import threading
+import time
+from typing import Optional
+
+
+class TokenCache:
+    """
+    Cache borné des tokens JWT dont la signature a déjà été vérifiée.
+
+    Chaque token est conservé jusqu'à sa date d'expiration (claim *exp*). Lorsque le cache est plein,
+    le token qui expire le plus tôt est évincé.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: Nombre maximum de tokens conservés
+        """
+        self.maxsize = maxsize
+        self._expirations = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def contains(self, token: str) -> bool:
+        """
+        Fonction qui indique si le token a déjà été vérifié et n'a pas encore expiré
+
+        :param token: Token JWT encodé
+        :return: True si le token est dans le cache et toujours valide
+        """
+        with self._lock:
+            self._purge(time.time())
+            if token in self._expirations:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, token: str, expiration: float):
+        """
+        Fonction qui ajoute un token vérifié au cache
+
+        :param token: Token JWT encodé
+        :param expiration: Date d'expiration du token (timestamp UNIX)
+        """
+        with self._lock:
+            now = time.time()
+            if expiration <= now or token in self._expirations:
+                return
+            self._purge(now)
+            if len(self._expirations) >= self.maxsize:
+                # Cache plein : on évince le token qui expire le plus tôt
+                _, evicted = heapq.heappop(self._heap)
+                del self._expirations[evicted]
+                self.evictions += 1
+            self._expirations[token] = expiration
+            heapq.heappush(self._heap, (expiration, token))
+
+    def _purge(self, now: float):
+        # Suppression des tokens expirés (le tas est trié par date d'expiration)
+        while self._heap and self._heap[0][0] <= now:
+            _, token = heapq.heappop(self._heap)
+            del self._expirations[token]
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie les compteurs du cache
+
+        :return: Dictionnaire des compteurs (taille, hits, misses, évictions)
+        """
+        with self._lock:
+            return {'size': len(self._expirations),
+                    'maxsize': self.maxsize,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions}
+
+
+class ResponseCache:
+    """
+    Cache LRU des réponses des routes de lecture, invalidé à chaque nouvelle version des données.
+
+    Le cache est borné en nombre d'entrées et en nombre total de lignes conservées. Les entrées sont
+    associées à la version des données : dès qu'une nouvelle version est publiée par les scripts de
+    mise à jour, tout le contenu est abandonné.
+    """
+
+    def __init__(self, maxsize: int = 256, max_rows: int = 100000):
+        """
+        :param maxsize: Nombre maximum de réponses conservées
+        :param max_rows: Nombre maximum de lignes (tous résultats confondus) conservées
+        """
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self._entries = collections.OrderedDict()
+        self._rows = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version: int):
+        """
+        Fonction qui recherche une réponse dans le cache
+
+        :param key: Clé de la réponse (route et paramètres normalisés)
+        :param version: Version courante des données
+        :return: Tuple (trouvé, valeur)
+        """
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key][0]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value, version: int, weight: Optional[int] = None):
+        """
+        Fonction qui ajoute une réponse au cache
+
+        :param key: Clé de la réponse
+        :param value: Réponse à conserver
+        :param version: Version des données au moment où la réponse a été calculée
+        :param weight: Nombre de lignes de la réponse (par défaut, longueur de la liste ou du dictionnaire)
+        """
+        if weight is None:
+            weight = len(value) if isinstance(value, (list, dict)) else 1
+        with self._lock:
+            # Réponse calculée avant une mise à jour, ou trop volumineuse : on ne la conserve pas
+            if version != self._version or weight > self.max_rows:
+                return
+            if key in self._entries:
+                self._rows -= self._entries.pop(key)[1]
+            self._entries[key] = (value, weight)
+            self._rows += weight
+            while len(self._entries) > self.maxsize or self._rows > self.max_rows:
+                _, (_, evicted_weight) = self._entries.popitem(last=False)
+                self._rows -= evicted_weight
+                self.evictions += 1
+
+    def _check_version(self, version: int):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._rows = 0
+            self._version = version
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie les compteurs du cache
+
+        :return: Dictionnaire des compteurs (taille, hits, misses, évictions, invalidations)
+        """
+        with self._lock:
+            return {'size': len(self._entries),
+                    'rows': self._rows,
+                    'version': self._version,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'invalidations': self.invalidations}
+
+
+class PredictionCache:
+    """
+    Cache LRU des prédictions de matchs, indexé par (version du modèle, version des données, match).
+
+    Une prédiction ne change qu'avec le modèle ou les données : dès qu'une nouvelle version des données
+    est vue, les prédictions de la version précédente sont abandonnées.
+    """
+
+    def __init__(self, maxsize: int = 2048, model_version: str = ''):
+        """
+        :param maxsize: Nombre maximum de prédictions conservées
+        :param model_version: Version du modèle de prédiction (src/prediction.py)
+        """
+        self.maxsize = maxsize
+        self.model_version = model_version
+        self._entries = collections.OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.warmed = 0
+
+    def get(self, fixture_id: str, version: int):
+        """
+        Fonction qui recherche la prédiction d'un match
+
+        :param fixture_id: Identifiant du match
+        :param version: Version courante des données
+        :return: Tuple (trouvée, prédiction)
+        """
+        key = (self.model_version, version, fixture_id)
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set_many(self, predictions: dict, version: int, warmup: bool = False):
+        """
+        Fonction qui ajoute des prédictions au cache
+
+        :param predictions: Dictionnaire identifiant du match -> prédiction
+        :param version: Version des données au moment où les prédictions ont été calculées
+        :param warmup: True pour des prédictions calculées à l'avance (compteur warmed)
+        """
+        with self._lock:
+            # Prédictions calculées avant une mise à jour : on ne les conserve pas
+            if self._version is not None and version < self._version:
+                return
+            self._check_version(version)
+            for fixture_id, prediction in predictions.items():
+                key = (self.model_version, version, fixture_id)
+                self._entries[key] = prediction
+                self._entries.move_to_end(key)
+            if warmup:
+                self.warmed += len(predictions)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def check_version(self, version: int):
+        """
+        Fonction qui abandonne les prédictions d'une version précédente des données
+        """
+        with self._lock:
+            self._check_version(version)
+
+    def _check_version(self, version: int):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie les compteurs du cache
+
+        :return: Dictionnaire des compteurs (taille, hits, misses, évictions, invalidations, prédictions calculées à l'avance)
+        """
+        with self._lock:
+            return {'size': len(self._entries),
+                    'version': self._version,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'invalidations': self.invalidations,
+                    'warmed': self.warmed}
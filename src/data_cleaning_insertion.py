@@ -8,6 +8,17 @@ import os.path
 import ast
 import pymongo
 import locale
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.team_resolver import TeamResolver
+from src.match_results import migrate_matches
+from src.elo import update_ratings
+from src.features import update_features
+from src.head_to_head import update_head_to_head
+from src.match_store import build_match_store
 
 # Sert pour la conversion des dates françaises en format datetime
 locale.setlocale(locale.LC_ALL, 'fr_FR.UTF-8')
@@ -299,38 +310,41 @@ try:
                 cursor.execute("INSERT INTO `League` (name, country, season) VALUES (%s,%s,%s)",
                                [ligue, 'France', season])
 
+        # Index des noms d'équipes (insensible à la casse, aux accents et aux variantes connues)
+        team_resolver = TeamResolver.from_connection(cnx)
+        add_ranking = ("INSERT INTO `Ranking` (team_id, league_id, type, position, points, played, goals_for, "
+                       "goals_against, won, draw, lost) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)")
         # Boucle d'ajout des classements Ligue 1 (API Football-data)        
         for key, df in df_rankings_list_ligue1.items():
             cursor.execute("SELECT id FROM `League` WHERE season = %s AND name = %s;", [key[0], 'Ligue 1'])
             league_id = cursor.fetchone()
             for index, row in df.iterrows():
-                cursor.execute("SELECT id FROM `Team` WHERE shortname = %s;", [row['team']])
-                team_id = cursor.fetchone()
+                team_id = team_resolver.resolve_one(row['team'])
                 if team_id is None:
-                    search_similar = f"SELECT id FROM `Team` WHERE shortname LIKE '%{row['team']}%';"
-                    cursor.execute(search_similar)
-                    team_id = cursor.fetchone()
-                add_ranking = ("INSERT INTO `Ranking` (team_id, league_id, type, position, points, played, goals_for, "
-                               f"goals_against, won, draw, lost) VALUES ({team_id[0]}, {league_id[0]}, \"{key[1]}\", "
-                               f"{row['position']}, {row['points']}, {row['playedGames']}, {row['goalsFor']}, "
-                               f"{row['goalsAgainst']}, {row['won']}, {row['draw']}, {row['lost']})")
-                cursor.execute(add_ranking)
+                    # Équipe inconnue de la table Team : la ligne est ignorée plutôt que d'insérer un classement orphelin
+                    print("Équipe introuvable, classement ignoré :", row['team'])
+                    continue
+                params = [team_id, league_id[0], key[1],
+                          int(row['position']), int(row['points']),
+                          int(row['playedGames']), int(row['goalsFor']),
+                          int(row['goalsAgainst']), int(row['won']),
+                          int(row['draw']), int(row['lost'])]
+                cursor.execute(add_ranking, params=params)
         # Boucle d'ajout des classements Ligue 2 (webscraping)
         for key, df in df_rankings_list.items():
             cursor.execute("SELECT id FROM `League` WHERE season = %s AND name = %s;", [key[0], 'Ligue 2'])
             league_id = cursor.fetchone()
             for index, row in df.iterrows():
-                cursor.execute("SELECT id FROM `Team` WHERE shortname = %s;", [row['shortname']])
-                team_id = cursor.fetchone()
+                team_id = team_resolver.resolve_one(row['shortname'])
                 if team_id is None:
-                    if row['shortname'] == 'US Quevilly Rouen':
-                        cursor.execute("SELECT id FROM `Team` WHERE shortname = %s;", ['US Quevilly-Rouen'])
-                        team_id = cursor.fetchone()
-                add_ranking = ("INSERT INTO `Ranking` (team_id, league_id, type, position, points, played, goals_for, "
-                               f"goals_against, won, draw, lost) VALUES ({team_id[0]}, {league_id[0]}, \"{key[1]}\", "
-                               f"{row['position']}, {row['points']}, {row['played']}, {row['goalFor']}, "
-                               f"{row['goalAgainst']}, {row['win']}, {row['draw']}, {row['loss']})")
-                cursor.execute(add_ranking)
+                    print("Équipe introuvable, classement ignoré :", row['shortname'])
+                    continue
+                params = [team_id, league_id[0], key[1],
+                          int(row['position']), int(row['points']),
+                          int(row['played']), int(row['goalFor']),
+                          int(row['goalAgainst']), int(row['win']),
+                          int(row['draw']), int(row['loss'])]
+                cursor.execute(add_ranking, params=params)
         cnx.commit()
 except Error as e:
     cnx.close()
@@ -420,20 +434,17 @@ try:
     if cnx.is_connected():
         print('Connecté à la base MySQL')
         cursor = cnx.cursor()
+        team_resolver = TeamResolver.from_connection(cnx)
         # Chargement des données dans la base données SQL
         for matchday in matchday_cursor:
             i = 0
             for match in matchday['matches']:
-                search_similar_home = f"SELECT id FROM Team WHERE shortname LIKE '%{match['home_team']}%'"
-                cursor.execute(search_similar_home)
-                home_team_id = cursor.fetchone()
-                search_similar_away = f"SELECT id FROM Team WHERE shortname LIKE '%{match['away_team']}%'"
-                cursor.execute(search_similar_away)
-                away_team_id = cursor.fetchone()
+                home_team_id = team_resolver.resolve_one(match['home_team'])
+                away_team_id = team_resolver.resolve_one(match['away_team'])
                 team_update = { '$set' : {
                                             f'matches.{i}' : {'date' : match['date'],
-                                                              'home_team' : {'id' : int(home_team_id[0]), 'name' : match['home_team']},
-                                                              'away_team' : {'id' : int(away_team_id[0]), 'name' : match['away_team']},
+                                                              'home_team' : {'id' : int(home_team_id), 'name' : match['home_team']},
+                                                              'away_team' : {'id' : int(away_team_id), 'name' : match['away_team']},
                                                               'score_halftime' : match['score_halftime'],
                                                               'score' : match['score']}
                                          }
@@ -462,21 +473,18 @@ try:
     if cnx.is_connected():
         print('Connecté à la base MySQL')
         cursor = cnx.cursor()
+        team_resolver = TeamResolver.from_connection(cnx)
         # Chargement des données dans la base données SQL
         for matchday in matchday_cursor:
             i = 0
             for match in matchday['matches']['results']:
-                search_similar_home = f"SELECT id FROM Team WHERE shortname LIKE '%{match['home_team']}%'"
-                cursor.execute(search_similar_home)
-                home_team_id = cursor.fetchone()
-                search_similar_away = f"SELECT id FROM Team WHERE shortname LIKE '%{match['away_team']}%'"
-                cursor.execute(search_similar_away)
-                away_team_id = cursor.fetchone()
+                home_team_id = team_resolver.resolve_one(match['home_team'])
+                away_team_id = team_resolver.resolve_one(match['away_team'])
                 team_update = { '$set' : {
                                             f'matches.results.{i}' : {
-                                                                'home_team' : {'id' : int(home_team_id[0]), 'name' : match['home_team']},
+                                                                'home_team' : {'id' : int(home_team_id), 'name' : match['home_team']},
                                                                 'score' : match['score'],
-                                                                'away_team' : {'id' : int(away_team_id[0]), 'name' : match['away_team']}
+                                                                'away_team' : {'id' : int(away_team_id), 'name' : match['away_team']}
                                                         }
                                         }
                             }
@@ -489,4 +497,19 @@ except Error as e:
 finally:
     if cnx.is_connected():
         cnx.close()
-        print('Connexion à la base MySQL fermée')
\ No newline at end of file
+        print('Connexion à la base MySQL fermée')
+
+# Construction de la collection match_results (un document par match) utilisée par l'API
+migrate_matches(db)
+# Classements Elo : seuls les nouveaux résultats sont appliqués
+update_ratings(db)
+# Caractéristiques de forme : seules les équipes des nouveaux résultats sont mises à jour
+update_features(db)
+# Confrontations directes : seuls les bilans des paires d'équipes des nouveaux résultats sont mis à jour
+update_head_to_head(db)
+
+# Magasin de matchs (colonnes NumPy) projeté en mémoire par l'API, remplacé d'un bloc
+build_match_store(db)
+
+# Nouvelle version des données : les caches de l'API sont invalidés
+bump_data_version()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+
+# Fichier partagé entre les scripts de mise à jour et l'API (dossier data à la racine du projet)
+DATA_VERSION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'data_version')
+
+# Dernière version lue : (mtime, version), pour éviter de relire le fichier à chaque requête
+_last_read = (None, 0)
+
+def read_data_version(path: str = DATA_VERSION_PATH) -> int:
+    """
+    Fonction qui renvoie la version courante des données.
+    Le fichier n'est relu que si sa date de modification a changé.
+
+    :param path: Chemin du fichier de version
+    :return: Numéro de version (0 si aucune mise à jour n'a encore été publiée)
+    """
+    global _last_read
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+    if mtime != _last_read[0]:
+        with open(path, 'r') as file:
+            _last_read = (mtime, int(file.read().strip() or 0))
+    return _last_read[1]
+
+def bump_data_version(path: str = DATA_VERSION_PATH) -> int:
+    """
+    Fonction à appeler après chaque mise à jour des bases (MySQL ou MongoDB) pour invalider les caches de l'API
+
+    :param path: Chemin du fichier de version
+    :return: Nouveau numéro de version
+    """
+    try:
+        with open(path, 'r') as file:
+            version = int(file.read().strip() or 0) + 1
+    except FileNotFoundError:
+        version = 1
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Écriture dans un fichier temporaire puis remplacement atomique
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as file:
+        file.write(str(version))
+    os.replace(temporary_path, path)
+    return version
+
+
+class VersionedValue:
+    """
+    Valeur dérivée des bases de données (index, instantané...) rechargée à chaque nouvelle version des données
+    """
+
+    def __init__(self, load):
+        """
+        :param load: Fonction sans argument renvoyant la coroutine qui calcule la valeur
+        """
+        self._load = load
+        self._lock = asyncio.Lock()
+        self._value = None
+        self.version = None
+
+    async def get(self):
+        """
+        Fonction qui renvoie la valeur, recalculée si les données ont changé depuis le dernier calcul
+
+        :return: Valeur à jour
+        """
+        version = read_data_version()
+        if version != self.version:
+            async with self._lock:
+                # Une autre requête a pu recharger la valeur pendant l'attente du verrou
+                if version != self.version:
+                    self._value = await self._load()
+                    self.version = version
+        return self._value
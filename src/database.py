@@ -0,0 +1,364 @@
+import asyncio
+import collections
+import contextlib
+import functools
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import mysql.connector
+import pymongo
+from src.metrics import DB_POOL_WAIT, DB_QUERY_DURATION, query_name
+
+
+class PoolTimeoutError(Exception):
+    """
+    Exception levée lorsqu'aucune connexion du pool ne s'est libérée dans le délai imparti
+    """
+
+
+class ConnectionPool:
+    """
+    Pool de connexions borné et thread-safe.
+
+    Les connexions sont créées à la demande jusqu'à *size* connexions ouvertes, puis réutilisées.
+    Lorsque toutes les connexions sont utilisées, l'appelant attend qu'une connexion soit rendue
+    au pool (au plus *timeout* secondes).
+    """
+
+    def __init__(self, connect, size: int = 5, timeout: float = 10.0, recycle: float = 30.0):
+        """
+        :param connect: Fonction sans argument qui ouvre une nouvelle connexion
+        :param size: Nombre maximum de connexions ouvertes simultanément
+        :param timeout: Délai maximum d'attente d'une connexion libre en secondes
+        :param recycle: Durée d'inactivité (secondes) au-delà de laquelle une connexion est vérifiée avant réutilisation
+        """
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._idle = collections.deque()
+        self._condition = threading.Condition()
+        self._opened = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.created = 0
+        self.closed = 0
+        self.timeouts = 0
+
+    def acquire(self):
+        """
+        Fonction qui récupère une connexion du pool (en attendant si nécessaire)
+
+        :return: Connexion prête à l'emploi
+        :raises: PoolTimeoutError si aucune connexion ne s'est libérée à temps
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, released_at = self._idle.pop()
+                    break
+                if self._opened < self.size:
+                    # On réserve la place avant d'ouvrir la connexion en dehors du verrou
+                    self._opened += 1
+                    connection, released_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(f"Aucune connexion disponible après {self.timeout} secondes")
+                self.waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_use += 1
+
+        try:
+            if connection is None:
+                connection = self._connect()
+                with self._condition:
+                    self.created += 1
+            elif time.monotonic() - released_at > self.recycle and not connection.is_connected():
+                connection.reconnect()
+        except Exception:
+            with self._condition:
+                self._opened -= 1
+                self.in_use -= 1
+                self._condition.notify()
+            raise
+        return connection
+
+    def release(self, connection, discard: bool = False):
+        """
+        Fonction qui rend une connexion au pool
+
+        :param connection: Connexion obtenue avec acquire()
+        :param discard: Si True, la connexion est fermée au lieu d'être réutilisée (ex : après une erreur)
+        """
+        if discard:
+            self._close(connection)
+        with self._condition:
+            self.in_use -= 1
+            if discard:
+                self._opened -= 1
+                self.closed += 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Gestionnaire de contexte qui prête une connexion le temps d'un bloc *with*.
+        La connexion est écartée si une exception est levée dans le bloc.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        except Exception:
+            self.release(connection, discard=True)
+            raise
+        self.release(connection)
+
+    def close(self):
+        """
+        Fonction qui ferme toutes les connexions inactives du pool
+        """
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._opened -= len(idle)
+            self.closed += len(idle)
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie les métriques du pool pour aider à le dimensionner
+
+        :return: Dictionnaire des compteurs du pool
+        """
+        with self._condition:
+            return {'size': self.size,
+                    'opened': self._opened,
+                    'idle': len(self._idle),
+                    'in_use': self.in_use,
+                    'waiting': self.waiting,
+                    'created': self.created,
+                    'closed': self.closed,
+                    'timeouts': self.timeouts}
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def mysql_connection_factory(config: dict):
+    """
+    Fonction qui construit la fonction d'ouverture des connexions MySQL à partir de la configuration
+
+    :param config: Variables d'environnement chargées depuis le fichier .env
+    :return: Fonction sans argument renvoyant une nouvelle connexion MySQL
+    """
+    def connect():
+        # autocommit évite qu'une connexion réutilisée reste dans une transaction
+        # ouverte et continue à lire un instantané antérieur aux mises à jour
+        return mysql.connector.connect(
+            host=config['MYSQL_HOST'],
+            user=config['MYSQL_USER'],
+            password=config['MYSQL_PASSWORD'],
+            database="football_predictor",
+            autocommit=True
+        )
+    return connect
+
+
+def create_mongodb_client(config: dict, max_pool_size: int = 10):
+    """
+    Fonction qui crée le client MongoDB partagé par tout le processus
+
+    :param config: Variables d'environnement chargées depuis le fichier .env
+    :param max_pool_size: Nombre maximum de connexions gérées par le client
+    :return: Objet MongoClient
+    """
+    return pymongo.MongoClient(config.get('MONGODB_HOST') or 'localhost',
+                               int(config.get('MONGODB_PORT') or 27017),
+                               maxPoolSize=max_pool_size)
+
+
+class DatabaseExecutor:
+    """
+    Exécuteur dédié aux appels bloquants des drivers MySQL et MongoDB.
+
+    Les appels sont exécutés dans un pool de threads borné afin de ne jamais bloquer
+    la boucle d'événements de l'API pendant une requête lente.
+    """
+
+    def __init__(self, max_workers: int = 5):
+        """
+        :param max_workers: Nombre maximum d'appels exécutés simultanément
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='database')
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Fonction qui exécute un appel bloquant dans l'exécuteur et attend son résultat
+
+        :param func: Fonction bloquante à exécuter
+        :return: Résultat de la fonction
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        """
+        Fonction qui arrête l'exécuteur après la fin des appels en cours
+        """
+        self._executor.shutdown(wait=True)
+
+
+class Database:
+    """
+    Couche d'accès aux données non bloquante utilisée par les routes de l'API.
+
+    Regroupe le pool MySQL, le client MongoDB et l'exécuteur : chaque appel emprunte
+    une connexion et s'exécute dans un thread de l'exécuteur.
+    """
+
+    def __init__(self, mysql_pool: ConnectionPool, mongodb_client, executor: DatabaseExecutor,
+                 mongodb_name: str = 'football_predictor', slow_query_log=None, max_streams: int = None):
+        """
+        :param mysql_pool: Pool de connexions MySQL
+        :param mongodb_client: Client MongoDB partagé
+        :param executor: Exécuteur des appels bloquants
+        :param mongodb_name: Nom de la base MongoDB
+        :param slow_query_log: Journal des requêtes lentes (SlowQueryLog), None pour le désactiver
+        :param max_streams: Nombre maximum d'exports MySQL simultanés (par défaut la moitié du pool)
+        """
+        self.mysql_pool = mysql_pool
+        self.mongodb_client = mongodb_client
+        self.executor = executor
+        self.mongodb_name = mongodb_name
+        self.slow_query_log = slow_query_log
+        # Un export conserve sa connexion entre deux lots : s'ils occupaient tout le pool, les threads
+        # de l'exécuteur attendraient une connexion et les exports ne pourraient plus lire leur lot suivant
+        self._streams = asyncio.Semaphore(max_streams or max(1, mysql_pool.size // 2))
+
+    async def mysql(self, func, *args, **kwargs):
+        """
+        Fonction qui exécute *func(connection, ...)* avec une connexion du pool MySQL
+
+        :param func: Fonction de requête prenant la connexion en premier paramètre
+        :return: Résultat de la fonction
+        """
+        return await self.executor.run(self._with_connection, func, *args, **kwargs)
+
+    async def mongodb(self, func, *args, **kwargs):
+        """
+        Fonction qui exécute *func(db, ...)* sur la base MongoDB
+
+        :param func: Fonction de requête prenant la base MongoDB en premier paramètre
+        :return: Résultat de la fonction
+        """
+        return await self.executor.run(self._with_mongodb, func, *args, **kwargs)
+
+    async def stream_mysql(self, query: str, params: list, batch_size: int = 1000):
+        """
+        Générateur asynchrone qui lit le résultat d'une requête SQL par lots avec un curseur côté serveur.
+        La connexion est conservée pendant toute la lecture ; seul un lot est en mémoire à la fois.
+
+        :param query: Requête SQL paramétrée
+        :param params: Paramètres de la requête
+        :param batch_size: Nombre de lignes par lot
+        :return: Lots de lignes (listes de dictionnaires)
+        """
+        async with self._streams:
+            connection = await self.executor.run(self._acquire)
+            # Si la lecture est interrompue (client déconnecté), des lignes restent à lire
+            # sur la connexion : elle est alors fermée plutôt que remise dans le pool
+            discard = True
+            try:
+                cursor = await self.executor.run(self._execute_unbuffered, connection, query, params)
+                while True:
+                    rows = await self.executor.run(cursor.fetchmany, batch_size)
+                    if not rows:
+                        break
+                    yield rows
+                await self.executor.run(cursor.close)
+                discard = False
+            finally:
+                self.mysql_pool.release(connection, discard=discard)
+
+    async def stream_mongodb(self, collection: str, filter: dict, sort: list, batch_size: int = 1000,
+                             projection: Optional[dict] = None):
+        """
+        Générateur asynchrone qui lit les documents d'une collection MongoDB par lots
+
+        :param collection: Nom de la collection
+        :param filter: Filtre de la recherche
+        :param sort: Ordre de lecture (liste de tuples (champ, sens))
+        :param batch_size: Nombre de documents par lot
+        :param projection: Projection des documents (documents complets par défaut)
+        :return: Lots de documents
+        """
+        cursor = self.mongodb_client[self.mongodb_name][collection].find(filter, projection, sort=sort,
+                                                                         batch_size=batch_size)
+        try:
+            while True:
+                documents = await self.executor.run(self._read_batch, cursor, batch_size)
+                if not documents:
+                    break
+                yield documents
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _execute_unbuffered(connection, query: str, params: list):
+        with DB_QUERY_DURATION.labels('mysql', 'export').time():
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            cursor.execute(query, params)
+        return cursor
+
+    @staticmethod
+    def _read_batch(cursor, batch_size: int) -> list:
+        with DB_QUERY_DURATION.labels('mongodb', 'export').time():
+            return list(itertools.islice(cursor, batch_size))
+
+    def _acquire(self):
+        start = time.perf_counter()
+        connection = self.mysql_pool.acquire()
+        DB_POOL_WAIT.observe(time.perf_counter() - start)
+        return connection
+
+    def _with_connection(self, func, *args, **kwargs):
+        start = time.perf_counter()
+        with self.mysql_pool.connection() as connection:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+            if self.slow_query_log:
+                connection = self.slow_query_log.wrap_mysql(connection)
+            with DB_QUERY_DURATION.labels('mysql', query_name(func)).time():
+                return func(connection, *args, **kwargs)
+
+    def _with_mongodb(self, func, *args, **kwargs):
+        db = self.mongodb_client[self.mongodb_name]
+        if self.slow_query_log:
+            db = self.slow_query_log.wrap_mongodb(db)
+        with DB_QUERY_DURATION.labels('mongodb', query_name(func)).time():
+            return func(db, *args, **kwargs)
+
+    def close(self):
+        """
+        Fonction qui arrête l'exécuteur puis ferme les connexions et le journal des requêtes lentes
+        """
+        self.executor.shutdown()
+        self.mysql_pool.close()
+        self.mongodb_client.close()
+        if self.slow_query_log:
+            self.slow_query_log.close()
@@ -0,0 +1,192 @@
+from typing import Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from src.match_results import MATCH_RESULTS_COLLECTION
+
+# Collection des classements Elo courants (un document par équipe, _id = Team.id)
+ELO_RATINGS_COLLECTION = 'elo_ratings'
+# Collection de l'historique (un document par équipe et par match)
+ELO_HISTORY_COLLECTION = 'elo_history'
+
+# Classement d'une équipe lors de son premier match
+INITIAL_RATING = 1500.0
+# Coefficient K : variation maximale du classement pour un match (avant le multiplicateur d'écart de buts)
+K_FACTOR = 20.0
+# Avantage du terrain, en points Elo ajoutés à l'équipe à domicile pour le calcul du résultat attendu
+HOME_ADVANTAGE = 60.0
+
+# Index de la collection match_results (matchs pas encore pris en compte) et des collections Elo
+ELO_MATCH_INDEXES = [IndexModel([('elo_rated', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+                                name='elo_pending')]
+ELO_RATINGS_INDEXES = [IndexModel([('rating', DESCENDING)], name='rating')]
+ELO_HISTORY_INDEXES = [IndexModel([('team_id', ASCENDING), ('date', ASCENDING), ('match_id', ASCENDING)],
+                                  name='team_date')]
+
+def ensure_elo_indexes(db):
+    """
+    Fonction qui crée les index utilisés par les classements Elo (sans effet s'ils existent déjà)
+
+    :param db: Base MongoDB football_predictor
+    """
+    db[MATCH_RESULTS_COLLECTION].create_indexes(ELO_MATCH_INDEXES)
+    db[ELO_RATINGS_COLLECTION].create_indexes(ELO_RATINGS_INDEXES)
+    db[ELO_HISTORY_COLLECTION].create_indexes(ELO_HISTORY_INDEXES)
+
+def expected_result(rating: float, opponent_rating: float, advantage: float = 0.0) -> float:
+    """
+    Fonction qui calcule le résultat attendu d'une équipe (probabilité de victoire, le nul comptant pour moitié)
+
+    :param rating: Classement de l'équipe
+    :param opponent_rating: Classement de l'adversaire
+    :param advantage: Points ajoutés au classement de l'équipe (avantage du terrain)
+    :return: Résultat attendu entre 0 et 1
+    """
+    return 1 / (1 + 10 ** ((opponent_rating - rating - advantage) / 400))
+
+def goal_difference_multiplier(goal_difference: int) -> float:
+    """
+    Fonction qui renvoie le multiplicateur du coefficient K selon l'écart de buts
+    (1 pour un but d'écart, 1,5 pour deux buts, puis (11 + écart) / 8)
+
+    :param goal_difference: Écart de buts
+    :return: Multiplicateur
+    """
+    goal_difference = abs(goal_difference)
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11 + goal_difference) / 8
+
+
+class EloRatings:
+    """
+    Classements Elo des équipes, mis à jour match par match dans l'ordre chronologique
+    """
+
+    def __init__(self, ratings: Optional[dict] = None, k_factor: float = K_FACTOR,
+                 home_advantage: float = HOME_ADVANTAGE):
+        """
+        :param ratings: Dictionnaire identifiant de l'équipe -> {'rating', 'matches', 'name', 'last_match_date'}
+        :param k_factor: Coefficient K
+        :param home_advantage: Avantage du terrain en points Elo
+        """
+        self.ratings = ratings if ratings is not None else {}
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+
+    def rating(self, team_id: int) -> float:
+        """
+        Fonction qui renvoie le classement courant d'une équipe (classement initial si elle n'a pas encore joué)
+        """
+        state = self.ratings.get(team_id)
+        return state['rating'] if state else INITIAL_RATING
+
+    def apply(self, match: dict) -> list:
+        """
+        Fonction qui met à jour les classements des deux équipes d'un match joué
+
+        :param match: Document de la collection match_results (équipes associées à la table Team et score renseigné)
+        :return: Entrées d'historique des deux équipes
+        """
+        home, away = match['home_team'], match['away_team']
+        home_rating, away_rating = self.rating(home['id']), self.rating(away['id'])
+        goal_difference = match['score']['home'] - match['score']['away']
+        result = 1.0 if goal_difference > 0 else 0.5 if goal_difference == 0 else 0.0
+        change = (self.k_factor * goal_difference_multiplier(goal_difference)
+                  * (result - expected_result(home_rating, away_rating, self.home_advantage)))
+        entries = []
+        for team, opponent, before, delta, at_home in ((home, away, home_rating, change, True),
+                                                       (away, home, away_rating, -change, False)):
+            state = self.ratings.setdefault(team['id'], {'rating': INITIAL_RATING, 'matches': 0})
+            state.update(rating=before + delta, matches=state['matches'] + 1, name=team['name'],
+                         last_match_date=match['date'])
+            entries.append({'match_id': match['_id'], 'team_id': team['id'], 'opponent_id': opponent['id'],
+                            'home': at_home, 'league': match['league'], 'season': match['season'],
+                            'matchday': match['matchday'], 'date': match['date'],
+                            'rating_before': before, 'rating_after': before + delta, 'change': delta})
+        return entries
+
+    def apply_all(self, matches) -> list:
+        """
+        Fonction qui applique une liste de matchs triés par date
+
+        :param matches: Documents de la collection match_results
+        :return: Entrées d'historique
+        """
+        entries = []
+        for match in matches:
+            entries.extend(self.apply(match))
+        return entries
+
+
+def rateable_filter() -> dict:
+    """
+    Fonction qui renvoie le filtre des matchs joués dont les deux équipes sont associées à la table Team
+    """
+    return {'score': {'$ne': None}, 'home_team.id': {'$ne': None}, 'away_team.id': {'$ne': None}}
+
+def load_ratings(db) -> EloRatings:
+    """
+    Fonction qui charge les classements courants enregistrés dans MongoDB
+
+    :param db: Base MongoDB football_predictor
+    :return: Objet EloRatings
+    """
+    return EloRatings({document.pop('_id'): document for document in db[ELO_RATINGS_COLLECTION].find({})})
+
+def update_ratings(db) -> int:
+    """
+    Fonction qui applique aux classements les seuls matchs joués qui n'ont pas encore été pris en compte,
+    dans l'ordre chronologique, puis enregistre les classements des équipes concernées et leur historique.
+    Un résultat ajouté après des matchs plus récents est appliqué à son insertion (voir rebuild_ratings).
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs appliqués
+    """
+    ensure_elo_indexes(db)
+    matches = list(db[MATCH_RESULTS_COLLECTION].find({'elo_rated': {'$ne': True}, **rateable_filter()},
+                                                     sort=[('date', ASCENDING), ('_id', ASCENDING)]))
+    if not matches:
+        return 0
+    ratings = load_ratings(db)
+    entries = ratings.apply_all(matches)
+    teams = {entry['team_id'] for entry in entries}
+    db[ELO_RATINGS_COLLECTION].bulk_write([UpdateOne({'_id': team_id}, {'$set': ratings.ratings[team_id]},
+                                                     upsert=True) for team_id in sorted(teams)], ordered=False)
+    db[ELO_HISTORY_COLLECTION].insert_many(entries, ordered=False)
+    db[MATCH_RESULTS_COLLECTION].update_many({'_id': {'$in': [match['_id'] for match in matches]}},
+                                             {'$set': {'elo_rated': True}})
+    return len(matches)
+
+def rebuild_ratings(db) -> int:
+    """
+    Fonction qui recalcule tous les classements et leur historique depuis le premier match
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs appliqués
+    """
+    db[ELO_RATINGS_COLLECTION].delete_many({})
+    db[ELO_HISTORY_COLLECTION].delete_many({})
+    db[MATCH_RESULTS_COLLECTION].update_many({'elo_rated': True}, {'$unset': {'elo_rated': ''}})
+    return update_ratings(db)
+
+def verify_ratings(db, tolerance: float = 1e-6) -> dict:
+    """
+    Fonction qui recalcule en mémoire les classements depuis le premier match et les compare
+    aux classements enregistrés (sans rien modifier)
+
+    :param db: Base MongoDB football_predictor
+    :param tolerance: Écart toléré entre les deux classements
+    :return: Dictionnaire identifiant de l'équipe -> (classement enregistré, classement recalculé) des équipes en écart
+    """
+    expected = EloRatings()
+    expected.apply_all(db[MATCH_RESULTS_COLLECTION].find({'elo_rated': True, **rateable_filter()},
+                                                         sort=[('date', ASCENDING), ('_id', ASCENDING)]))
+    stored = load_ratings(db)
+    differences = {}
+    for team_id in set(expected.ratings) | set(stored.ratings):
+        if team_id not in stored.ratings or team_id not in expected.ratings \
+                or abs(stored.rating(team_id) - expected.rating(team_id)) > tolerance:
+            differences[team_id] = (stored.ratings.get(team_id, {}).get('rating'),
+                                    expected.ratings.get(team_id, {}).get('rating'))
+    return differences
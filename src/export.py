@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+from src.serialization import dumps
+
+# Formats d'export disponibles et type MIME associé
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Encodeur réutilisé pour chaque ligne (json.dumps avec options en recrée un à chaque appel)
+_json_encoder = json.JSONEncoder(default=str, ensure_ascii=False)
+
+def flatten(document: dict, prefix: str = '') -> dict:
+    """
+    Fonction qui aplatit un document imbriqué pour l'export CSV ({'score': {'home': 1}} -> {'score.home': 1}).
+    Les listes sont conservées sous forme de chaîne JSON.
+
+    :param document: Document à aplatir
+    :param prefix: Préfixe des clés (utilisé pour la récursion)
+    :return: Dictionnaire à un seul niveau
+    """
+    flat = {}
+    for key, value in document.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, list):
+            flat[f"{prefix}{key}"] = _json_encoder.encode(value)
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+async def ndjson_lines(batches):
+    """
+    Générateur asynchrone qui encode des lots de lignes en NDJSON (un objet JSON par ligne)
+
+    :param batches: Générateur asynchrone de lots de lignes
+    :return: Morceaux de la réponse encodés en UTF-8 (un par lot)
+    """
+    async for rows in batches:
+        yield b''.join(dumps(row) + b'\n' for row in rows)
+
+async def csv_lines(batches, fieldnames: list):
+    """
+    Générateur asynchrone qui encode des lots de lignes en CSV (les documents imbriqués sont aplatis).
+    L'en-tête est écrit même sans aucune ligne ; une valeur absente d'une ligne (sous-document à None,
+    champ manquant) laisse la case vide.
+
+    :param batches: Générateur asynchrone de lots de lignes
+    :param fieldnames: Colonnes du fichier (clés aplaties, ex : 'score.home')
+    :return: Morceaux de la réponse encodés en UTF-8 (l'en-tête, puis un par lot)
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue().encode()
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(flatten(row) for row in rows)
+        yield buffer.getvalue().encode()
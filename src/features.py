@@ -0,0 +1,207 @@
+import datetime
+from typing import Optional
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from src import queries
+from src.elo import rateable_filter
+from src.match_results import MATCH_RESULTS_COLLECTION
+
+# Collection de la forme courante (un document par équipe, _id = Team.id : derniers résultats de l'équipe)
+FORM_COLLECTION = 'team_form'
+# Collection des caractéristiques d'avant-match (un document par équipe et par match joué)
+FORM_HISTORY_COLLECTION = 'team_form_history'
+
+# Nombre de matchs de la fenêtre glissante (tous les matchs, matchs à domicile, matchs à l'extérieur)
+FORM_WINDOW = 5
+# Lettre de chaque résultat dans la forme (victoire, nul, défaite) selon les points obtenus
+RESULT_LETTERS = {3: 'V', 1: 'N', 0: 'D'}
+
+# Index de la collection match_results (matchs pas encore pris en compte) et des collections de forme
+FORM_MATCH_INDEXES = [IndexModel([('form_built', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+                                 name='form_pending')]
+FORM_HISTORY_INDEXES = [IndexModel([('match_id', ASCENDING), ('team_id', ASCENDING)], name='match_team'),
+                        IndexModel([('team_id', ASCENDING), ('date', ASCENDING)], name='team_date')]
+
+def ensure_form_indexes(db):
+    """
+    Fonction qui crée les index utilisés par les caractéristiques de forme (sans effet s'ils existent déjà)
+
+    :param db: Base MongoDB football_predictor
+    """
+    db[MATCH_RESULTS_COLLECTION].create_indexes(FORM_MATCH_INDEXES)
+    db[FORM_HISTORY_COLLECTION].create_indexes(FORM_HISTORY_INDEXES)
+
+def average(values: list) -> Optional[float]:
+    """
+    Fonction qui renvoie la moyenne d'une liste (None si elle est vide)
+    """
+    return round(sum(values) / len(values), 4) if values else None
+
+def match_points(goals_for: int, goals_against: int) -> int:
+    """
+    Fonction qui renvoie les points obtenus pour un score (3 pour une victoire, 1 pour un nul)
+    """
+    return 3 if goals_for > goals_against else 1 if goals_for == goals_against else 0
+
+def form_features(state: Optional[dict], date: str) -> dict:
+    """
+    Fonction qui calcule les caractéristiques d'une équipe avant un match à partir de sa forme
+
+    :param state: Forme de l'équipe (None si elle n'a pas encore joué)
+    :param date: Date du match (YYYY-MM-dd)
+    :return: Dictionnaire des caractéristiques (moyennes à None sans match dans la fenêtre)
+    """
+    state = state or {}
+    recent, home, away = state.get('recent', []), state.get('home_recent', []), state.get('away_recent', [])
+    last_match_date = state.get('last_match_date')
+    return {'matches': state.get('matches', 0),
+            'form': ''.join(RESULT_LETTERS[match_points(*result)] for result in recent),
+            'points_per_game': average([match_points(*result) for result in recent]),
+            'goals_for': average([result[0] for result in recent]),
+            'goals_against': average([result[1] for result in recent]),
+            'home_goals_for': average([result[0] for result in home]),
+            'home_goals_against': average([result[1] for result in home]),
+            'away_goals_for': average([result[0] for result in away]),
+            'away_goals_against': average([result[1] for result in away]),
+            'rest_days': (datetime.date.fromisoformat(date) - datetime.date.fromisoformat(last_match_date)).days
+            if last_match_date else None}
+
+
+class FormTracker:
+    """
+    Forme des équipes (derniers résultats), mise à jour match par match dans l'ordre chronologique
+    """
+
+    def __init__(self, states: Optional[dict] = None, window: int = FORM_WINDOW):
+        """
+        :param states: Dictionnaire identifiant de l'équipe -> {'recent', 'home_recent', 'away_recent', 'matches',
+                       'name', 'last_match_date'} (résultats [buts marqués, buts encaissés], du plus ancien au plus récent)
+        :param window: Nombre de matchs de la fenêtre glissante
+        """
+        self.states = states if states is not None else {}
+        self.window = window
+
+    def apply(self, match: dict) -> list:
+        """
+        Fonction qui enregistre le résultat d'un match joué dans la forme des deux équipes
+
+        :param match: Document de la collection match_results (équipes associées à la table Team et score renseigné)
+        :return: Entrées d'historique des deux équipes (caractéristiques avant le match)
+        """
+        home, away = match['home_team'], match['away_team']
+        score = match['score']
+        entries = []
+        for team, opponent, result, at_home in ((home, away, [score['home'], score['away']], True),
+                                                (away, home, [score['away'], score['home']], False)):
+            state = self.states.setdefault(team['id'], {'recent': [], 'home_recent': [], 'away_recent': [],
+                                                        'matches': 0})
+            entries.append({'match_id': match['_id'], 'team_id': team['id'], 'opponent_id': opponent['id'],
+                            'home': at_home, 'league': match['league'], 'season': match['season'],
+                            'matchday': match['matchday'], 'date': match['date'],
+                            'features': form_features(state, match['date'])})
+            side = 'home_recent' if at_home else 'away_recent'
+            state.update(recent=(state['recent'] + [result])[-self.window:],
+                         **{side: (state[side] + [result])[-self.window:]},
+                         matches=state['matches'] + 1, name=team['name'], last_match_date=match['date'])
+        return entries
+
+    def apply_all(self, matches) -> list:
+        """
+        Fonction qui applique une liste de matchs triés par date
+
+        :param matches: Documents de la collection match_results
+        :return: Entrées d'historique
+        """
+        entries = []
+        for match in matches:
+            entries.extend(self.apply(match))
+        return entries
+
+
+def update_features(db) -> int:
+    """
+    Fonction qui applique à la forme des équipes les seuls matchs joués qui n'ont pas encore été pris en compte,
+    dans l'ordre chronologique : seules les formes des équipes de ces matchs sont lues et réécrites.
+    Un résultat ajouté après des matchs plus récents est appliqué à son insertion (voir rebuild_features).
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs appliqués
+    """
+    ensure_form_indexes(db)
+    matches = list(db[MATCH_RESULTS_COLLECTION].find({'form_built': {'$ne': True}, **rateable_filter()},
+                                                     sort=[('date', ASCENDING), ('_id', ASCENDING)]))
+    if not matches:
+        return 0
+    teams = sorted({match[side]['id'] for match in matches for side in ('home_team', 'away_team')})
+    tracker = FormTracker({document.pop('_id'): document
+                           for document in db[FORM_COLLECTION].find({'_id': {'$in': teams}})})
+    entries = tracker.apply_all(matches)
+    db[FORM_COLLECTION].bulk_write([UpdateOne({'_id': team_id}, {'$set': tracker.states[team_id]}, upsert=True)
+                                    for team_id in teams], ordered=False)
+    db[FORM_HISTORY_COLLECTION].insert_many(entries, ordered=False)
+    db[MATCH_RESULTS_COLLECTION].update_many({'_id': {'$in': [match['_id'] for match in matches]}},
+                                             {'$set': {'form_built': True}})
+    return len(matches)
+
+def rebuild_features(db) -> int:
+    """
+    Fonction qui recalcule la forme de toutes les équipes et l'historique des caractéristiques depuis le premier match
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs appliqués
+    """
+    db[FORM_COLLECTION].delete_many({})
+    db[FORM_HISTORY_COLLECTION].delete_many({})
+    db[MATCH_RESULTS_COLLECTION].update_many({'form_built': True}, {'$unset': {'form_built': ''}})
+    return update_features(db)
+
+def fixture_features(db, fixtures: list) -> list:
+    """
+    Fonction qui renvoie les caractéristiques des deux équipes de chaque match d'une liste, en deux lectures au plus :
+    l'historique (par identifiant de match) pour les matchs déjà pris en compte,
+    la forme courante (par identifiant d'équipe) pour les autres
+
+    :param db: Base MongoDB football_predictor
+    :param fixtures: Documents de la collection match_results
+    :return: Liste de tuples (caractéristiques de l'équipe à domicile, de l'équipe à l'extérieur)
+    """
+    built = [fixture['_id'] for fixture in fixtures if fixture.get('form_built')]
+    history = {}
+    if built:
+        for entry in db[FORM_HISTORY_COLLECTION].find({'match_id': {'$in': built}}):
+            history[(entry['match_id'], entry['team_id'])] = entry['features']
+    teams = sorted({fixture[side]['id'] for fixture in fixtures if not fixture.get('form_built')
+                    for side in ('home_team', 'away_team') if fixture[side]['id'] is not None})
+    states = {}
+    if teams:
+        states = {document.pop('_id'): document for document in db[FORM_COLLECTION].find({'_id': {'$in': teams}})}
+
+    def features(fixture: dict, side: str) -> dict:
+        if fixture.get('form_built'):
+            return history.get((fixture['_id'], fixture[side]['id'])) or form_features(None, fixture['date'])
+        return form_features(states.get(fixture[side]['id']), fixture['date'])
+
+    return [(features(fixture, 'home_team'), features(fixture, 'away_team')) for fixture in fixtures]
+
+def matchday_features(db, league: str, season: int, matchday: Optional[int]) -> list:
+    """
+    Fonction qui renvoie les caractéristiques de forme des équipes de tous les matchs d'une journée
+
+    :param db: Base MongoDB football_predictor
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :param matchday: Numéro de la journée (par défaut la première journée dont un match n'a pas été joué)
+    :return: Liste des matchs de la journée avec les caractéristiques des deux équipes
+    """
+    if matchday is None:
+        unplayed = [document['matchday'] for document in queries.find_league_matches(db, league, [season])
+                    if not document.get('score')]
+        if not unplayed:
+            return []
+        matchday = min(unplayed)
+    fixtures = list(db[MATCH_RESULTS_COLLECTION].find({'league': league, 'season': f"{season}-{season + 1}",
+                                                       'matchday': matchday}, sort=[('_id', ASCENDING)]))
+    return [{'_id': str(fixture['_id']), 'league': fixture['league'], 'season': fixture['season'],
+             'matchday': fixture['matchday'], 'date': fixture['date'], 'home_team': fixture['home_team'],
+             'away_team': fixture['away_team'], 'score': fixture.get('score'),
+             'home_features': home, 'away_features': away}
+            for fixture, (home, away) in zip(fixtures, fixture_features(db, fixtures))]
@@ -65,7 +65,9 @@ CREATE TABLE `Ranking` (
     `lost` SMALLINT NOT NULL DEFAULT 0,
     FOREIGN KEY (`team_id`) REFERENCES `Team` (`id`) ON UPDATE CASCADE ON DELETE SET DEFAULT,
     FOREIGN KEY (`league_id`) REFERENCES `League` (`id`) ON UPDATE CASCADE ON DELETE CASCADE,
-    PRIMARY KEY (`team_id`, `league_id`, `type`)
+    PRIMARY KEY (`team_id`, `league_id`, `type`),
+    -- Ordre de tri et de pagination de la route /classements
+    INDEX `idx_ranking_order` (`league_id`, `type`, `position`, `team_id`)
 );
 
 INSERT INTO `Team` (`id`,`name`,`shortname`,`stadium`,`founded`) VALUES (999,'Equipe inconnue', 'Inconnu','Stade inconnu', 1900);
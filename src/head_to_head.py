@@ -0,0 +1,112 @@
+from typing import Optional
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from src.elo import rateable_filter
+from src.match_results import MATCH_RESULTS_COLLECTION
+
+# Collection des confrontations directes (un document par paire d'équipes, _id = pair_key des deux Team.id)
+HEAD_TO_HEAD_COLLECTION = 'head_to_head'
+# Nombre de dernières confrontations conservées par paire d'équipes
+HEAD_TO_HEAD_MEETINGS = 10
+
+# Index de la collection match_results (matchs pas encore pris en compte)
+HEAD_TO_HEAD_MATCH_INDEXES = [IndexModel([('h2h_built', ASCENDING), ('date', ASCENDING), ('_id', ASCENDING)],
+                                         name='h2h_pending')]
+
+def pair_key(team_id: int, other_id: int) -> str:
+    """
+    Fonction qui renvoie la clé d'une paire d'équipes (identifiants dans l'ordre croissant, ex : '3-12')
+    """
+    return f"{min(team_id, other_id)}-{max(team_id, other_id)}"
+
+
+class HeadToHead:
+    """
+    Bilan des confrontations directes entre équipes, mis à jour match par match dans l'ordre chronologique
+    """
+
+    def __init__(self, pairs: Optional[dict] = None, meetings: int = HEAD_TO_HEAD_MEETINGS):
+        """
+        :param pairs: Dictionnaire clé de la paire -> bilan (listes [première équipe, seconde équipe],
+                      dans l'ordre croissant des identifiants)
+        :param meetings: Nombre de dernières confrontations conservées
+        """
+        self.pairs = pairs if pairs is not None else {}
+        self.meetings = meetings
+
+    def apply(self, match: dict) -> str:
+        """
+        Fonction qui ajoute un match joué au bilan de la paire d'équipes
+
+        :param match: Document de la collection match_results (équipes associées à la table Team et score renseigné)
+        :return: Clé de la paire
+        """
+        home, away = match['home_team'], match['away_team']
+        key = pair_key(home['id'], away['id'])
+        first, second = (home, away) if home['id'] < away['id'] else (away, home)
+        pair = self.pairs.setdefault(key, {'team_ids': [first['id'], second['id']], 'played': 0, 'wins': [0, 0],
+                                           'draws': 0, 'goals': [0, 0], 'home_wins': [0, 0], 'meetings': []})
+        goals = [match['score']['home'], match['score']['away']]
+        if first is away:
+            goals.reverse()
+        pair['played'] += 1
+        pair['goals'] = [pair['goals'][0] + goals[0], pair['goals'][1] + goals[1]]
+        if goals[0] == goals[1]:
+            pair['draws'] += 1
+        else:
+            winner = 0 if goals[0] > goals[1] else 1
+            pair['wins'][winner] += 1
+            if (first, second)[winner] is home:
+                pair['home_wins'][winner] += 1
+        pair['team_names'] = [first['name'], second['name']]
+        # Dernières confrontations, de la plus récente à la plus ancienne
+        pair['meetings'] = [{'match_id': match['_id'], 'league': match['league'], 'season': match['season'],
+                             'matchday': match['matchday'], 'date': match['date'], 'home_team_id': home['id'],
+                             'score': {'home': match['score']['home'], 'away': match['score']['away']}}
+                            ] + pair['meetings'][:self.meetings - 1]
+        return key
+
+    def apply_all(self, matches) -> set:
+        """
+        Fonction qui applique une liste de matchs triés par date
+
+        :param matches: Documents de la collection match_results
+        :return: Clés des paires modifiées
+        """
+        return {self.apply(match) for match in matches}
+
+
+def update_head_to_head(db) -> int:
+    """
+    Fonction qui ajoute aux bilans des confrontations directes les seuls matchs joués qui n'ont pas encore été
+    pris en compte, dans l'ordre chronologique : seuls les bilans des paires d'équipes de ces matchs sont lus
+    et réécrits. Un résultat ajouté après des matchs plus récents est appliqué à son insertion
+    (ordre des dernières confrontations, voir rebuild_head_to_head).
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs appliqués
+    """
+    db[MATCH_RESULTS_COLLECTION].create_indexes(HEAD_TO_HEAD_MATCH_INDEXES)
+    matches = list(db[MATCH_RESULTS_COLLECTION].find({'h2h_built': {'$ne': True}, **rateable_filter()},
+                                                     sort=[('date', ASCENDING), ('_id', ASCENDING)]))
+    if not matches:
+        return 0
+    keys = sorted({pair_key(match['home_team']['id'], match['away_team']['id']) for match in matches})
+    head_to_head = HeadToHead({document.pop('_id'): document
+                               for document in db[HEAD_TO_HEAD_COLLECTION].find({'_id': {'$in': keys}})})
+    head_to_head.apply_all(matches)
+    db[HEAD_TO_HEAD_COLLECTION].bulk_write([UpdateOne({'_id': key}, {'$set': head_to_head.pairs[key]}, upsert=True)
+                                            for key in keys], ordered=False)
+    db[MATCH_RESULTS_COLLECTION].update_many({'_id': {'$in': [match['_id'] for match in matches]}},
+                                             {'$set': {'h2h_built': True}})
+    return len(matches)
+
+def rebuild_head_to_head(db) -> int:
+    """
+    Fonction qui recalcule les bilans de toutes les paires d'équipes depuis le premier match
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs appliqués
+    """
+    db[HEAD_TO_HEAD_COLLECTION].delete_many({})
+    db[MATCH_RESULTS_COLLECTION].update_many({'h2h_built': True}, {'$unset': {'h2h_built': ''}})
+    return update_head_to_head(db)
@@ -0,0 +1,128 @@
+import re
+from typing import Optional
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+# Collection MongoDB contenant un document par match
+MATCH_RESULTS_COLLECTION = 'match_results'
+# Colonnes de l'export CSV d'un document match_results (sous-documents aplatis, cases vides pour un match non joué
+# ou sans score à la mi-temps)
+MATCH_EXPORT_COLUMNS = ['_id', 'league', 'season', 'matchday', 'date', 'home_team.id', 'home_team.name',
+                        'away_team.id', 'away_team.name', 'score.home', 'score.away',
+                        'score_halftime.home', 'score_halftime.away']
+
+# Index de la collection match_results :
+# - listes par championnat / saison / journée (route /matches et pagination par curseur)
+# - listes par saison / journée sans filtre de championnat
+# - matchs d'une équipe sur une période, à domicile et à l'extérieur
+MATCH_RESULTS_INDEXES = [
+    IndexModel([('league', ASCENDING), ('season', ASCENDING), ('matchday', ASCENDING), ('_id', ASCENDING)],
+               name='league_season_matchday'),
+    IndexModel([('season', ASCENDING), ('matchday', ASCENDING), ('_id', ASCENDING)],
+               name='season_matchday'),
+    IndexModel([('home_team.id', ASCENDING), ('date', ASCENDING)], name='home_team_date'),
+    IndexModel([('away_team.id', ASCENDING), ('date', ASCENDING)], name='away_team_date'),
+]
+
+def ensure_indexes(db):
+    """
+    Fonction qui crée les index de la collection match_results (sans effet s'ils existent déjà)
+
+    :param db: Base MongoDB football_predictor
+    """
+    db[MATCH_RESULTS_COLLECTION].create_indexes(MATCH_RESULTS_INDEXES)
+
+def parse_score(score) -> Optional[dict]:
+    """
+    Fonction qui convertit un score au format {'home': buts, 'away': buts}
+
+    :param score: Score de l'API football-data ({'home': 2, 'away': 1}) ou du webscraping ('2 - 1')
+    :return: Dictionnaire du score, ou None si le match n'a pas été joué
+    """
+    if isinstance(score, dict):
+        if score.get('home') is None or score.get('away') is None:
+            return None
+        return {'home': int(score['home']), 'away': int(score['away'])}
+    if isinstance(score, str):
+        result = re.fullmatch(r'\s*(\d+)\s*[-–]\s*(\d+)\s*', score)
+        if result:
+            return {'home': int(result.group(1)), 'away': int(result.group(2))}
+    return None
+
+def team_reference(team) -> dict:
+    """
+    Fonction qui renvoie la référence d'une équipe au format {'id': identifiant MySQL, 'name': nom}
+
+    :param team: Équipe telle qu'enregistrée dans la collection matches (dictionnaire ou nom seul)
+    :return: Dictionnaire de l'équipe (id à None si l'équipe n'a pas encore été associée à la table Team)
+    """
+    if isinstance(team, dict):
+        return {'id': team.get('id'), 'name': team.get('name')}
+    return {'id': None, 'name': team}
+
+def match_document(league: str, season: str, matchday: int, date: str, match: dict) -> dict:
+    """
+    Fonction qui construit le document d'un match de la collection match_results
+
+    :param league: Nom du championnat
+    :param season: Saison (ex : '2022-2023')
+    :param matchday: Numéro de la journée
+    :param date: Date du match (YYYY-MM-dd)
+    :param match: Match tel qu'enregistré dans la collection matches
+    :return: Document du match
+    """
+    return {'league': league,
+            'season': season,
+            'matchday': int(matchday),
+            'date': date,
+            'home_team': team_reference(match['home_team']),
+            'away_team': team_reference(match['away_team']),
+            'score': parse_score(match.get('score')),
+            'score_halftime': parse_score(match.get('score_halftime'))}
+
+def split_matchday(document: dict) -> list:
+    """
+    Fonction qui découpe un document de la collection matches en un document par match.
+    Les documents de Ligue 1 contiennent une liste de matchs, ceux de Ligue 2 une date et ses résultats.
+
+    :param document: Document de la collection matches
+    :return: Liste des documents de la collection match_results
+    """
+    matches = document['matches']
+    if isinstance(matches, dict):
+        return [match_document(document['league'], document['season'], document['matchday'], matches['date'], match)
+                for match in matches['results']]
+    return [match_document(document['league'], document['season'], document['matchday'], match['date'], match)
+            for match in matches]
+
+def upsert_matches(collection, documents: list) -> int:
+    """
+    Fonction qui insère ou remplace des matchs dans la collection match_results.
+    Un match est identifié par son championnat, sa saison, sa journée et son équipe à domicile.
+
+    :param collection: Collection match_results
+    :param documents: Documents des matchs
+    :return: Nombre de matchs insérés ou modifiés
+    """
+    if not documents:
+        return 0
+    operations = [UpdateOne({'league': document['league'],
+                             'season': document['season'],
+                             'matchday': document['matchday'],
+                             'home_team.name': document['home_team']['name']},
+                            {'$set': document}, upsert=True)
+                  for document in documents]
+    result = collection.bulk_write(operations, ordered=False)
+    return result.upserted_count + result.modified_count
+
+def migrate_matches(db) -> int:
+    """
+    Fonction qui construit la collection match_results à partir de la collection matches
+
+    :param db: Base MongoDB football_predictor
+    :return: Nombre de matchs insérés ou modifiés
+    """
+    ensure_indexes(db)
+    documents = []
+    for matchday in db['matches'].find({}, sort=[('_id', ASCENDING)]):
+        documents.extend(split_matchday(matchday))
+    return upsert_matches(db[MATCH_RESULTS_COLLECTION], documents)
@@ -0,0 +1,208 @@
+import datetime
+import json
+import os
+import struct
+import threading
+from typing import Optional
+import numpy as np
+from bson import ObjectId
+from src.match_results import MATCH_RESULTS_COLLECTION
+
+# Fichier du magasin de matchs (dossier data à la racine du projet), partagé par les scripts et les processus de l'API
+MATCH_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'match_store.bin')
+
+# Signature du format et alignement des colonnes dans le fichier (octets)
+MAGIC = b'FPMATCH1'
+ALIGNMENT = 64
+# Numéro du jour (datetime.date.toordinal) du 1er janvier 1970, origine des dates NumPy
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# Colonnes du magasin : nom -> type NumPy (identifiant d'équipe -1 si inconnu, buts -1 si le match n'est pas joué).
+# L'identifiant du match (ObjectId) est stocké en octets bruts : le type 'S' supprimerait ses octets nuls finaux.
+COLUMNS = {'match_id': 'V12', 'league': 'u1', 'season': '<i2', 'matchday': '<i2', 'date': '<M8[D]',
+           'home_id': '<i4', 'away_id': '<i4', 'home_goals': '<i2', 'away_goals': '<i2'}
+
+def match_columns(documents: list) -> tuple:
+    """
+    Fonction qui convertit des documents de la collection match_results en colonnes NumPy,
+    triées par championnat, saison, journée, date et identifiant
+
+    :param documents: Documents de la collection match_results
+    :return: Tuple (colonnes, noms des championnats, noms des équipes par identifiant)
+    """
+    leagues = sorted({document['league'] for document in documents})
+    league_codes = {league: code for code, league in enumerate(leagues)}
+    teams = {}
+    rows = []
+    for document in documents:
+        home, away, score = document['home_team'], document['away_team'], document.get('score') or {}
+        for team in (home, away):
+            if team['id'] is not None:
+                teams[team['id']] = team['name']
+        rows.append((league_codes[document['league']], int(document['season'][:4]), document['matchday'],
+                     document['date'], ObjectId(document['_id']).binary,
+                     -1 if home['id'] is None else home['id'], -1 if away['id'] is None else away['id'],
+                     -1 if score.get('home') is None else score['home'],
+                     -1 if score.get('away') is None else score['away']))
+    rows.sort(key=lambda row: row[:5])
+    columns = {'league': np.array([row[0] for row in rows], dtype=COLUMNS['league']),
+               'season': np.array([row[1] for row in rows], dtype=COLUMNS['season']),
+               'matchday': np.array([row[2] for row in rows], dtype=COLUMNS['matchday']),
+               'date': np.array([row[3] for row in rows], dtype=COLUMNS['date']),
+               'match_id': np.array([row[4] for row in rows], dtype=COLUMNS['match_id']),
+               'home_id': np.array([row[5] for row in rows], dtype=COLUMNS['home_id']),
+               'away_id': np.array([row[6] for row in rows], dtype=COLUMNS['away_id']),
+               'home_goals': np.array([row[7] for row in rows], dtype=COLUMNS['home_goals']),
+               'away_goals': np.array([row[8] for row in rows], dtype=COLUMNS['away_goals'])}
+    return columns, leagues, teams
+
+def write_match_store(documents: list, path: str = MATCH_STORE_PATH) -> int:
+    """
+    Fonction qui écrit le magasin de matchs : un en-tête JSON puis chaque colonne, alignée sur 64 octets.
+    Le fichier est écrit à côté puis remplace l'ancien d'un bloc : un processus qui lit l'ancien fichier
+    le conserve jusqu'à sa prochaine ouverture.
+
+    :param documents: Documents de la collection match_results
+    :param path: Chemin du fichier
+    :return: Nombre de matchs écrits
+    """
+    columns, leagues, teams = match_columns(documents)
+    rows = len(columns['league'])
+    # Plages de lignes [début, fin) de chaque saison de chaque championnat (lignes triées par championnat et saison)
+    keys = columns['league'].astype(np.int64) * 10000 + columns['season']
+    boundaries = np.flatnonzero(np.diff(keys)) + 1
+    starts, stops = np.concatenate([[0], boundaries]), np.concatenate([boundaries, [rows]])
+    ranges = {f"{leagues[columns['league'][start]]}|{columns['season'][start]}": [int(start), int(stop)]
+              for start, stop in zip(starts, stops) if stop > start}
+
+    layout, offset = [], 0
+    for name, dtype in COLUMNS.items():
+        layout.append({'name': name, 'dtype': dtype, 'offset': offset})
+        offset += -(-columns[name].nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({'rows': rows, 'columns': layout, 'leagues': leagues,
+                         'teams': {str(team_id): name for team_id, name in sorted(teams.items())},
+                         'ranges': ranges,
+                         'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')}
+                        ).encode()
+    # Début des données : après la signature, la longueur de l'en-tête et l'en-tête, aligné sur 64 octets
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'wb') as file:
+        file.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for column in layout:
+            file.seek(data_start + column['offset'])
+            file.write(columns[column['name']].tobytes())
+        file.truncate(data_start + offset)
+    os.replace(temporary_path, path)
+    return rows
+
+def build_match_store(db, path: str = MATCH_STORE_PATH) -> int:
+    """
+    Fonction qui écrit le magasin de matchs à partir de la collection match_results
+
+    :param db: Base MongoDB football_predictor
+    :param path: Chemin du fichier
+    :return: Nombre de matchs écrits
+    """
+    projection = {'league': 1, 'season': 1, 'matchday': 1, 'date': 1, 'home_team': 1, 'away_team': 1, 'score': 1}
+    return write_match_store(list(db[MATCH_RESULTS_COLLECTION].find({}, projection)), path)
+
+
+class MatchStore:
+    """
+    Magasin de matchs ouvert en lecture seule : chaque colonne est un tableau NumPy projeté en mémoire (mmap),
+    partagé par tous les processus qui ouvrent le même fichier, sans copie.
+    """
+
+    def __init__(self, path: str = MATCH_STORE_PATH):
+        """
+        :param path: Chemin du fichier
+        :raises: ValueError si le fichier n'est pas un magasin de matchs
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} n'est pas un magasin de matchs")
+            header_length, = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(header_length))
+        data_start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+        self.rows = header['rows']
+        self.leagues = header['leagues']
+        self.teams = {int(team_id): name for team_id, name in header['teams'].items()}
+        self.ranges = header['ranges']
+        self.created = header['created']
+        self.columns = {column['name']: np.memmap(path, dtype=column['dtype'], mode='r',
+                                                  offset=data_start + column['offset'], shape=(self.rows,))
+                        if self.rows else np.empty(0, dtype=column['dtype'])
+                        for column in header['columns']}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def season(self, league: str, season: int) -> dict:
+        """
+        Fonction qui renvoie les colonnes des matchs d'une saison d'un championnat (vues sans copie)
+
+        :param league: Nom du championnat
+        :param season: Année de début de la saison
+        :return: Dictionnaire nom de la colonne -> tableau (vide si la saison est absente)
+        """
+        start, stop = self.ranges.get(f"{league}|{season}", (0, 0))
+        return {name: column[start:stop] for name, column in self.columns.items()}
+
+    def results(self, league: str, seasons: list, before: Optional[int] = None) -> dict:
+        """
+        Fonction qui renvoie les matchs joués de saisons d'un championnat, au format de prediction.result_arrays
+        (les matchs dont une équipe n'est pas associée à la table Team sont ignorés)
+
+        :param league: Nom du championnat
+        :param seasons: Années de début des saisons
+        :param before: Numéro du jour (datetime.date.toordinal, exclu) avant lequel les matchs sont retenus
+                       (tous les matchs joués si None)
+        :return: Dictionnaire de tableaux home_ids, away_ids, home_goals, away_goals et days (numéro du jour)
+        """
+        columns = [self.season(league, season) for season in sorted(seasons)]
+        columns = {name: np.concatenate([season[name] for season in columns]) for name in COLUMNS}
+        played = ((columns['home_id'] >= 0) & (columns['away_id'] >= 0)
+                  & (columns['home_goals'] >= 0) & (columns['away_goals'] >= 0))
+        if before is not None:
+            played &= columns['date'].astype(np.int64) + EPOCH_ORDINAL < before
+        return {'home_ids': columns['home_id'][played].astype(int),
+                'away_ids': columns['away_id'][played].astype(int),
+                'home_goals': columns['home_goals'][played].astype(float),
+                'away_goals': columns['away_goals'][played].astype(float),
+                # Numéro du jour au sens de datetime.date.toordinal
+                'days': (columns['date'][played].astype(np.int64) + EPOCH_ORDINAL).astype(float)}
+
+
+class SharedMatchStore:
+    """
+    Accès au magasin de matchs courant : le fichier est rouvert dès qu'il a été remplacé par une nouvelle version
+    """
+
+    def __init__(self, path: str = MATCH_STORE_PATH):
+        """
+        :param path: Chemin du fichier
+        """
+        self.path = path
+        self._store = None
+        self._identity = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[MatchStore]:
+        """
+        Fonction qui renvoie le magasin courant, rouvert si le fichier a été remplacé depuis la dernière ouverture
+
+        :return: Objet MatchStore, ou None si le fichier n'existe pas
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if identity != self._identity:
+                self._store = MatchStore(self.path)
+                self._identity = identity
+            return self._store
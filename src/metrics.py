@@ -0,0 +1,118 @@
+import time
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+
+# Bornes des histogrammes de durée (secondes) : de la milliseconde à 10 secondes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = Counter('api_requests_total', "Nombre de requêtes HTTP traitées",
+                   ['method', 'route', 'status'])
+REQUEST_DURATION = Histogram('api_request_duration_seconds', "Durée de traitement des requêtes HTTP",
+                             ['method', 'route'], buckets=LATENCY_BUCKETS)
+DB_QUERY_DURATION = Histogram('api_db_query_duration_seconds', "Durée d'exécution des requêtes en base",
+                              ['database', 'query'], buckets=LATENCY_BUCKETS)
+DB_POOL_WAIT = Histogram('api_db_pool_wait_seconds', "Durée d'attente d'une connexion du pool MySQL",
+                         buckets=LATENCY_BUCKETS)
+# Regroupement des appels simultanés (src/batching.py) : taille des lots, attente de chaque élément
+# avant l'évaluation de son lot (coût en latence de la fenêtre) et durée d'évaluation d'un lot
+BATCH_SIZE = Histogram('api_batch_size', "Nombre d'éléments par lot évalué", ['batcher'],
+                       buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+BATCH_WAIT = Histogram('api_batch_wait_seconds', "Attente d'un élément avant l'évaluation de son lot", ['batcher'],
+                       buckets=LATENCY_BUCKETS)
+BATCH_DURATION = Histogram('api_batch_duration_seconds', "Durée d'évaluation d'un lot", ['batcher'],
+                           buckets=LATENCY_BUCKETS)
+JWT_VERIFICATION_DURATION = Histogram('api_jwt_verification_duration_seconds', "Durée de vérification des tokens JWT",
+                                      ['cache'], buckets=LATENCY_BUCKETS)
+
+def query_name(func) -> str:
+    """
+    Fonction qui renvoie le nom d'une fonction de requête, utilisé comme forme de la requête dans les métriques
+
+    :param func: Fonction de requête (ex : queries.select_players)
+    :return: Nom qualifié de la fonction (ex : 'select_players')
+    """
+    return getattr(func, '__qualname__', type(func).__name__)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI qui compte les requêtes HTTP et mesure leur durée par route.
+
+    La route est identifiée par son chemin déclaré (ex : /joueurs) et non par l'URL demandée,
+    pour borner le nombre de séries. La durée s'arrête à l'envoi du dernier morceau de la réponse,
+    ce qui inclut la lecture complète des routes d'export en flux.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            path = route.path if route is not None else 'unmatched'
+            REQUESTS.labels(scope['method'], path, str(status)).inc()
+            REQUEST_DURATION.labels(scope['method'], path).observe(time.perf_counter() - start)
+
+
+class StatsCollector:
+    """
+    Collecteur Prometheus qui publie, au moment de la collecte, les compteurs internes de l'API
+    (méthodes stats() du pool MySQL et des caches)
+    """
+
+    def __init__(self, sources: dict, counters: set):
+        """
+        :param sources: Dictionnaire nom du composant -> fonction sans argument renvoyant ses compteurs (ou None)
+        :param counters: Noms des compteurs cumulés (les autres valeurs sont publiées comme jauges)
+        """
+        self.sources = sources
+        self.counters = counters
+
+    def collect(self):
+        for component, stats in self.sources.items():
+            values = stats()
+            if not values:
+                continue
+            for name, value in values.items():
+                if value is None:
+                    continue
+                metric_name = f'api_{component}_{name}'
+                if name in self.counters:
+                    yield CounterMetricFamily(metric_name, f"{component} : {name}", value=value)
+                else:
+                    yield GaugeMetricFamily(metric_name, f"{component} : {name}", value=value)
+
+def register_stats(sources: dict, counters: set) -> StatsCollector:
+    """
+    Fonction qui enregistre un StatsCollector dans le registre Prometheus par défaut
+
+    :param sources: Dictionnaire nom du composant -> fonction renvoyant ses compteurs
+    :param counters: Noms des compteurs cumulés
+    :return: Collecteur enregistré
+    """
+    collector = StatsCollector(sources, counters)
+    REGISTRY.register(collector)
+    return collector
+
+def latest_metrics() -> tuple:
+    """
+    Fonction qui renvoie l'ensemble des métriques au format texte de Prometheus
+
+    :return: Tuple (contenu, type MIME)
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,33 @@
+from dotenv import dotenv_values
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.database import create_mongodb_client
+from src.match_results import MATCH_RESULTS_COLLECTION, migrate_matches
+from src.elo import update_ratings
+from src.features import update_features
+from src.head_to_head import update_head_to_head
+from src.match_store import build_match_store
+
+# Chargement des variables d'environnement pour la connexion MongoDB
+config = dotenv_values("../.env")
+
+# Migration de la collection matches (un document par journée) vers match_results (un document par match)
+client = create_mongodb_client(config)
+try:
+    count = migrate_matches(client["football_predictor"])
+    print(f"{count} matchs insérés ou modifiés dans la collection {MATCH_RESULTS_COLLECTION}")
+    # Classements Elo : seuls les nouveaux résultats sont appliqués
+    print(f"{update_ratings(client['football_predictor'])} matchs appliqués aux classements Elo")
+    # Caractéristiques de forme : seules les équipes des nouveaux résultats sont mises à jour
+    print(f"{update_features(client['football_predictor'])} matchs appliqués à la forme des équipes")
+    # Confrontations directes : seuls les bilans des paires d'équipes des nouveaux résultats sont mis à jour
+    print(f"{update_head_to_head(client['football_predictor'])} matchs appliqués aux confrontations directes")
+    # Magasin de matchs (colonnes NumPy) projeté en mémoire par l'API, remplacé d'un bloc
+    print(f"{build_match_store(client['football_predictor'])} matchs écrits dans le magasin de matchs")
+    # Nouvelle version des données : les caches de l'API sont invalidés
+    bump_data_version()
+finally:
+    client.close()
@@ -0,0 +1,31 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Fonction qui encode la position de la dernière ligne renvoyée en un curseur opaque
+
+    :param values: Valeurs de la clé de tri de la dernière ligne
+    :return: Curseur encodé (base64 url-safe)
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+def decode_cursor(cursor: str, length: int) -> list:
+    """
+    Fonction qui décode un curseur produit par encode_cursor
+
+    :param cursor: Curseur fourni par le client
+    :param length: Nombre de valeurs attendues dans la clé de tri
+    :return: Valeurs de la clé de tri
+    :raises: ValueError si le curseur est invalide
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,407 @@
+import datetime
+from typing import Optional
+import numpy as np
+from bson import ObjectId
+from src import queries
+from src.match_results import MATCH_RESULTS_COLLECTION
+from src.match_store import EPOCH_ORDINAL
+
+# Version du modèle, à incrémenter à chaque modification du calcul des prédictions (clé du cache des prédictions)
+MODEL_VERSION = 'dixon-coles-1'
+# Nombre maximum de buts par équipe dans les matrices de scores (la masse au-delà est négligeable)
+MAX_GOALS = 10
+# Demi-vie (jours) du poids des matchs d'entraînement : un match d'il y a 180 jours compte deux fois moins
+HALF_LIFE_DAYS = 180
+# Force a priori des équipes, en buts fictifs : évite une attaque nulle pour une équipe qui n'a pas encore marqué
+PRIOR_GOALS = 1.0
+
+
+def log_factorials(max_goals: int) -> np.ndarray:
+    """
+    Fonction qui renvoie log(k!) pour k de 0 à *max_goals*
+    """
+    return np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))])
+
+def poisson_pmf(rates: np.ndarray, max_goals: int) -> np.ndarray:
+    """
+    Fonction qui calcule les probabilités de Poisson de 0 à *max_goals* buts pour chaque moyenne
+
+    :param rates: Moyennes de buts (n,)
+    :param max_goals: Nombre maximum de buts
+    :return: Tableau (n, max_goals + 1)
+    """
+    goals = np.arange(max_goals + 1)
+    return np.exp(goals * np.log(rates)[:, None] - rates[:, None] - log_factorials(max_goals))
+
+def dixon_coles_tau(home_goals: np.ndarray, away_goals: np.ndarray, home_rates: np.ndarray,
+                    away_rates: np.ndarray, rho: float) -> np.ndarray:
+    """
+    Fonction qui calcule la correction de Dixon et Coles des scores 0-0, 1-0, 0-1 et 1-1 (1 pour les autres scores)
+
+    :return: Facteurs de correction (n,)
+    """
+    tau = np.ones(len(home_goals))
+    tau = np.where((home_goals == 0) & (away_goals == 0), 1 - home_rates * away_rates * rho, tau)
+    tau = np.where((home_goals == 0) & (away_goals == 1), 1 + home_rates * rho, tau)
+    tau = np.where((home_goals == 1) & (away_goals == 0), 1 + away_rates * rho, tau)
+    return np.where((home_goals == 1) & (away_goals == 1), 1 - rho, tau)
+
+def time_weights(days: np.ndarray, reference: int, half_life: float = HALF_LIFE_DAYS) -> np.ndarray:
+    """
+    Fonction qui calcule le poids des matchs selon leur ancienneté (décroissance exponentielle)
+
+    :param days: Dates des matchs (numéros de jour, datetime.date.toordinal())
+    :param reference: Date de référence (numéro de jour)
+    :param half_life: Demi-vie en jours
+    :return: Poids des matchs (n,)
+    """
+    return np.exp2(-(reference - days) / half_life)
+
+
+class DixonColesModel:
+    """
+    Modèle de Poisson avec correction de Dixon et Coles.
+
+    Les buts de l'équipe à domicile suivent une loi de Poisson de moyenne home * attack[domicile] * defence[extérieur],
+    ceux de l'équipe à l'extérieur de moyenne attack[extérieur] * defence[domicile] ; le paramètre rho corrige
+    la probabilité des scores faibles (0-0, 1-0, 0-1, 1-1).
+    """
+
+    def __init__(self, team_ids: np.ndarray, attack: np.ndarray, defence: np.ndarray, home: float, rho: float):
+        """
+        :param team_ids: Identifiants des équipes (Team.id)
+        :param attack: Force offensive de chaque équipe
+        :param defence: Faiblesse défensive de chaque équipe (moyenne géométrique égale à 1)
+        :param home: Avantage du terrain (facteur multiplicatif)
+        :param rho: Paramètre de dépendance de Dixon et Coles
+        """
+        self.team_ids = team_ids
+        self.attack = attack
+        self.defence = defence
+        self.home = home
+        self.rho = rho
+        self._index = {int(team_id): index for index, team_id in enumerate(team_ids)}
+
+    @classmethod
+    def fit(cls, home_ids, away_ids, home_goals, away_goals, weights=None, max_iterations: int = 500,
+            tolerance: float = 1e-9) -> 'DixonColesModel':
+        """
+        Fonction qui ajuste le modèle sur des résultats (maximum de vraisemblance pondéré).
+
+        Les forces sont ajustées par mises à jour multiplicatives vectorisées (solution exacte de chaque forme
+        à paramètres fixés, avec un a priori Gamma de PRIOR_GOALS buts), puis rho maximise la vraisemblance
+        de Dixon et Coles à forces fixées (recherche par section dorée, la log-vraisemblance étant concave en rho).
+
+        :param home_ids: Identifiants des équipes à domicile
+        :param away_ids: Identifiants des équipes à l'extérieur
+        :param home_goals: Buts des équipes à domicile
+        :param away_goals: Buts des équipes à l'extérieur
+        :param weights: Poids des matchs (tous à 1 par défaut)
+        :param max_iterations: Nombre maximum d'itérations
+        :param tolerance: Variation relative maximale des forces à la convergence
+        :return: Objet DixonColesModel
+        :raises: ValueError si aucun match n'est fourni
+        """
+        home_goals = np.asarray(home_goals, dtype=float)
+        away_goals = np.asarray(away_goals, dtype=float)
+        if len(home_goals) == 0:
+            raise ValueError("Aucun résultat pour ajuster le modèle")
+        weights = np.ones(len(home_goals)) if weights is None else np.asarray(weights, dtype=float)
+        team_ids, teams = np.unique(np.concatenate([home_ids, away_ids]), return_inverse=True)
+        home, away = teams[:len(home_goals)], teams[len(home_goals):]
+        count = len(team_ids)
+
+        # Buts marqués et encaissés de chaque équipe (pondérés)
+        scored = np.bincount(home, weights * home_goals, count) + np.bincount(away, weights * away_goals, count)
+        conceded = np.bincount(home, weights * away_goals, count) + np.bincount(away, weights * home_goals, count)
+        attack = np.full(count, max((weights * (home_goals + away_goals)).sum() / (2 * weights.sum()), 0.1))
+        defence = np.ones(count)
+        home_advantage = 1.0
+        for _ in range(max_iterations):
+            previous = np.concatenate([attack, defence, [home_advantage]])
+            exposure = (np.bincount(home, weights * home_advantage * defence[away], count)
+                        + np.bincount(away, weights * defence[home], count))
+            attack = (scored + PRIOR_GOALS) / (exposure + PRIOR_GOALS / attack.mean())
+            exposure = (np.bincount(away, weights * home_advantage * attack[home], count)
+                        + np.bincount(home, weights * attack[away], count))
+            defence = (conceded + PRIOR_GOALS) / (exposure + PRIOR_GOALS)
+            home_advantage = ((weights * home_goals).sum()
+                              / max((weights * attack[home] * defence[away]).sum(), 1e-12))
+            # Normalisation : moyenne géométrique des défenses à 1, le niveau moyen est porté par l'attaque
+            scale = np.exp(np.log(defence).mean())
+            defence, attack = defence / scale, attack * scale
+            current = np.concatenate([attack, defence, [home_advantage]])
+            if np.max(np.abs(current - previous) / previous) < tolerance:
+                break
+
+        home_rates = home_advantage * attack[home] * defence[away]
+        away_rates = attack[away] * defence[home]
+        rho = cls._fit_rho(home_goals, away_goals, home_rates, away_rates, weights)
+        return cls(team_ids, attack, defence, home_advantage, rho)
+
+    @staticmethod
+    def _fit_rho(home_goals, away_goals, home_rates, away_rates, weights, iterations: int = 60) -> float:
+        low = (home_goals <= 1) & (away_goals <= 1)
+        home_goals, away_goals = home_goals[low], away_goals[low]
+        home_rates, away_rates, weights = home_rates[low], away_rates[low], weights[low]
+        if len(home_goals) == 0:
+            return 0.0
+        # Bornes de rho pour lesquelles toutes les corrections restent positives
+        lower = max(-1 / home_rates.max(), -1 / away_rates.max(), -1.0) * 0.999
+        upper = min(1 / (home_rates * away_rates).max(), 1.0) * 0.999
+
+        def log_likelihood(rho):
+            return (weights * np.log(dixon_coles_tau(home_goals, away_goals, home_rates, away_rates, rho))).sum()
+
+        ratio = (np.sqrt(5) - 1) / 2
+        a, b = lower, upper
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        fc, fd = log_likelihood(c), log_likelihood(d)
+        for _ in range(iterations):
+            if fc > fd:
+                b, d, fd = d, c, fc
+                c = b - ratio * (b - a)
+                fc = log_likelihood(c)
+            else:
+                a, c, fc = c, d, fd
+                d = a + ratio * (b - a)
+                fd = log_likelihood(d)
+        return float((a + b) / 2)
+
+    def rates(self, home_ids, away_ids) -> tuple:
+        """
+        Fonction qui renvoie les moyennes de buts attendues de chaque match.
+        Une équipe absente des données d'entraînement a la force moyenne.
+
+        :param home_ids: Identifiants des équipes à domicile
+        :param away_ids: Identifiants des équipes à l'extérieur
+        :return: Tuple (buts attendus à domicile, buts attendus à l'extérieur)
+        """
+        attack = np.append(self.attack, np.exp(np.log(self.attack).mean()))
+        defence = np.append(self.defence, 1.0)
+        home = np.array([self._index.get(team_id, -1) for team_id in home_ids], dtype=int)
+        away = np.array([self._index.get(team_id, -1) for team_id in away_ids], dtype=int)
+        return self.home * attack[home] * defence[away], attack[away] * defence[home]
+
+    def score_matrices(self, home_ids, away_ids, max_goals: int = MAX_GOALS) -> np.ndarray:
+        """
+        Fonction qui calcule la probabilité de chaque score pour plusieurs matchs en un seul calcul
+
+        :param home_ids: Identifiants des équipes à domicile
+        :param away_ids: Identifiants des équipes à l'extérieur
+        :param max_goals: Nombre maximum de buts par équipe
+        :return: Tableau (matchs, buts à domicile, buts à l'extérieur) des probabilités
+        """
+        home_rates, away_rates = self.rates(home_ids, away_ids)
+        matrices = poisson_pmf(home_rates, max_goals)[:, :, None] * poisson_pmf(away_rates, max_goals)[:, None, :]
+        matrices[:, 0, 0] *= 1 - home_rates * away_rates * self.rho
+        matrices[:, 0, 1] *= 1 + home_rates * self.rho
+        matrices[:, 1, 0] *= 1 + away_rates * self.rho
+        matrices[:, 1, 1] *= 1 - self.rho
+        # Les scores au-delà de max_goals sont ignorés : les probabilités sont renormalisées
+        return matrices / matrices.sum(axis=(1, 2), keepdims=True)
+
+    def predict(self, home_ids, away_ids, max_goals: int = MAX_GOALS) -> list:
+        """
+        Fonction qui prédit plusieurs matchs : buts attendus, probabilités de victoire, nul et défaite, score le plus probable
+
+        :param home_ids: Identifiants des équipes à domicile
+        :param away_ids: Identifiants des équipes à l'extérieur
+        :param max_goals: Nombre maximum de buts par équipe
+        :return: Liste des prédictions (dans l'ordre des matchs)
+        """
+        if len(home_ids) == 0:
+            return []
+        home_rates, away_rates = self.rates(home_ids, away_ids)
+        matrices = self.score_matrices(home_ids, away_ids, max_goals)
+        home_win = np.tril(matrices, -1).sum(axis=(1, 2))
+        draw = np.trace(matrices, axis1=1, axis2=2)
+        away_win = np.triu(matrices, 1).sum(axis=(1, 2))
+        best_home, best_away = np.unravel_index(matrices.reshape(len(matrices), -1).argmax(axis=1), matrices.shape[1:])
+        return [{'expected_goals': {'home': round(float(home_rates[i]), 3), 'away': round(float(away_rates[i]), 3)},
+                 'probabilities': {'home': round(float(home_win[i]), 4), 'draw': round(float(draw[i]), 4),
+                                   'away': round(float(away_win[i]), 4)},
+                 'most_likely_score': {'home': int(best_home[i]), 'away': int(best_away[i])}}
+                for i in range(len(matrices))]
+
+
+def result_arrays(documents: list) -> dict:
+    """
+    Fonction qui convertit des matchs joués de la collection match_results en tableaux NumPy
+    (les matchs dont une équipe n'est pas associée à la table Team sont ignorés)
+
+    :param documents: Documents de la collection match_results
+    :return: Dictionnaire de tableaux home_ids, away_ids, home_goals, away_goals et days (numéro du jour)
+    """
+    documents = [document for document in documents
+                 if document.get('score') and document['home_team']['id'] is not None
+                 and document['away_team']['id'] is not None]
+    return {'home_ids': np.array([document['home_team']['id'] for document in documents], dtype=int),
+            'away_ids': np.array([document['away_team']['id'] for document in documents], dtype=int),
+            'home_goals': np.array([document['score']['home'] for document in documents], dtype=float),
+            'away_goals': np.array([document['score']['away'] for document in documents], dtype=float),
+            'days': np.array([datetime.date.fromisoformat(document['date']).toordinal() for document in documents],
+                             dtype=float)}
+
+def fit_model(documents: list, reference: str) -> DixonColesModel:
+    """
+    Fonction qui ajuste le modèle sur les résultats joués avant une date, pondérés selon leur ancienneté :
+    aucun résultat postérieur à la date de référence n'est utilisé
+
+    :param documents: Documents de la collection match_results
+    :param reference: Date de référence (YYYY-MM-dd, exclue)
+    :return: Objet DixonColesModel
+    :raises: ValueError s'il n'y a aucun résultat avant la date
+    """
+    training = result_arrays([document for document in documents if document['date'] < reference])
+    return fit_results(training, datetime.date.fromisoformat(reference).toordinal())
+
+def fit_results(results: dict, reference: int) -> DixonColesModel:
+    """
+    Fonction qui ajuste le modèle sur des résultats pondérés selon leur ancienneté
+
+    :param results: Tableaux de result_arrays ou de MatchStore.results (résultats antérieurs à la référence)
+    :param reference: Numéro du jour de référence (datetime.date.toordinal)
+    :return: Objet DixonColesModel
+    :raises: ValueError s'il n'y a aucun résultat
+    """
+    return DixonColesModel.fit(results['home_ids'], results['away_ids'], results['home_goals'],
+                               results['away_goals'], time_weights(results['days'], reference))
+
+def store_model(store, league: str, season: int, matchday: int) -> DixonColesModel:
+    """
+    Fonction qui ajuste le modèle d'une journée sur les colonnes du magasin de matchs : résultats de la saison
+    précédente et de la saison en cours joués avant le premier match de la journée (comme fit_model)
+
+    :param store: Magasin de matchs (MatchStore) contenant la saison
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :param matchday: Numéro de la journée
+    :return: Objet DixonColesModel
+    :raises: ValueError si la journée est absente du magasin ou s'il n'y a aucun résultat avant la journée
+    """
+    columns = store.season(league, season)
+    dates = columns['date'][columns['matchday'] == matchday]
+    if not len(dates):
+        raise ValueError("Journée absente du magasin de matchs")
+    reference = int(dates.min().astype(np.int64)) + EPOCH_ORDINAL
+    return fit_results(store.results(league, [season - 1, season], before=reference), reference)
+
+def in_store(store, league: str, season: int) -> bool:
+    """
+    Fonction qui indique si la saison d'un championnat peut être lue dans le magasin de matchs
+    """
+    return store is not None and f"{league}|{season}" in store.ranges
+
+def predict_matchday(db, league: str, season: int, matchday: Optional[int], store=None) -> list:
+    """
+    Fonction qui prédit tous les matchs d'une journée.
+
+    Le modèle est ajusté sur les résultats de la saison précédente et de la saison en cours
+    joués avant le premier match de la journée. Si la saison est dans le magasin de matchs, les résultats
+    sont lus dans ses colonnes et seuls les matchs de la journée sont lus en base, par identifiant.
+
+    :param db: Base MongoDB football_predictor
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :param matchday: Numéro de la journée (par défaut la première journée dont un match n'a pas été joué)
+    :param store: Magasin de matchs (MatchStore), None pour tout lire dans la collection match_results
+    :return: Liste des matchs de la journée avec leur prédiction
+    :raises: ValueError s'il n'y a aucun résultat avant la journée
+    """
+    if in_store(store, league, season):
+        columns = store.season(league, season)
+        if matchday is None:
+            unplayed = columns['matchday'][(columns['home_goals'] < 0) | (columns['away_goals'] < 0)]
+            if not len(unplayed):
+                return []
+            matchday = int(unplayed.min())
+        match_ids = [ObjectId(match_id.tobytes()) for match_id in columns['match_id'][columns['matchday'] == matchday]]
+        if not match_ids:
+            return []
+        fixtures = list(db[MATCH_RESULTS_COLLECTION].find({'_id': {'$in': match_ids}}, sort=[('_id', 1)]))
+        model = store_model(store, league, season, matchday)
+        predictions = model.predict([fixture['home_team']['id'] for fixture in fixtures],
+                                    [fixture['away_team']['id'] for fixture in fixtures])
+        return [prediction_document(fixture, prediction) for fixture, prediction in zip(fixtures, predictions)]
+
+    documents = queries.find_league_matches(db, league, [season - 1, season])
+    current = f"{season}-{season + 1}"
+    if matchday is None:
+        unplayed = [document['matchday'] for document in documents
+                    if document['season'] == current and not document.get('score')]
+        if not unplayed:
+            return []
+        matchday = min(unplayed)
+    fixtures = [document for document in documents if document['season'] == current
+                and document['matchday'] == matchday]
+    if not fixtures:
+        return []
+    model = fit_model(documents, min(fixture['date'] for fixture in fixtures))
+    predictions = model.predict([fixture['home_team']['id'] for fixture in fixtures],
+                                [fixture['away_team']['id'] for fixture in fixtures])
+    return [prediction_document(fixture, prediction) for fixture, prediction in zip(fixtures, predictions)]
+
+def predict_next_matchday(db, league: str, store=None) -> list:
+    """
+    Fonction qui prédit la prochaine journée de la dernière saison d'un championnat
+    (première journée dont un match n'a pas été joué)
+
+    :param db: Base MongoDB football_predictor
+    :param league: Nom du championnat
+    :param store: Magasin de matchs (MatchStore), None pour tout lire dans la collection match_results
+    :return: Liste des matchs de la journée avec leur prédiction (vide si la saison est terminée)
+    """
+    if store is not None:
+        seasons = [int(key.rsplit('|', 1)[1]) for key in store.ranges if key.rsplit('|', 1)[0] == league]
+        if seasons:
+            return predict_matchday(db, league, max(seasons), None, store)
+    latest = list(db[MATCH_RESULTS_COLLECTION].find({'league': league}, sort=[('season', -1)], limit=1))
+    if not latest:
+        return []
+    return predict_matchday(db, league, int(latest[0]['season'][:4]), None)
+
+def prediction_document(fixture: dict, prediction: dict) -> dict:
+    """
+    Fonction qui renvoie un match de la collection match_results accompagné de sa prédiction
+    """
+    return {'_id': str(fixture['_id']), 'league': fixture['league'], 'season': fixture['season'],
+            'matchday': fixture['matchday'], 'date': fixture['date'], 'home_team': fixture['home_team'],
+            'away_team': fixture['away_team'], 'score': fixture.get('score'), **prediction}
+
+def predict_fixtures(db, fixture_ids: list, store=None) -> list:
+    """
+    Fonction qui prédit des matchs désignés par leur identifiant, en une seule lecture des matchs
+    puis un ajustement du modèle et une évaluation vectorisée par journée.
+
+    Chaque match est prédit par le même modèle que sa journée dans predict_matchday.
+
+    :param db: Base MongoDB football_predictor
+    :param fixture_ids: Identifiants des matchs (ObjectId)
+    :param store: Magasin de matchs (MatchStore) dont les colonnes servent à ajuster les modèles s'il contient la saison
+    :return: Prédictions dans l'ordre des identifiants (None pour un match inconnu, ValueError pour un match
+             dont la journée n'a aucun résultat antérieur)
+    """
+    fixtures = list(db[MATCH_RESULTS_COLLECTION].find({'_id': {'$in': list(dict.fromkeys(fixture_ids))}}))
+    matchdays = {}
+    for fixture in fixtures:
+        matchdays.setdefault((fixture['league'], fixture['season'], fixture['matchday']), []).append(fixture)
+    results = {}
+    for (league, season, matchday), group in matchdays.items():
+        start = int(season[:4])
+        try:
+            if in_store(store, league, start):
+                model = store_model(store, league, start, matchday)
+            else:
+                documents = queries.find_league_matches(db, league, [start - 1, start])
+                model = fit_model(documents, min(document['date'] for document in documents
+                                                 if document['season'] == season
+                                                 and document['matchday'] == matchday))
+        except ValueError as error:
+            results.update({fixture['_id']: error for fixture in group})
+            continue
+        predictions = model.predict([fixture['home_team']['id'] for fixture in group],
+                                    [fixture['away_team']['id'] for fixture in group])
+        results.update({fixture['_id']: prediction_document(fixture, prediction)
+                        for fixture, prediction in zip(group, predictions)})
+    return [results.get(fixture_id) for fixture_id in fixture_ids]
@@ -0,0 +1,386 @@
+from typing import Optional
+from bson import ObjectId
+from src.match_results import MATCH_RESULTS_COLLECTION
+from src.elo import ELO_HISTORY_COLLECTION, ELO_RATINGS_COLLECTION
+from src.head_to_head import HEAD_TO_HEAD_COLLECTION, pair_key
+
+# Postes acceptés par la colonne ENUM `position` de la table Player
+POSITIONS = ['Gardien', 'Defenseur', 'Milieu', 'Attaquant']
+# Championnats présents dans la collection MongoDB match_results
+LEAGUES = ['Ligue 1', 'Ligue 2']
+# Types de classement dans l'ordre de l'ENUM `type` de la table Ranking (MySQL trie les ENUM par indice)
+RANKING_TYPES = ['HOME', 'AWAY', 'TOTAL']
+# Projection des documents match_results renvoyés aux clients : les indicateurs de suivi des mises à jour
+# incrémentales sont exclus
+MATCH_PROJECTION = {'elo_rated': 0, 'form_built': 0, 'h2h_built': 0}
+
+def fetch_all(connection, query: str, params: list) -> list:
+    """
+    Fonction qui exécute une requête SQL et renvoie toutes les lignes sous forme de dictionnaires
+
+    :param connection: Connexion MySQL
+    :param query: Requête SQL paramétrée
+    :param params: Paramètres de la requête
+    :return: Liste des lignes
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def in_clause(column: str, values: list) -> tuple:
+    """
+    Fonction qui construit une condition SQL paramétrée *column IN (...)*
+
+    :param column: Colonne filtrée
+    :param values: Valeurs acceptées (non vide)
+    :return: Tuple (condition, paramètres)
+    """
+    return f"{column} IN ({', '.join(['%s'] * len(values))})", list(values)
+
+def select_teams(connection, team_ids: Optional[list], id: Optional[int], limit: int) -> list:
+    """
+    Fonction qui sélectionne les équipes en fonction des critères de la route /equipe
+
+    :param connection: Connexion MySQL
+    :param team_ids: Identifiants des équipes correspondant au nom recherché (None si pas de recherche par nom)
+    :param id: Identifiant de l'équipe
+    :param limit: Nombre maximum d'équipes
+    :return: Liste des équipes
+    """
+    query = "SELECT * FROM Team WHERE 1=1"
+    params = []
+
+    if team_ids is not None:
+        condition, values = in_clause("id", team_ids)
+        query += f" AND {condition}"
+        params.extend(values)
+    if id:
+        query += " AND id = %s"
+        params.append(id)
+
+    query += " LIMIT %s"
+    params.append(limit)
+    return fetch_all(connection, query, params)
+
+def select_players(connection, id: Optional[int], first_name: Optional[str], last_name: Optional[str],
+                   birth_date: Optional[str], position: Optional[str], team_ids: Optional[list], limit: int,
+                   after: Optional[list] = None) -> list:
+    """
+    Fonction qui sélectionne les joueurs en fonction des critères de la route /joueurs
+
+    :param connection: Connexion MySQL
+    :param id: Identifiant du joueur
+    :param first_name: Prénom du joueur
+    :param last_name: Nom de famille du joueur
+    :param birth_date: Date de naissance (YYYY-MM-dd)
+    :param position: Poste du joueur
+    :param team_ids: Identifiants des équipes correspondant au nom recherché (None si pas de filtre)
+    :param limit: Nombre maximum de joueurs
+    :param after: Clé de pagination [id] du dernier joueur de la page précédente
+    :return: Liste des joueurs triés par identifiant
+    """
+    query = "SELECT * FROM Player WHERE 1=1"
+    params = []
+
+    if team_ids is not None:
+        condition, values = in_clause("Player.team_id", team_ids)
+        query += f" AND {condition}"
+        params.extend(values)
+    if id:
+        query += " AND Player.id = %s"
+        params.append(id)
+    if first_name:
+        query += " AND first_name = %s"
+        params.append(first_name)
+    if last_name:
+        query += " AND last_name = %s"
+        params.append(last_name)
+    if birth_date:
+        query += " AND birthdate = %s"
+        params.append(birth_date)
+    if position and position in POSITIONS:
+        query += " AND position = %s"
+        params.append(position)
+    if after:
+        query += " AND Player.id > %s"
+        params.extend(after)
+
+    query += " ORDER BY Player.id LIMIT %s"
+    params.append(limit)
+    return fetch_all(connection, query, params)
+
+def select_rankings(connection, season: Optional[int], type_: Optional[str], team_ids: Optional[list],
+                    league: Optional[str], limit: int, after: Optional[list] = None) -> list:
+    """
+    Fonction qui sélectionne les entrées de classement en fonction des critères de la route /classements
+
+    :param connection: Connexion MySQL
+    :param season: Année de début de la saison
+    :param type_: Type de classement ('TOTAL', 'HOME', 'AWAY')
+    :param team_ids: Identifiants des équipes correspondant au nom recherché (None si pas de filtre)
+    :param league: Nom du championnat
+    :param limit: Nombre maximum de résultats
+    :param after: Clé de pagination [league_id, indice du type, position, team_id] de la dernière entrée de la page précédente
+    :return: Liste des entrées de classement triées par championnat, type et position
+    """
+    query = ("SELECT position, league.name, league.season, team.name, type, played, goals_for, "
+             "goals_against, won, draw, lost, points, Ranking.league_id, Ranking.team_id FROM `Ranking` "
+             "JOIN `Team` ON Ranking.team_id = Team.id JOIN `League` ON Ranking.league_id = League.id WHERE 1=1")
+    params = []
+
+    if season:
+        query += " AND League.season = %s"
+        params.append(season)
+    if team_ids is not None:
+        condition, values = in_clause("Ranking.team_id", team_ids)
+        query += f" AND {condition}"
+        params.extend(values)
+    if league:
+        query += " AND League.name = %s"
+        params.append(league)
+    if type_:
+        query += " AND type = %s"
+        params.append(type_)
+    if after:
+        # Le type est comparé par son indice dans l'ENUM, comme pour le tri
+        query += " AND (Ranking.league_id, Ranking.type, Ranking.position, Ranking.team_id) > (%s, %s, %s, %s)"
+        params.extend(after)
+
+    query += " ORDER BY Ranking.league_id, Ranking.type, Ranking.position, Ranking.team_id LIMIT %s"
+    params.append(limit)
+    return fetch_all(connection, query, params)
+
+def ranking_cursor(row: dict) -> list:
+    """
+    Fonction qui renvoie la clé de pagination d'une entrée de classement
+
+    :param row: Ligne renvoyée par select_rankings
+    :return: Clé [league_id, indice du type, position, team_id]
+    """
+    return [row['league_id'], RANKING_TYPES.index(row['type']) + 1, row['position'], row['team_id']]
+
+def select_batch(connection, team_ids: list, player_ids: list, squad_team_ids: list, ranking_lookups: list) -> dict:
+    """
+    Fonction qui résout toutes les recherches de la route /lot avec une seule connexion
+    et une requête IN (...) par type de recherche
+
+    :param connection: Connexion MySQL
+    :param team_ids: Identifiants des équipes
+    :param player_ids: Identifiants des joueurs
+    :param squad_team_ids: Identifiants des équipes dont on veut l'effectif
+    :param ranking_lookups: Recherches de classement (dictionnaires avec les clés season, league, type et team_id)
+    :return: Dictionnaire des résultats indexés par identifiant (classements dans l'ordre des recherches)
+    """
+    teams, players, squads, rankings = {}, {}, {}, []
+
+    if team_ids:
+        condition, params = in_clause("id", team_ids)
+        teams = {row['id']: row for row in fetch_all(connection, f"SELECT * FROM Team WHERE {condition}", params)}
+    if player_ids:
+        condition, params = in_clause("id", player_ids)
+        players = {row['id']: row for row in fetch_all(connection, f"SELECT * FROM Player WHERE {condition}", params)}
+    if squad_team_ids:
+        squads = {team_id: [] for team_id in squad_team_ids}
+        condition, params = in_clause("team_id", squad_team_ids)
+        for row in fetch_all(connection, f"SELECT * FROM Player WHERE {condition} ORDER BY id", params):
+            squads[row['team_id']].append(row)
+    if ranking_lookups:
+        # Une seule requête pour toutes les saisons demandées, puis répartition par recherche
+        condition, params = in_clause("League.season", sorted({lookup['season'] for lookup in ranking_lookups}))
+        query = ("SELECT League.name AS league, League.season, Ranking.type, Ranking.position, Team.id AS team_id, "
+                 "Team.name AS team, played, goals_for, goals_against, won, draw, lost, points FROM `Ranking` "
+                 "JOIN `Team` ON Ranking.team_id = Team.id JOIN `League` ON Ranking.league_id = League.id "
+                 f"WHERE {condition} ORDER BY Ranking.league_id, Ranking.type, Ranking.position, Ranking.team_id")
+        rows = fetch_all(connection, query, params)
+        for lookup in ranking_lookups:
+            rankings.append([row for row in rows
+                             if row['season'] == lookup['season']
+                             and lookup['league'] in (None, row['league'])
+                             and lookup['type'] in (None, row['type'])
+                             and lookup['team_id'] in (None, row['team_id'])])
+
+    return {'equipes': teams, 'joueurs': players, 'effectifs': squads, 'classements': rankings}
+
+def find_matches(db, season: Optional[int], matchday: Optional[int], league: Optional[str],
+                 team_ids: Optional[list], date_from: Optional[str], date_to: Optional[str], limit: int,
+                 after: Optional[list] = None) -> list:
+    """
+    Fonction qui recherche les matchs dans MongoDB en fonction des critères de la route /matches
+
+    :param db: Base MongoDB football_predictor
+    :param season: Année de début de la saison
+    :param matchday: Numéro de la journée
+    :param league: Nom du championnat ('Ligue 1' ou 'Ligue 2')
+    :param team_ids: Identifiants des équipes (à domicile ou à l'extérieur, None si pas de filtre)
+    :param date_from: Date minimale des matchs (YYYY-MM-dd, incluse)
+    :param date_to: Date maximale des matchs (YYYY-MM-dd, incluse)
+    :param limit: Nombre maximum de documents
+    :param after: Clé de pagination [season, matchday, _id] du dernier document de la page précédente
+    :return: Liste des matchs triés par saison, journée et identifiant (_id converti en chaîne)
+    """
+    query = match_filter(season, league)
+
+    if matchday:
+        query['matchday'] = matchday
+    if date_from or date_to:
+        query['date'] = {}
+        if date_from:
+            query['date']['$gte'] = date_from
+        if date_to:
+            query['date']['$lte'] = date_to
+    conditions = []
+    if team_ids is not None:
+        # Chaque branche utilise l'index (home_team.id, date) ou (away_team.id, date)
+        conditions.append({'$or': [{'home_team.id': {'$in': team_ids}}, {'away_team.id': {'$in': team_ids}}]})
+    if after:
+        last_season, last_matchday, last_id = after[0], after[1], ObjectId(after[2])
+        conditions.append({'$or': [{'season': {'$gt': last_season}},
+                                   {'season': last_season, 'matchday': {'$gt': last_matchday}},
+                                   {'season': last_season, 'matchday': last_matchday, '_id': {'$gt': last_id}}]})
+    if conditions:
+        query['$and'] = conditions
+
+    documents = db[MATCH_RESULTS_COLLECTION].find(query, MATCH_PROJECTION,
+                                                  sort=[('season', 1), ('matchday', 1), ('_id', 1)], limit=limit)
+    results = []
+    for document in documents:
+        document['_id'] = str(document['_id'])
+        results.append(document)
+    return results
+
+def find_league_matches(db, league: str, seasons: list) -> list:
+    """
+    Fonction qui renvoie tous les matchs (joués ou non) d'un championnat sur plusieurs saisons
+
+    :param db: Base MongoDB football_predictor
+    :param league: Nom du championnat
+    :param seasons: Années de début des saisons
+    :return: Liste des matchs triés par saison, journée et identifiant
+    """
+    query = {'league': league, 'season': {'$in': [f"{season}-{season+1}" for season in seasons]}}
+    return list(db[MATCH_RESULTS_COLLECTION].find(query, sort=[('season', 1), ('matchday', 1), ('_id', 1)]))
+
+def find_ratings(db, team_ids: Optional[list], limit: int) -> list:
+    """
+    Fonction qui renvoie les classements Elo courants, du meilleur au moins bon
+
+    :param db: Base MongoDB football_predictor
+    :param team_ids: Identifiants des équipes (None pour toutes les équipes)
+    :param limit: Nombre maximum d'équipes
+    :return: Liste des classements (identifiant de l'équipe dans team_id)
+    """
+    query = {'_id': {'$in': team_ids}} if team_ids is not None else {}
+    results = []
+    for document in db[ELO_RATINGS_COLLECTION].find(query, sort=[('rating', -1), ('_id', 1)], limit=limit):
+        document['team_id'] = document.pop('_id')
+        results.append(document)
+    return results
+
+def find_rating_history(db, team_ids: list, date_from: Optional[str], date_to: Optional[str], limit: int) -> list:
+    """
+    Fonction qui renvoie l'évolution du classement Elo d'équipes, match par match
+
+    :param db: Base MongoDB football_predictor
+    :param team_ids: Identifiants des équipes
+    :param date_from: Date minimale des matchs (YYYY-MM-dd, incluse)
+    :param date_to: Date maximale des matchs (YYYY-MM-dd, incluse)
+    :param limit: Nombre maximum d'entrées
+    :return: Liste des entrées triées par date (identifiants convertis en chaînes)
+    """
+    query = {'team_id': {'$in': team_ids}}
+    if date_from or date_to:
+        query['date'] = {}
+        if date_from:
+            query['date']['$gte'] = date_from
+        if date_to:
+            query['date']['$lte'] = date_to
+    results = []
+    for document in db[ELO_HISTORY_COLLECTION].find(query, sort=[('date', 1), ('match_id', 1), ('team_id', 1)],
+                                                    limit=limit):
+        document['_id'] = str(document['_id'])
+        document['match_id'] = str(document['match_id'])
+        results.append(document)
+    return results
+
+def find_head_to_head(db, team_ids: list, opponent_ids: list) -> list:
+    """
+    Fonction qui renvoie les bilans des confrontations directes entre deux groupes d'équipes,
+    lus directement par la clé de chaque paire
+
+    :param db: Base MongoDB football_predictor
+    :param team_ids: Identifiants des équipes correspondant au premier nom recherché
+    :param opponent_ids: Identifiants des équipes correspondant au second nom recherché
+    :return: Liste des bilans (identifiants des matchs convertis en chaînes)
+    """
+    keys = sorted({pair_key(team_id, opponent_id) for team_id in team_ids for opponent_id in opponent_ids
+                   if team_id != opponent_id})
+    results = []
+    for document in db[HEAD_TO_HEAD_COLLECTION].find({'_id': {'$in': keys}}, sort=[('_id', 1)]):
+        for meeting in document['meetings']:
+            meeting['match_id'] = str(meeting['match_id'])
+        results.append(document)
+    return results
+
+def match_cursor(document: dict) -> list:
+    """
+    Fonction qui renvoie la clé de pagination d'un document de la collection match_results
+
+    :param document: Document renvoyé par find_matches
+    :return: Clé [season, matchday, _id]
+    """
+    return [document['season'], document['matchday'], document['_id']]
+
+# Colonnes des exports de la table Player et des classements (en-tête des fichiers CSV)
+PLAYER_EXPORT_COLUMNS = ['id', 'first_name', 'last_name', 'birthdate', 'nationality', 'position', 'team_id']
+RANKING_EXPORT_COLUMNS = ['league', 'season', 'type', 'position', 'team_id', 'team', 'played', 'goals_for',
+                          'goals_against', 'won', 'draw', 'lost', 'points']
+
+def export_players_query() -> tuple:
+    """
+    Fonction qui construit la requête d'export de la table Player
+
+    :return: Tuple (requête, paramètres)
+    """
+    return f"SELECT {', '.join(PLAYER_EXPORT_COLUMNS)} FROM Player ORDER BY id", []
+
+def export_rankings_query(season: Optional[int], league: Optional[str]) -> tuple:
+    """
+    Fonction qui construit la requête d'export des classements
+
+    :param season: Année de début de la saison (toutes les saisons si None)
+    :param league: Nom du championnat (tous les championnats si None)
+    :return: Tuple (requête, paramètres)
+    """
+    query = ("SELECT League.name AS league, League.season, Ranking.type, Ranking.position, Team.id AS team_id, "
+             "Team.name AS team, played, goals_for, goals_against, won, draw, lost, points FROM `Ranking` "
+             "JOIN `Team` ON Ranking.team_id = Team.id JOIN `League` ON Ranking.league_id = League.id WHERE 1=1")
+    params = []
+
+    if season:
+        query += " AND League.season = %s"
+        params.append(season)
+    if league:
+        query += " AND League.name = %s"
+        params.append(league)
+
+    query += " ORDER BY Ranking.league_id, Ranking.type, Ranking.position, Ranking.team_id"
+    return query, params
+
+def match_filter(season: Optional[int], league: Optional[str]) -> dict:
+    """
+    Fonction qui construit le filtre de la collection match_results par saison et championnat
+
+    :param season: Année de début de la saison (toutes les saisons si None)
+    :param league: Nom du championnat (tous les championnats si None)
+    :return: Filtre MongoDB
+    """
+    query = {}
+
+    if season:
+        query['season'] = str(f"{season}-{season+1}")
+    if league and league in LEAGUES:
+        query['league'] = league
+    return query
@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.backtest import BACKTEST_LEAGUES, MODELS, run_backtest
+from src.match_store import MATCH_STORE_PATH
+
+parser = argparse.ArgumentParser(description="Évaluation des modèles de prédiction sur les saisons passées "
+                                             "(journées rejouées dans l'ordre à partir du magasin de matchs)")
+parser.add_argument('--models', nargs='+', choices=list(MODELS), default=list(MODELS), help="Modèles évalués")
+parser.add_argument('--leagues', nargs='+', default=list(BACKTEST_LEAGUES), help="Championnats évalués")
+parser.add_argument('--seasons', nargs='+', type=int, help="Années de début des saisons évaluées (toutes par défaut)")
+parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+parser.add_argument('--store', default=MATCH_STORE_PATH, help="Chemin du magasin de matchs")
+parser.add_argument('--details', action='store_true', help="Afficher les scores de chaque saison")
+args = parser.parse_args()
+
+with ProcessPoolExecutor(max_workers=args.workers) as executor:
+    reports = run_backtest(args.models, executor, args.store, args.leagues, args.seasons)
+
+print(f"{'modèle':<12} {'saisons':>7} {'matchs':>7} {'log loss':>9} {'brier':>7} {'rps':>7} {'durée (s)':>10} "
+      f"{'cumulée (s)':>12}")
+for report in reports:
+    print(f"{report['model']:<12} {report['seasons']:>7} {report['matches']:>7} {report['log_loss']:>9.4f} "
+          f"{report['brier']:>7.4f} {report['rps']:>7.4f} {report['wall_time']:>10.2f} {report['task_time']:>12.2f}")
+    if args.details:
+        for result in report['results']:
+            matches = max(result['matches'], 1)
+            print(f"    {result['league']} {result['season']}-{result['season'] + 1} : {result['matches']} matchs, "
+                  f"log loss {result['log_loss'] / matches:.4f}, brier {result['brier'] / matches:.4f}, "
+                  f"rps {result['rps'] / matches:.4f}, {result['duration']:.2f} s")
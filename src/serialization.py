@@ -0,0 +1,70 @@
+import datetime
+import decimal
+import json
+from bson import ObjectId
+from starlette.responses import JSONResponse
+
+try:
+    # Encodeur JSON compilé, utilisé s'il est installé (pip install orjson)
+    import orjson
+except ImportError:
+    orjson = None
+
+def encode_value(value):
+    """
+    Fonction qui convertit les types renvoyés par les drivers MySQL et MongoDB
+    non gérés nativement par l'encodeur JSON (même résultat que jsonable_encoder de FastAPI)
+
+    :param value: Valeur à convertir
+    :return: Valeur sérialisable en JSON
+    :raises: TypeError si le type n'est pas géré
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+# Encodeur réutilisé à chaque appel, avec les options de JSONResponse
+_json_encoder = json.JSONEncoder(default=encode_value, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+def dumps(content) -> bytes:
+    """
+    Fonction qui encode directement le résultat d'une requête (listes et dictionnaires de lignes) en JSON
+
+    :param content: Contenu à encoder
+    :return: JSON encodé en UTF-8
+    """
+    if orjson is not None:
+        # OPT_NON_STR_KEYS : les résultats indexés par identifiant (route /lot) ont des clés entières
+        return orjson.dumps(content, default=encode_value, option=orjson.OPT_NON_STR_KEYS)
+    return _json_encoder.encode(content).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON encodée avec dumps().
+
+    Une route qui renvoie directement cette réponse évite le passage de son contenu
+    dans jsonable_encoder, qui reconstruit chaque ligne avant l'encodage.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(JSONResponse):
+    """
+    Réponse JSON dont le contenu est déjà encodé (ex : corps conservé dans le cache des réponses)
+    """
+
+    def render(self, content: bytes) -> bytes:
+        return content
@@ -0,0 +1,280 @@
+import numpy as np
+from src import queries
+from src.prediction import DixonColesModel, fit_model
+
+# Nombre de simulations par défaut d'une fin de saison
+SIMULATIONS = 100_000
+# Zones du classement final : positions comptées depuis le haut (nombres positifs) ou depuis le bas (négatifs)
+ZONES = {'Ligue 1': {'titre': [1], 'coupe_europe': [1, 2, 3, 4, 5, 6], 'barrage': [-3], 'relegation': [-2, -1]},
+         'Ligue 2': {'titre': [1], 'promotion': [1, 2], 'barrage': [3, 4, 5], 'relegation': [-2, -1]}}
+# Critères de départage des équipes à égalité de points, dans l'ordre du règlement de chaque championnat
+# (head_to_head_* : matchs entre les équipes à égalité sur les critères précédents), puis tirage au sort
+TIEBREAKS = {'Ligue 1': ('goal_difference', 'head_to_head_points', 'head_to_head_goal_difference',
+                         'head_to_head_goals_for', 'goals_for'),
+             'Ligue 2': ('goal_difference', 'head_to_head_points', 'head_to_head_goal_difference',
+                         'head_to_head_goals_for', 'goals_for')}
+# Critères des championnats absents de TIEBREAKS
+DEFAULT_TIEBREAKS = ('goal_difference', 'goals_for')
+
+
+def head_to_head(group: np.ndarray, head_to_head_points: np.ndarray, head_to_head_goals: np.ndarray,
+                 home: np.ndarray, away: np.ndarray, home_incidence: np.ndarray, away_incidence: np.ndarray,
+                 home_goals: np.ndarray, away_goals: np.ndarray, home_points: np.ndarray,
+                 away_points: np.ndarray) -> dict:
+    """
+    Fonction qui calcule, pour chaque simulation, les points et les buts de chaque équipe dans les matchs
+    (joués et simulés) contre les équipes de son groupe d'égalité
+
+    :param group: Groupe d'égalité de chaque équipe dans chaque simulation (T, simulations)
+    :param head_to_head_points: Points pris par l'équipe i contre l'équipe j dans les matchs joués (T, T)
+    :param head_to_head_goals: Buts marqués par l'équipe i contre l'équipe j dans les matchs joués (T, T)
+    :param home: Indice de l'équipe à domicile de chaque match restant (n,)
+    :param away: Indice de l'équipe à l'extérieur de chaque match restant (n,)
+    :param home_incidence: Matrice d'incidence équipe x match restant (équipe à domicile)
+    :param away_incidence: Matrice d'incidence équipe x match restant (équipe à l'extérieur)
+    :param home_goals: Buts simulés de l'équipe à domicile (n, simulations)
+    :param away_goals: Buts simulés de l'équipe à l'extérieur (n, simulations)
+    :param home_points: Points simulés de l'équipe à domicile (n, simulations)
+    :param away_points: Points simulés de l'équipe à l'extérieur (n, simulations)
+    :return: Dictionnaire des critères head_to_head_* (tableaux (T, simulations))
+    """
+    points = np.zeros(group.shape, dtype=np.float32)
+    goals_for = np.zeros(group.shape, dtype=np.float32)
+    goals_against = np.zeros(group.shape, dtype=np.float32)
+    for team in range(len(group)):
+        same = (group == group[team]).astype(np.float32)
+        points += head_to_head_points[:, team, None] * same
+        goals_for += head_to_head_goals[:, team, None] * same
+        goals_against += head_to_head_goals[team, :, None] * same
+    # Matchs restants entre deux équipes du même groupe
+    same = (group[home] == group[away]).astype(np.float32)
+    points += home_incidence @ (home_points * same) + away_incidence @ (away_points * same)
+    goals_for += home_incidence @ (home_goals * same) + away_incidence @ (away_goals * same)
+    goals_against += home_incidence @ (away_goals * same) + away_incidence @ (home_goals * same)
+    return {'head_to_head_points': points, 'head_to_head_goal_difference': goals_for - goals_against,
+            'head_to_head_goals_for': goals_for}
+
+def simulate_shard(points: np.ndarray, goals_for: np.ndarray, goals_against: np.ndarray,
+                   head_to_head_points: np.ndarray, head_to_head_goals: np.ndarray, home: np.ndarray,
+                   away: np.ndarray, cumulative: np.ndarray, tiebreaks: tuple, simulations: int, seed,
+                   chunk: int = 20_000) -> np.ndarray:
+    """
+    Fonction qui simule *simulations* fins de saison et compte les positions finales de chaque équipe.
+    Appelée dans un processus du pool de simulation : tous les paramètres sont des tableaux NumPy.
+
+    :param points: Points actuels de chaque équipe (T,)
+    :param goals_for: Buts marqués actuels (T,)
+    :param goals_against: Buts encaissés actuels (T,)
+    :param head_to_head_points: Points pris par l'équipe i contre l'équipe j dans les matchs joués (T, T)
+    :param head_to_head_goals: Buts marqués par l'équipe i contre l'équipe j dans les matchs joués (T, T)
+    :param home: Indice de l'équipe à domicile de chaque match restant (n,)
+    :param away: Indice de l'équipe à l'extérieur de chaque match restant (n,)
+    :param cumulative: Probabilités cumulées des scores de chaque match (n, scores)
+    :param tiebreaks: Critères de départage après les points (voir TIEBREAKS)
+    :param simulations: Nombre de simulations
+    :param seed: Graine du générateur (np.random.SeedSequence)
+    :param chunk: Nombre de simulations traitées ensemble (borne la mémoire utilisée)
+    :return: Tableau (T, T) du nombre de simulations où l'équipe i termine à la position j + 1
+    """
+    rng = np.random.default_rng(seed)
+    teams = len(points)
+    goals = int(round(np.sqrt(cumulative.shape[1])))
+    # Matrices d'incidence équipe x match : les totaux par équipe sont des produits matriciels
+    home_incidence = np.zeros((teams, len(home)), dtype=np.float32)
+    home_incidence[home, np.arange(len(home))] = 1
+    away_incidence = np.zeros((teams, len(away)), dtype=np.float32)
+    away_incidence[away, np.arange(len(away))] = 1
+    counts = np.zeros((teams, teams), dtype=np.int64)
+    for start in range(0, simulations, chunk):
+        size = min(chunk, simulations - start)
+        # Score de chaque match tiré par inversion de la fonction de répartition
+        # (indice = buts à domicile * (maximum + 1) + buts à l'extérieur)
+        uniforms = rng.random((len(home), size))
+        scores = np.empty((len(home), size), dtype=np.int64)
+        for match in range(len(home)):
+            scores[match] = np.searchsorted(cumulative[match], uniforms[match], side='right')
+        np.minimum(scores, cumulative.shape[1] - 1, out=scores)
+        home_goals = (scores // goals).astype(np.float32)
+        away_goals = (scores % goals).astype(np.float32)
+        home_points = np.where(home_goals > away_goals, 3, home_goals == away_goals).astype(np.float32)
+        away_points = np.where(away_goals > home_goals, 3, home_goals == away_goals).astype(np.float32)
+        sim_points = points[:, None] + home_incidence @ home_points + away_incidence @ away_points
+        sim_for = goals_for[:, None] + home_incidence @ home_goals + away_incidence @ away_goals
+        sim_against = goals_against[:, None] + home_incidence @ away_goals + away_incidence @ home_goals
+        # Clés de classement : points, critères de départage du championnat, puis tirage au sort.
+        # Les confrontations directes sont comptées entre les équipes à égalité sur les critères qui les précèdent.
+        totals = {'goal_difference': sim_for - sim_against, 'goals_for': sim_for}
+        keys = [sim_points]
+        for criterion in tiebreaks:
+            if criterion not in totals:
+                group = np.zeros((teams, size), dtype=np.int64)
+                for key in keys:
+                    group = group * 10_000 + key.astype(np.int64) + 5_000
+                totals.update(head_to_head(group, head_to_head_points, head_to_head_goals, home, away,
+                                           home_incidence, away_incidence, home_goals, away_goals,
+                                           home_points, away_points))
+            keys.append(totals[criterion])
+        keys.append(rng.random((teams, size)))
+        # Tri lexicographique décroissant de chaque simulation (la dernière clé de np.lexsort est la principale)
+        order = np.lexsort([-key.T for key in reversed(keys)], axis=-1).T
+        positions = np.empty_like(order)
+        positions[order, np.arange(size)] = np.arange(teams)[:, None]
+        counts += np.bincount((np.arange(teams)[:, None] * teams + positions).ravel(),
+                              minlength=teams * teams).reshape(teams, teams)
+    return counts
+
+
+def zone_positions(zone: list, teams: int) -> list:
+    """
+    Fonction qui convertit les positions d'une zone (négatives depuis le bas) en indices de 0 à *teams* - 1
+    """
+    return sorted({position - 1 if position > 0 else teams + position for position in zone})
+
+
+def simulation_inputs(table: list, fixtures: list, played: list, model: DixonColesModel, league: str) -> dict:
+    """
+    Fonction qui prépare les tableaux d'une simulation de fin de saison : état actuel de chaque équipe,
+    confrontations directes déjà jouées, matchs restants et probabilités de leurs scores
+
+    :param table: Classement actuel (lignes avec team_id, name, points, played, goals_for et goals_against)
+    :param fixtures: Matchs restants (documents de la collection match_results)
+    :param played: Matchs joués de la saison (documents de la collection match_results)
+    :param model: Modèle de prédiction des scores
+    :param league: Nom du championnat (critères de départage)
+    :return: Dictionnaire des lignes et identifiants des équipes, des tableaux de simulate_shard
+             et des matrices de scores des matchs restants
+    """
+    rows = {row['team_id']: row for row in table}
+    for fixture in fixtures:
+        for team in (fixture['home_team'], fixture['away_team']):
+            rows.setdefault(team['id'], {'team_id': team['id'], 'name': team['name'], 'points': 0, 'played': 0,
+                                         'goals_for': 0, 'goals_against': 0})
+    team_ids = sorted(rows)
+    index = {team_id: position for position, team_id in enumerate(team_ids)}
+    if fixtures:
+        matrices = model.score_matrices([fixture['home_team']['id'] for fixture in fixtures],
+                                        [fixture['away_team']['id'] for fixture in fixtures])
+        cumulative = np.cumsum(matrices.reshape(len(fixtures), -1), axis=1)
+    else:
+        matrices, cumulative = None, np.ones((0, 1))
+    head_to_head_points = np.zeros((len(team_ids), len(team_ids)))
+    head_to_head_goals = np.zeros((len(team_ids), len(team_ids)))
+    for document in played:
+        home, away = index.get(document['home_team']['id']), index.get(document['away_team']['id'])
+        if home is None or away is None:
+            continue
+        home_goals, away_goals = document['score']['home'], document['score']['away']
+        head_to_head_goals[home, away] += home_goals
+        head_to_head_goals[away, home] += away_goals
+        head_to_head_points[home, away] += 3 if home_goals > away_goals else home_goals == away_goals
+        head_to_head_points[away, home] += 3 if away_goals > home_goals else home_goals == away_goals
+    return {'rows': rows, 'team_ids': team_ids,
+            'points': np.array([rows[team_id]['points'] for team_id in team_ids]),
+            'goals_for': np.array([rows[team_id]['goals_for'] for team_id in team_ids]),
+            'goals_against': np.array([rows[team_id]['goals_against'] for team_id in team_ids]),
+            'home': np.array([index[fixture['home_team']['id']] for fixture in fixtures], dtype=int),
+            'away': np.array([index[fixture['away_team']['id']] for fixture in fixtures], dtype=int),
+            'head_to_head_points': head_to_head_points, 'head_to_head_goals': head_to_head_goals,
+            'tiebreaks': TIEBREAKS.get(league, DEFAULT_TIEBREAKS), 'matrices': matrices, 'cumulative': cumulative}
+
+def shard_arguments(inputs: dict, simulations: int, shards: int = 1, seed: int = 0) -> list:
+    """
+    Fonction qui répartit les simulations en *shards* lots, chacun avec sa propre graine
+
+    :param inputs: Tableaux renvoyés par simulation_inputs
+    :param simulations: Nombre de simulations
+    :param shards: Nombre de lots de simulations
+    :param seed: Graine des tirages
+    :return: Liste des arguments de simulate_shard de chaque lot
+    """
+    shards = max(1, min(shards, simulations))
+    sizes = [simulations // shards + (shard < simulations % shards) for shard in range(shards)]
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    return [(inputs['points'], inputs['goals_for'], inputs['goals_against'], inputs['head_to_head_points'],
+             inputs['head_to_head_goals'], inputs['home'], inputs['away'], inputs['cumulative'], inputs['tiebreaks'],
+             size, shard_seed) for size, shard_seed in zip(sizes, seeds)]
+
+def simulation_results(inputs: dict, counts: np.ndarray, simulations: int, league: str) -> list:
+    """
+    Fonction qui résume les positions finales comptées par les lots de simulations
+
+    :param inputs: Tableaux renvoyés par simulation_inputs
+    :param counts: Somme des tableaux renvoyés par simulate_shard
+    :param simulations: Nombre de simulations
+    :param league: Nom du championnat (zones du classement)
+    :return: Liste des équipes (classement actuel, points et position attendus, probabilités de chaque zone
+             et de chaque position finale), triée par position attendue
+    """
+    team_ids, rows, home, away = inputs['team_ids'], inputs['rows'], inputs['home'], inputs['away']
+    teams = len(team_ids)
+    probabilities = counts / simulations
+    # Points attendus : points actuels + espérance des points de chaque match restant
+    expected_points = inputs['points'].astype(float)
+    matrices = inputs['matrices']
+    if matrices is not None:
+        home_win = np.tril(matrices, -1).sum(axis=(1, 2))
+        draw = np.trace(matrices, axis1=1, axis2=2)
+        away_win = np.triu(matrices, 1).sum(axis=(1, 2))
+        expected_points += np.bincount(home, 3 * home_win + draw, teams) + np.bincount(away, 3 * away_win + draw, teams)
+    results = []
+    for position, team_id in enumerate(team_ids):
+        row = rows[team_id]
+        results.append({'team_id': team_id, 'name': row['name'], 'points': row['points'], 'played': row['played'],
+                        'remaining': int((home == position).sum() + (away == position).sum()),
+                        'expected_points': round(float(expected_points[position]), 2),
+                        'expected_position': round(float((probabilities[position] * np.arange(1, teams + 1)).sum()),
+                                                   2),
+                        'zones': {zone: round(float(probabilities[position, zone_positions(places, teams)].sum()), 4)
+                                  for zone, places in ZONES.get(league, {}).items()},
+                        'positions': [round(float(value), 4) for value in probabilities[position]]})
+    return sorted(results, key=lambda result: (result['expected_position'], result['team_id']))
+
+def simulate_season(table: list, fixtures: list, played: list, model: DixonColesModel, league: str,
+                    simulations: int = SIMULATIONS, executor=None, shards: int = 1, seed: int = 0) -> list:
+    """
+    Fonction qui simule la fin d'une saison à partir du classement actuel et des matchs restants.
+
+    Les scores des matchs restants sont tirés selon les probabilités du modèle, par lots vectorisés,
+    et les égalités de points départagées selon les critères du championnat (TIEBREAKS).
+    Les simulations sont réparties en *shards* lots exécutés par *executor* (pool de processus) s'il est fourni.
+    L'API soumet elle-même les lots au pool depuis la boucle d'événements (route /simulation).
+
+    :param table: Classement actuel (lignes avec team_id, name, points, played, goals_for et goals_against)
+    :param fixtures: Matchs restants (documents de la collection match_results)
+    :param played: Matchs joués de la saison (confrontations directes)
+    :param model: Modèle de prédiction des scores
+    :param league: Nom du championnat (critères de départage et zones du classement)
+    :param simulations: Nombre de simulations
+    :param executor: Pool de processus (concurrent.futures), None pour simuler dans le processus courant
+    :param shards: Nombre de lots de simulations
+    :param seed: Graine des tirages
+    :return: Liste des équipes triée par position attendue (voir simulation_results)
+    """
+    inputs = simulation_inputs(table, fixtures, played, model, league)
+    arguments = shard_arguments(inputs, simulations, shards, seed)
+    if executor is not None and len(arguments) > 1:
+        counts = sum(executor.map(simulate_shard, *zip(*arguments)))
+    else:
+        counts = sum(simulate_shard(*shard) for shard in arguments)
+    return simulation_results(inputs, counts, simulations, league)
+
+def remaining_fixtures(db, league: str, season: int) -> tuple:
+    """
+    Fonction qui renvoie les matchs restants et les matchs joués d'une saison, et le modèle ajusté
+    sur les résultats de la saison précédente et de la saison en cours joués avant le premier match restant
+
+    :param db: Base MongoDB football_predictor
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :return: Tuple (matchs restants, matchs joués, modèle), modèle à None s'il ne reste aucun match
+    :raises: ValueError s'il n'y a aucun résultat avant le premier match restant
+    """
+    documents = queries.find_league_matches(db, league, [season - 1, season])
+    current = f"{season}-{season + 1}"
+    fixtures = [document for document in documents if document['season'] == current and not document.get('score')
+                and document['home_team']['id'] is not None and document['away_team']['id'] is not None]
+    played = [document for document in documents if document['season'] == current and document.get('score')
+              and document['home_team']['id'] is not None and document['away_team']['id'] is not None]
+    if not fixtures:
+        return [], played, None
+    return fixtures, played, fit_model(documents, min(fixture['date'] for fixture in fixtures))
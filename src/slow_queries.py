@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+# Fichier de log par défaut (dossier logs à la racine du projet)
+SLOW_QUERY_LOG_PATH = 'logs/slow_queries.log'
+
+def mysql_shape(query: str) -> str:
+    """
+    Fonction qui renvoie la forme d'une requête SQL : les listes IN (%s, %s, ...) de longueur variable
+    sont ramenées à un seul paramètre pour regrouper les requêtes de même structure
+
+    :param query: Requête SQL paramétrée
+    :return: Forme de la requête
+    """
+    return re.sub(r'%s(\s*,\s*%s)+', '%s, ...', ' '.join(query.split()))
+
+def mongodb_shape(value):
+    """
+    Fonction qui renvoie la forme d'un filtre MongoDB : les clés et opérateurs sont conservés,
+    les valeurs sont remplacées par '?'
+
+    :param value: Filtre MongoDB (ou partie du filtre)
+    :return: Forme du filtre
+    """
+    if isinstance(value, dict):
+        return {key: mongodb_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return [mongodb_shape(item) for item in value]
+    return '?'
+
+def mongodb_plan_summary(explain: dict) -> dict:
+    """
+    Fonction qui extrait d'un résultat de explain() le plan retenu et les statistiques d'exécution
+
+    :param explain: Résultat de Cursor.explain()
+    :return: Dictionnaire (plan retenu, documents et clés d'index examinés, documents renvoyés, durée)
+    """
+    statistics = explain.get('executionStats', {})
+    return {'winningPlan': explain.get('queryPlanner', {}).get('winningPlan'),
+            'nReturned': statistics.get('nReturned'),
+            'totalKeysExamined': statistics.get('totalKeysExamined'),
+            'totalDocsExamined': statistics.get('totalDocsExamined'),
+            'executionTimeMillis': statistics.get('executionTimeMillis')}
+
+
+class SlowQueryLog:
+    """
+    Journal des requêtes MySQL et des recherches MongoDB plus lentes qu'un seuil.
+
+    Chaque requête lente est écrite sur une ligne JSON (durée, requête, paramètres) dans un fichier
+    à rotation. Le plan d'exécution (EXPLAIN / explain()) est ajouté à la première requête lente
+    de chaque forme de requête.
+    """
+
+    def __init__(self, threshold: float, path: str = SLOW_QUERY_LOG_PATH, max_bytes: int = 10_000_000,
+                 backup_count: int = 5):
+        """
+        :param threshold: Durée (secondes) au-delà de laquelle une requête est journalisée
+        :param path: Chemin du fichier de log
+        :param max_bytes: Taille maximale du fichier avant rotation
+        :param backup_count: Nombre d'anciens fichiers conservés
+        """
+        self.threshold = threshold
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+        self._logger = logging.getLogger(f'football_predictor.slow_queries.{id(self)}')
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(self._handler)
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def first_of_shape(self, shape) -> bool:
+        """
+        Fonction qui indique si le plan d'exécution de cette forme de requête reste à capturer
+
+        :param shape: Forme de la requête
+        :return: True pour la première requête lente de cette forme
+        """
+        with self._lock:
+            if shape in self._explained:
+                return False
+            self._explained.add(shape)
+            return True
+
+    def write(self, entry: dict):
+        """
+        Fonction qui écrit une requête lente dans le fichier de log
+
+        :param entry: Description de la requête (durée, requête, paramètres, plan...)
+        """
+        entry = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), **entry}
+        self._logger.info(json.dumps(entry, default=str, ensure_ascii=False))
+
+    def close(self):
+        """
+        Fonction qui ferme le fichier de log
+        """
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+    def wrap_mysql(self, connection) -> 'SlowQueryConnection':
+        """
+        Fonction qui renvoie la connexion MySQL dont les requêtes sont mesurées
+
+        :param connection: Connexion MySQL
+        :return: Objet SlowQueryConnection
+        """
+        return SlowQueryConnection(connection, self)
+
+    def wrap_mongodb(self, db) -> 'SlowQueryDatabase':
+        """
+        Fonction qui renvoie la base MongoDB dont les recherches sont mesurées
+
+        :param db: Base MongoDB
+        :return: Objet SlowQueryDatabase
+        """
+        return SlowQueryDatabase(db, self)
+
+
+class SlowQueryConnection:
+    """
+    Connexion MySQL dont les curseurs mesurent la durée de chaque requête
+    """
+
+    def __init__(self, connection, log: SlowQueryLog):
+        self._connection = connection
+        self._log = log
+
+    def cursor(self, **kwargs):
+        return SlowQueryCursor(self._connection, self._connection.cursor(**kwargs), self._log)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class SlowQueryCursor:
+    """
+    Curseur MySQL qui mesure une requête de execute() jusqu'à la fermeture du curseur (lecture des lignes comprise).
+    Le plan EXPLAIN est capturé après la fermeture, une fois le résultat entièrement lu.
+    """
+
+    def __init__(self, connection, cursor, log: SlowQueryLog):
+        self._connection = connection
+        self._cursor = cursor
+        self._log = log
+        self._pending = None
+
+    def execute(self, query: str, params=None):
+        self._pending = (query, params, time.perf_counter())
+        return self._cursor.execute(query, params)
+
+    def close(self):
+        self._cursor.close()
+        if self._pending is None:
+            return
+        query, params, start = self._pending
+        self._pending = None
+        duration = time.perf_counter() - start
+        if duration < self._log.threshold:
+            return
+        shape = mysql_shape(query)
+        entry = {'database': 'mysql', 'duration_ms': round(duration * 1000, 1), 'query': shape, 'params': params}
+        if self._log.first_of_shape(shape):
+            entry['explain'] = self._explain(query, params)
+        self._log.write(entry)
+
+    def _explain(self, query: str, params):
+        cursor = self._connection.cursor(buffered=True)
+        try:
+            cursor.execute(f"EXPLAIN FORMAT=JSON {query}", params)
+            return json.loads(cursor.fetchone()[0])
+        except Exception as error:
+            return f"EXPLAIN impossible : {error}"
+        finally:
+            cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class SlowQueryDatabase:
+    """
+    Base MongoDB dont les collections mesurent la durée des recherches find()
+    """
+
+    def __init__(self, db, log: SlowQueryLog):
+        self._db = db
+        self._log = log
+
+    def __getitem__(self, name: str):
+        return SlowQueryCollection(self._db[name], self._log)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+class SlowQueryCollection:
+    """
+    Collection MongoDB dont les recherches find() sont mesurées jusqu'à la lecture du dernier document
+    """
+
+    def __init__(self, collection, log: SlowQueryLog):
+        self._collection = collection
+        self._log = log
+
+    def find(self, filter=None, *args, **kwargs):
+        return SlowQueryMongoCursor(self._collection, filter or {}, args, kwargs, self._log)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class SlowQueryMongoCursor:
+    """
+    Curseur MongoDB mesuré : la durée court de l'appel à find() à la lecture du dernier document
+    """
+
+    def __init__(self, collection, filter: dict, args: tuple, kwargs: dict, log: SlowQueryLog):
+        self._collection = collection
+        self._filter = filter
+        self._args = args
+        self._kwargs = kwargs
+        self._log = log
+        self._start = time.perf_counter()
+        self._cursor = collection.find(filter, *args, **kwargs)
+
+    def __iter__(self):
+        yield from self._cursor
+        duration = time.perf_counter() - self._start
+        if duration >= self._log.threshold:
+            self._record(duration)
+
+    def _record(self, duration: float):
+        sort = self._kwargs.get('sort')
+        shape = (self._collection.name, json.dumps(mongodb_shape(self._filter), sort_keys=True), repr(sort))
+        entry = {'database': 'mongodb', 'duration_ms': round(duration * 1000, 1),
+                 'collection': self._collection.name, 'filter': self._filter, 'sort': sort,
+                 'limit': self._kwargs.get('limit')}
+        if self._log.first_of_shape(shape):
+            try:
+                entry['explain'] = mongodb_plan_summary(self._collection.find(self._filter, *self._args,
+                                                                              **self._kwargs).explain())
+            except Exception as error:
+                entry['explain'] = f"explain() impossible : {error}"
+        self._log.write(entry)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
@@ -0,0 +1,177 @@
+import bisect
+import heapq
+from typing import Optional
+from src.queries import fetch_all, ranking_cursor
+from src.team_resolver import TeamResolver, fold_text
+
+
+class ReferenceSnapshot:
+    """
+    Instantané en mémoire des tables Team, Player, Staff, League et Ranking.
+
+    Les fonctions select_* ont les mêmes paramètres et renvoient les mêmes lignes, dans le même ordre,
+    que celles de src/queries.py (sans la connexion MySQL) : les routes /equipe, /joueurs et /classements
+    peuvent être servies sans interroger MySQL. L'instantané n'est jamais modifié : une nouvelle
+    version des données donne lieu à un nouvel instantané qui remplace l'ancien.
+    """
+
+    def __init__(self, teams: list, players: list, staff: list, leagues: list, rankings: list):
+        """
+        :param teams: Lignes de la table Team
+        :param players: Lignes de la table Player
+        :param staff: Lignes de la table Staff
+        :param leagues: Lignes de la table League
+        :param rankings: Lignes de la table Ranking
+        """
+        self.teams = sorted(teams, key=lambda team: team['id'])
+        self.teams_by_id = {team['id']: team for team in self.teams}
+        self.team_resolver = TeamResolver(self.teams)
+
+        self.players = sorted(players, key=lambda player: player['id'])
+        self._player_ids = [player['id'] for player in self.players]
+        self.players_by_id = {player['id']: player for player in self.players}
+        self.players_by_team = {}
+        self.players_by_position = {}
+        for player in self.players:
+            self.players_by_team.setdefault(player['team_id'], []).append(player)
+            self.players_by_position.setdefault(player['position'], []).append(player)
+
+        self.staff_by_team = {}
+        for member in sorted(staff, key=lambda member: member['id']):
+            self.staff_by_team.setdefault(member['team_id'], []).append(member)
+
+        self.leagues_by_id = {league['id']: league for league in leagues}
+        # Lignes au format de queries.select_rankings, dans l'ordre de la pagination
+        self.rankings = sorted((self._ranking_row(ranking) for ranking in rankings), key=ranking_cursor)
+        self._ranking_keys = [ranking_cursor(row) for row in self.rankings]
+        self.rankings_by_season = {}
+        self.rankings_by_team = {}
+        for row in self.rankings:
+            self.rankings_by_season.setdefault(row['season'], []).append(row)
+            self.rankings_by_team.setdefault(row['team_id'], []).append(row)
+
+    @classmethod
+    def load(cls, connection) -> 'ReferenceSnapshot':
+        """
+        Fonction qui charge l'instantané depuis MySQL
+
+        :param connection: Connexion MySQL
+        :return: Objet ReferenceSnapshot
+        """
+        return cls(fetch_all(connection, "SELECT * FROM Team", []),
+                   fetch_all(connection, "SELECT * FROM Player", []),
+                   fetch_all(connection, "SELECT * FROM Staff", []),
+                   fetch_all(connection, "SELECT * FROM League", []),
+                   fetch_all(connection, "SELECT * FROM Ranking", []))
+
+    def _ranking_row(self, ranking: dict) -> dict:
+        # Mêmes colonnes que queries.select_rankings ('name' est le nom de l'équipe, comme avec le curseur MySQL)
+        league = self.leagues_by_id[ranking['league_id']]
+        team = self.teams_by_id[ranking['team_id']]
+        return {'position': ranking['position'], 'name': team['name'], 'season': league['season'],
+                'type': ranking['type'], 'played': ranking['played'], 'goals_for': ranking['goals_for'],
+                'goals_against': ranking['goals_against'], 'won': ranking['won'], 'draw': ranking['draw'],
+                'lost': ranking['lost'], 'points': ranking['points'], 'league_id': ranking['league_id'],
+                'team_id': ranking['team_id']}
+
+    def stats(self) -> dict:
+        """
+        Fonction qui renvoie le nombre de lignes de chaque table de l'instantané
+
+        :return: Dictionnaire nom de la table -> nombre de lignes
+        """
+        return {'teams': len(self.teams),
+                'players': len(self.players),
+                'staff': sum(len(members) for members in self.staff_by_team.values()),
+                'leagues': len(self.leagues_by_id),
+                'rankings': len(self.rankings)}
+
+    def select_teams(self, team_ids: Optional[list], id: Optional[int], limit: int) -> list:
+        """
+        Fonction qui sélectionne les équipes (voir queries.select_teams)
+        """
+        if id:
+            candidates = [self.teams_by_id[id]] if id in self.teams_by_id else []
+        else:
+            candidates = self.teams
+        if team_ids is not None:
+            team_ids = set(team_ids)
+            candidates = [team for team in candidates if team['id'] in team_ids]
+        return candidates[:limit]
+
+    def select_players(self, id: Optional[int], first_name: Optional[str], last_name: Optional[str],
+                       birth_date: Optional[str], position: Optional[str], team_ids: Optional[list], limit: int,
+                       after: Optional[list] = None) -> list:
+        """
+        Fonction qui sélectionne les joueurs triés par identifiant (voir queries.select_players)
+        """
+        # Point de départ : l'index le plus sélectif parmi les filtres renseignés
+        if id:
+            candidates = [self.players_by_id[id]] if id in self.players_by_id else []
+        elif team_ids is not None:
+            candidates = heapq.merge(*(self.players_by_team.get(team_id, []) for team_id in team_ids),
+                                     key=lambda player: player['id'])
+        elif position:
+            candidates = self.players_by_position.get(position, [])
+        else:
+            start = bisect.bisect_right(self._player_ids, after[0]) if after else 0
+            candidates = self.players[start:]
+
+        conditions = []
+        if team_ids is not None:
+            team_ids = set(team_ids)
+            conditions.append(lambda player: player['team_id'] in team_ids)
+        if first_name:
+            first_name = fold_text(first_name)
+            conditions.append(lambda player: fold_text(player['first_name']) == first_name)
+        if last_name:
+            last_name = fold_text(last_name)
+            conditions.append(lambda player: fold_text(player['last_name']) == last_name)
+        if birth_date:
+            conditions.append(lambda player: str(player['birthdate']) == birth_date)
+        if position:
+            conditions.append(lambda player: player['position'] == position)
+        if after:
+            conditions.append(lambda player: player['id'] > after[0])
+        return self._first(candidates, conditions, limit)
+
+    def select_rankings(self, season: Optional[int], type_: Optional[str], team_ids: Optional[list],
+                        league: Optional[str], limit: int, after: Optional[list] = None) -> list:
+        """
+        Fonction qui sélectionne les entrées de classement triées par championnat, type et position
+        (voir queries.select_rankings)
+        """
+        if team_ids is not None:
+            candidates = heapq.merge(*(self.rankings_by_team.get(team_id, []) for team_id in team_ids),
+                                     key=ranking_cursor)
+        elif season:
+            candidates = self.rankings_by_season.get(season, [])
+        else:
+            start = bisect.bisect_right(self._ranking_keys, after) if after else 0
+            candidates = self.rankings[start:]
+
+        conditions = []
+        if season:
+            conditions.append(lambda row: row['season'] == season)
+        if league:
+            league_ids = {league_id for league_id, row in self.leagues_by_id.items()
+                          if fold_text(row['name']) == fold_text(league)}
+            conditions.append(lambda row: row['league_id'] in league_ids)
+        if type_:
+            type_ = type_.upper()
+            conditions.append(lambda row: row['type'] == type_)
+        if after:
+            conditions.append(lambda row: ranking_cursor(row) > after)
+        return self._first(candidates, conditions, limit)
+
+    @staticmethod
+    def _first(candidates, conditions: list, limit: int) -> list:
+        results = []
+        if limit <= 0:
+            return results
+        for candidate in candidates:
+            if all(condition(candidate) for condition in conditions):
+                results.append(candidate)
+                if len(results) == limit:
+                    break
+        return results
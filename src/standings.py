@@ -0,0 +1,188 @@
+from typing import Optional
+import numpy as np
+from src import queries
+
+# Statistiques cumulées de chaque équipe, dans l'ordre du dernier axe des tableaux
+STATISTICS = ('played', 'won', 'draw', 'lost', 'goals_for', 'goals_against', 'points')
+
+
+class SeasonStandings:
+    """
+    Classements TOTAL, HOME et AWAY d'une saison à chaque journée, calculés à partir des résultats.
+
+    Les statistiques sont cumulées journée par journée dans un tableau (types, journées + 1, équipes, statistiques) :
+    le classement à l'issue de la journée N est lu dans la ligne N sans parcourir les matchs.
+    """
+
+    def __init__(self, league: str, season: int, team_ids: list, names: list, cumulative: np.ndarray):
+        """
+        :param league: Nom du championnat
+        :param season: Année de début de la saison
+        :param team_ids: Identifiants des équipes (Team.id)
+        :param names: Noms des équipes
+        :param cumulative: Statistiques cumulées (types dans l'ordre de RANKING_TYPES, journées + 1, équipes,
+                           statistiques dans l'ordre de STATISTICS), la ligne 0 correspondant au début de saison
+        """
+        self.league = league
+        self.season = season
+        self.team_ids = team_ids
+        self.names = names
+        self.cumulative = cumulative
+        # Rang de chaque équipe dans l'ordre alphabétique (dernier critère de départage)
+        self._name_rank = np.argsort(np.argsort(np.array(names, dtype=object), kind='stable'))
+
+    @property
+    def matchdays(self) -> int:
+        """
+        Nombre de journées de la saison
+        """
+        return self.cumulative.shape[1] - 1
+
+    @classmethod
+    def from_matches(cls, league: str, season: int, documents: list) -> 'SeasonStandings':
+        """
+        Fonction qui calcule les classements cumulés à partir des matchs de la saison
+
+        :param league: Nom du championnat
+        :param season: Année de début de la saison
+        :param documents: Documents de la collection match_results de la saison (joués ou non)
+        :return: Objet SeasonStandings
+        """
+        documents = [document for document in documents
+                     if document['home_team']['id'] is not None and document['away_team']['id'] is not None]
+        names = {}
+        for document in documents:
+            for side in ('home_team', 'away_team'):
+                names[document[side]['id']] = document[side]['name']
+        played = [bool(document.get('score')) for document in documents]
+        return cls.from_arrays(league, season, names,
+                               np.array([document['home_team']['id'] for document in documents], dtype=int),
+                               np.array([document['away_team']['id'] for document in documents], dtype=int),
+                               np.array([document['matchday'] for document in documents], dtype=int),
+                               np.array([document['score']['home'] if is_played else -1
+                                         for document, is_played in zip(documents, played)], dtype=np.int32),
+                               np.array([document['score']['away'] if is_played else -1
+                                         for document, is_played in zip(documents, played)], dtype=np.int32))
+
+    @classmethod
+    def from_arrays(cls, league: str, season: int, names: dict, home_ids: np.ndarray, away_ids: np.ndarray,
+                    matchdays: np.ndarray, home_goals: np.ndarray, away_goals: np.ndarray) -> 'SeasonStandings':
+        """
+        Fonction qui calcule les classements cumulés à partir des colonnes des matchs de la saison
+
+        :param league: Nom du championnat
+        :param season: Année de début de la saison
+        :param names: Noms des équipes par identifiant
+        :param home_ids: Identifiants des équipes à domicile (-1 si inconnue)
+        :param away_ids: Identifiants des équipes à l'extérieur (-1 si inconnue)
+        :param matchdays: Numéros des journées
+        :param home_goals: Buts de l'équipe à domicile (-1 si le match n'est pas joué)
+        :param away_goals: Buts de l'équipe à l'extérieur (-1 si le match n'est pas joué)
+        :return: Objet SeasonStandings
+        """
+        known = (home_ids >= 0) & (away_ids >= 0)
+        team_ids = np.union1d(home_ids[known], away_ids[known])
+        matchday_count = int(matchdays[known].max()) if known.any() else 0
+        played = known & (home_goals >= 0) & (away_goals >= 0)
+        home = np.searchsorted(team_ids, home_ids[played])
+        away = np.searchsorted(team_ids, away_ids[played])
+        matchday = matchdays[played].astype(int)
+        home_goals = home_goals[played].astype(np.int32)
+        away_goals = away_goals[played].astype(np.int32)
+
+        def statistics(goals_for: np.ndarray, goals_against: np.ndarray) -> np.ndarray:
+            won, draw, lost = goals_for > goals_against, goals_for == goals_against, goals_for < goals_against
+            return np.stack([np.ones_like(goals_for), won, draw, lost, goals_for, goals_against, 3 * won + draw],
+                            axis=1).astype(np.int32)
+
+        increments = np.zeros((len(queries.RANKING_TYPES), matchday_count + 1, len(team_ids), len(STATISTICS)),
+                              dtype=np.int32)
+        home_type, away_type, total_type = (queries.RANKING_TYPES.index(type_) for type_ in ('HOME', 'AWAY', 'TOTAL'))
+        np.add.at(increments[home_type], (matchday, home), statistics(home_goals, away_goals))
+        np.add.at(increments[away_type], (matchday, away), statistics(away_goals, home_goals))
+        increments[total_type] = increments[home_type] + increments[away_type]
+        team_ids = team_ids.tolist()
+        return cls(league, season, team_ids, [names.get(team_id, str(team_id)) for team_id in team_ids],
+                   np.cumsum(increments, axis=1, dtype=np.int32))
+
+    def table(self, matchday: int, type_: str) -> list:
+        """
+        Fonction qui renvoie un classement à l'issue d'une journée, trié par points, différence de buts,
+        buts marqués puis nom de l'équipe
+
+        :param matchday: Numéro de la journée (la dernière journée au-delà)
+        :param type_: Type de classement ('TOTAL', 'HOME', 'AWAY')
+        :return: Lignes du classement (mêmes champs que la table Ranking, avec le championnat et la journée)
+        """
+        matchday = max(0, min(matchday, self.matchdays))
+        values = self.cumulative[queries.RANKING_TYPES.index(type_), matchday]
+        columns = {name: values[:, column] for column, name in enumerate(STATISTICS)}
+        # np.lexsort trie selon la dernière clé en premier
+        order = np.lexsort((self._name_rank, -columns['goals_for'],
+                            -(columns['goals_for'] - columns['goals_against']), -columns['points']))
+        return [{'position': position, 'name': self.names[team], 'league': self.league, 'season': self.season,
+                 'matchday': matchday, 'type': type_, **{name: int(columns[name][team]) for name in STATISTICS},
+                 'team_id': self.team_ids[team]}
+                for position, team in enumerate(order.tolist(), 1)]
+
+
+def season_standings(db, league: str, season: int) -> SeasonStandings:
+    """
+    Fonction qui calcule les classements cumulés d'une saison à partir de la collection match_results
+
+    :param db: Base MongoDB football_predictor
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :return: Objet SeasonStandings
+    """
+    return SeasonStandings.from_matches(league, season, queries.find_league_matches(db, league, [season]))
+
+def store_standings(store, league: str, season: int) -> SeasonStandings:
+    """
+    Fonction qui calcule les classements cumulés d'une saison à partir du magasin de matchs (src/match_store.py)
+
+    :param store: Objet MatchStore
+    :param league: Nom du championnat
+    :param season: Année de début de la saison
+    :return: Objet SeasonStandings
+    """
+    columns = store.season(league, season)
+    return SeasonStandings.from_arrays(league, season, store.teams, columns['home_id'], columns['away_id'],
+                                       columns['matchday'], columns['home_goals'], columns['away_goals'])
+
+def select_standings(standings: SeasonStandings, matchday: int, type_: Optional[str], team_ids: Optional[list],
+                     limit: int, after: Optional[list] = None) -> list:
+    """
+    Fonction qui sélectionne les entrées des classements d'une saison à l'issue d'une journée
+
+    :param standings: Classements cumulés de la saison
+    :param matchday: Numéro de la journée
+    :param type_: Type de classement ('TOTAL', 'HOME', 'AWAY', tous les types si None)
+    :param team_ids: Identifiants des équipes (None si pas de filtre)
+    :param limit: Nombre maximum de résultats
+    :param after: Clé de pagination [indice du type, position, team_id] de la dernière entrée de la page précédente
+    :return: Liste des entrées triées par type et position
+    """
+    types = [type_.upper()] if type_ else queries.RANKING_TYPES
+    results = []
+    for ranking_type in queries.RANKING_TYPES:
+        if ranking_type not in types:
+            continue
+        for row in standings.table(matchday, ranking_type):
+            if team_ids is not None and row['team_id'] not in team_ids:
+                continue
+            if after and standing_cursor(row) <= after:
+                continue
+            results.append(row)
+            if len(results) == limit:
+                return results
+    return results
+
+def standing_cursor(row: dict) -> list:
+    """
+    Fonction qui renvoie la clé de pagination d'une entrée de classement calculée à partir des résultats
+
+    :param row: Ligne renvoyée par select_standings
+    :return: Clé [indice du type, position, team_id]
+    """
+    return [queries.RANKING_TYPES.index(row['type']) + 1, row['position'], row['team_id']]
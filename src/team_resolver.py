@@ -0,0 +1,98 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Noms alternatifs rencontrés dans les sources (webscraping, API) -> nom enregistré dans la table Team
+TEAM_ALIASES = {
+    'US Quevilly Rouen': 'US Quevilly-Rouen',
+}
+
+def fold_text(text: str) -> str:
+    """
+    Fonction qui supprime les accents et la casse d'un texte
+    (comparaison équivalente à la collation utf8mb4_0900_ai_ci de MySQL)
+
+    :param text: Texte à comparer
+    :return: Texte sans accents, en minuscules (ex : 'Étienne' -> 'etienne')
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def normalize_team_name(name: str) -> str:
+    """
+    Fonction qui normalise un nom d'équipe pour la comparaison :
+    sans accents, en minuscules, ponctuation et tirets remplacés par des espaces
+
+    :param name: Nom d'équipe
+    :return: Nom normalisé (ex : 'Saint-Étienne' -> 'saint etienne')
+    """
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', fold_text(name)).split())
+
+
+class TeamResolver:
+    """
+    Index en mémoire des noms d'équipes (name, shortname et alias) insensible à la casse et aux accents.
+
+    Une recherche renvoie d'abord les équipes dont un nom correspond exactement, sinon celles dont
+    un nom contient la recherche (comportement de l'ancien LIKE '%...%').
+    """
+
+    def __init__(self, teams: list, aliases: dict = TEAM_ALIASES):
+        """
+        :param teams: Liste des équipes (dictionnaires avec les clés id, name et shortname)
+        :param aliases: Dictionnaire nom alternatif -> nom ou nom abrégé enregistré
+        """
+        self.teams = {team['id']: team for team in teams}
+        self._exact = {}
+        for team in teams:
+            for name in (team['name'], team['shortname']):
+                self._exact.setdefault(normalize_team_name(name), set()).add(team['id'])
+        for alias, target in aliases.items():
+            ids = self._exact.get(normalize_team_name(target))
+            if ids:
+                self._exact.setdefault(normalize_team_name(alias), set()).update(ids)
+        self._names = list(self._exact.items())
+
+    @classmethod
+    def from_connection(cls, connection, aliases: dict = TEAM_ALIASES) -> 'TeamResolver':
+        """
+        Fonction qui construit l'index à partir de la table Team
+
+        :param connection: Connexion MySQL
+        :param aliases: Dictionnaire des noms alternatifs
+        :return: Objet TeamResolver
+        """
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT id, name, shortname FROM `Team`")
+            return cls(cursor.fetchall(), aliases)
+        finally:
+            cursor.close()
+
+    def resolve(self, name: str) -> list:
+        """
+        Fonction qui renvoie les identifiants des équipes correspondant à un nom
+
+        :param name: Nom (approximatif) de l'équipe
+        :return: Liste triée des identifiants (vide si aucune équipe ne correspond)
+        """
+        normalized = normalize_team_name(name)
+        if not normalized:
+            return []
+        if normalized in self._exact:
+            return sorted(self._exact[normalized])
+        ids = set()
+        for key, team_ids in self._names:
+            if normalized in key:
+                ids.update(team_ids)
+        return sorted(ids)
+
+    def resolve_one(self, name: str) -> Optional[int]:
+        """
+        Fonction qui renvoie l'identifiant de l'équipe correspondant le mieux à un nom
+
+        :param name: Nom (approximatif) de l'équipe
+        :return: Identifiant de l'équipe, ou None si aucune ne correspond
+        """
+        ids = self.resolve(name)
+        return ids[0] if ids else None
@@ -0,0 +1,28 @@
+from dotenv import dotenv_values
+import argparse
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.database import create_mongodb_client
+from src.features import rebuild_features, update_features
+
+# Chargement des variables d'environnement pour la connexion MongoDB
+config = dotenv_values("../.env")
+
+parser = argparse.ArgumentParser(description="Mise à jour de la forme des équipes à partir de la collection match_results")
+parser.add_argument('--rebuild', action='store_true',
+                    help="Recalculer la forme de toutes les équipes depuis le premier match")
+args = parser.parse_args()
+
+client = create_mongodb_client(config)
+try:
+    db = client["football_predictor"]
+    count = rebuild_features(db) if args.rebuild else update_features(db)
+    print(f"{count} matchs appliqués à la forme des équipes")
+    if count:
+        # Nouvelle version des données : les caches de l'API sont invalidés
+        bump_data_version()
+finally:
+    client.close()
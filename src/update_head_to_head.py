@@ -0,0 +1,28 @@
+from dotenv import dotenv_values
+import argparse
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.database import create_mongodb_client
+from src.head_to_head import rebuild_head_to_head, update_head_to_head
+
+# Chargement des variables d'environnement pour la connexion MongoDB
+config = dotenv_values("../.env")
+
+parser = argparse.ArgumentParser(description="Mise à jour des confrontations directes à partir de la collection match_results")
+parser.add_argument('--rebuild', action='store_true',
+                    help="Recalculer les bilans de toutes les paires d'équipes depuis le premier match")
+args = parser.parse_args()
+
+client = create_mongodb_client(config)
+try:
+    db = client["football_predictor"]
+    count = rebuild_head_to_head(db) if args.rebuild else update_head_to_head(db)
+    print(f"{count} matchs appliqués aux confrontations directes")
+    if count:
+        # Nouvelle version des données : les caches de l'API sont invalidés
+        bump_data_version()
+finally:
+    client.close()
@@ -0,0 +1,35 @@
+from dotenv import dotenv_values
+import argparse
+import sys
+
+# Les modules partagés avec l'API sont importés depuis la racine du projet
+sys.path.append('..')
+from src.data_version import bump_data_version
+from src.database import create_mongodb_client
+from src.elo import rebuild_ratings, update_ratings, verify_ratings
+
+# Chargement des variables d'environnement pour la connexion MongoDB
+config = dotenv_values("../.env")
+
+parser = argparse.ArgumentParser(description="Mise à jour des classements Elo à partir de la collection match_results")
+parser.add_argument('--rebuild', action='store_true', help="Recalculer tous les classements depuis le premier match")
+parser.add_argument('--verify', action='store_true',
+                    help="Comparer les classements enregistrés avec un recalcul complet (sans rien modifier)")
+args = parser.parse_args()
+
+client = create_mongodb_client(config)
+try:
+    db = client["football_predictor"]
+    if args.verify:
+        differences = verify_ratings(db)
+        for team_id, (stored, expected) in sorted(differences.items()):
+            print(f"Équipe {team_id} : classement enregistré {stored}, recalculé {expected}")
+        print(f"{len(differences)} classements en écart")
+    else:
+        count = rebuild_ratings(db) if args.rebuild else update_ratings(db)
+        print(f"{count} matchs appliqués aux classements Elo")
+        if count:
+            # Nouvelle version des données : les caches de l'API sont invalidés
+            bump_data_version()
+finally:
+    client.close()